@@ -5,6 +5,7 @@
 
 import ctypes
 import subprocess
+from multiprocessing import freeze_support
 from sys import argv, exit, platform
 
 from PySide6.QtWidgets import QApplication, QMessageBox
@@ -13,6 +14,8 @@ from src.ui.MainGUI import MainGUI
 from src.Utils import __main_window_title__, logger
 
 if __name__ == "__main__":
+    # ? 打包后的程序需要支持后处理进程池启动子进程
+    freeze_support()
     app = QApplication.instance() or QApplication(argv)
 
     if platform == "win32" and ctypes.windll.user32.FindWindowW(None, __main_window_title__) != 0:
@@ -0,0 +1,390 @@
+"""
+本地模拟的哔哩哔哩漫画服务器，提供 ComicDetail、GetImageIndex、ImageToken 接口、图片CDN以及BiliPlus页面，
+可以配置延迟、带宽和错误率，供性能测试使用
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# ? 模拟图片的高度, 图片内容是随机噪点, 不同高度的图片大小不一, 用于模拟页面大小不均匀的章节
+IMAGE_WIDTH = 800
+IMAGE_HEIGHTS = (600, 900, 1200, 1500, 1800, 2400)
+SEND_CHUNK_SIZE = 16 * 1024
+
+
+class MockComic:
+    """模拟的单本漫画, 章节和图片都由漫画ID决定, 每次生成的结果相同"""
+
+    def __init__(self, comic_id: int, num_episodes: int, num_pages: int, num_locked: int) -> None:
+        """
+        Args:
+            comic_id (int): 漫画ID
+            num_episodes (int): 章节数
+            num_pages (int): 每章的图片数
+            num_locked (int): 最新的几章为未解锁章节
+        """
+        self.comic_id = comic_id
+        self.num_pages = num_pages
+        # ? 与接口一致, 最新的章节在前
+        self.ep_list = [
+            {
+                "id": comic_id * 10000 + ord,
+                "ord": ord,
+                "title": f"模拟章节{ord}",
+                "short_title": str(ord),
+                "is_locked": ord > num_episodes - num_locked,
+                "size": 0,
+                "image_count": num_pages,
+                "pub_time": "2024-01-01 00:00:00",
+            }
+            for ord in range(num_episodes, 0, -1)
+        ]
+
+    ############################################################
+
+    def getDetail(self, base_url: str) -> dict:
+        """生成 ComicDetail 接口返回的数据
+
+        Args:
+            base_url (str): 模拟服务器的地址, 用于生成封面地址
+
+        Returns:
+            dict: 漫画详情
+        """
+        return {
+            "id": self.comic_id,
+            "title": f"模拟漫画{self.comic_id}",
+            "author_name": ["作者:模拟作者"],
+            "styles": ["测试"],
+            "evaluate": "性能测试使用的模拟漫画",
+            "renewal_time": "2024-01-01",
+            "hall_icon_text": "",
+            "tags": [{"name": "测试"}],
+            "horizontal_cover": f"{base_url}/bfs/cover/{self.comic_id}_h.jpg",
+            "square_cover": f"{base_url}/bfs/cover/{self.comic_id}_s.jpg",
+            "vertical_cover": f"{base_url}/bfs/cover/{self.comic_id}_v.jpg",
+            "last_ord": self.ep_list[0]["ord"] if self.ep_list else 0,
+            "is_finish": 0,
+            "ep_list": self.ep_list,
+        }
+
+    ############################################################
+
+    def getImagePaths(self, ep_id: int) -> list[str]:
+        """生成章节内所有图片的路径
+
+        Args:
+            ep_id (int): 章节ID
+
+        Returns:
+            list[str]: 图片路径列表
+        """
+        return [
+            f"/bfs/manga/{self.comic_id}/{ep_id}/{index}.jpg"
+            for index in range(1, self.num_pages + 1)
+        ]
+
+
+############################################################
+
+
+class MockServer:
+    """模拟服务器, 在后台线程中运行, 同时统计各接口的请求数和发送的字节数"""
+
+    def __init__(
+        self,
+        num_episodes: int = 20,
+        num_pages: int = 20,
+        num_locked: int = 0,
+        latency: float = 0.0,
+        bandwidth: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        images: list[bytes] = None,
+    ) -> None:
+        """
+        Args:
+            num_episodes (int): 每部漫画的章节数
+            num_pages (int): 每章的图片数
+            num_locked (int): 每部漫画最新的几章为未解锁章节
+            latency (float): 每个请求额外的延迟, 单位秒
+            bandwidth (float): 每个响应的带宽上限, 单位字节每秒, 为0时不限制
+            error_rate (float): 随机返回 503 的概率
+            seed (int): 随机数种子, 决定图片内容和错误出现的位置
+            images (list[bytes]): 作为图片返回的内容, 为 None 时用 PIL 生成随机噪点的 jpg
+        """
+        self.num_episodes = num_episodes
+        self.num_pages = num_pages
+        self.num_locked = num_locked
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.images = images if images is not None else self.generateImages(seed)
+        self.etags = [hashlib.md5(img).hexdigest() for img in self.images]
+        self.comics: dict[int, MockComic] = {}
+        self.stats_lock = threading.Lock()
+        self.stats = self.newStats()
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.__makeHandler())
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    ############################################################
+
+    @staticmethod
+    def generateImages(seed: int) -> list[bytes]:
+        """生成不同高度的随机噪点 jpg, 噪点几乎无法压缩, 大小接近真实的漫画页面
+
+        Args:
+            seed (int): 随机数种子
+
+        Returns:
+            list[bytes]: jpg 图片内容
+        """
+        from PIL import Image
+
+        rng = random.Random(seed)
+        images = []
+        for height in IMAGE_HEIGHTS:
+            noise = Image.frombytes(
+                "L", (IMAGE_WIDTH, height), rng.randbytes(IMAGE_WIDTH * height)
+            ).convert("RGB")
+            with io.BytesIO() as buffer:
+                noise.save(buffer, format="JPEG", quality=80)
+                images.append(buffer.getvalue())
+        return images
+
+    ############################################################
+
+    @staticmethod
+    def newStats() -> dict:
+        """生成空的统计数据
+
+        Returns:
+            dict: {"requests": 各接口的请求数, "errors": 注入的错误数, "image_bytes": 发送的图片字节数}
+        """
+        return {"requests": {}, "errors": 0, "image_bytes": 0}
+
+    ############################################################
+
+    def start(self) -> MockServer:
+        """在后台线程中启动服务器
+
+        Returns:
+            MockServer: 服务器自身, 方便链式调用
+        """
+        self.thread.start()
+        return self
+
+    ############################################################
+
+    def stop(self) -> None:
+        """关闭服务器"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    ############################################################
+
+    def resetStats(self) -> dict:
+        """取出当前的统计数据并清零
+
+        Returns:
+            dict: 清零之前的统计数据
+        """
+        with self.stats_lock:
+            stats, self.stats = self.stats, self.newStats()
+        return stats
+
+    ############################################################
+
+    def getComic(self, comic_id: int) -> MockComic:
+        """获取模拟漫画, 第一次请求时生成
+
+        Args:
+            comic_id (int): 漫画ID
+
+        Returns:
+            MockComic: 模拟漫画
+        """
+        with self.stats_lock:
+            if comic_id not in self.comics:
+                self.comics[comic_id] = MockComic(
+                    comic_id, self.num_episodes, self.num_pages, self.num_locked
+                )
+            return self.comics[comic_id]
+
+    ############################################################
+
+    def getImage(self, path: str) -> tuple[bytes, str]:
+        """根据图片路径选择图片, 同一路径总是返回相同的内容
+
+        Args:
+            path (str): 图片路径
+
+        Returns:
+            tuple[bytes, str]: (图片内容, Etag)
+        """
+        index = int(hashlib.md5(path.encode()).hexdigest(), 16) % len(self.images)
+        return self.images[index], self.etags[index]
+
+    ############################################################
+
+    def shouldFail(self) -> bool:
+        """按错误率决定这次请求是否返回错误
+
+        Returns:
+            bool: 是否返回错误
+        """
+        if self.error_rate <= 0:
+            return False
+        with self.random_lock:
+            return self.random.random() < self.error_rate
+
+    ############################################################
+
+    def __makeHandler(self) -> type[BaseHTTPRequestHandler]:
+        """生成绑定到本服务器的请求处理类
+
+        Returns:
+            type[BaseHTTPRequestHandler]: 请求处理类
+        """
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # ? 保持连接, 与真实服务器一样可以复用连接池
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+            ############################################################
+
+            def do_GET(self) -> None:
+                self.handle_request()
+
+            def do_POST(self) -> None:
+                self.handle_request()
+
+            ############################################################
+
+            def handle_request(self) -> None:
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                form = {
+                    key: values[0]
+                    for key, values in parse_qs(self.rfile.read(length).decode()).items()
+                }
+                endpoint = self.getEndpoint(url.path, query)
+                with server.stats_lock:
+                    counts = server.stats["requests"]
+                    counts[endpoint] = counts.get(endpoint, 0) + 1
+
+                if server.latency > 0:
+                    time.sleep(server.latency)
+                if endpoint != "other" and server.shouldFail():
+                    with server.stats_lock:
+                        server.stats["errors"] += 1
+                    self.send(503, b"Service Unavailable", "text/plain")
+                    return
+
+                if endpoint == "ComicDetail":
+                    comic = server.getComic(int(form["comic_id"]))
+                    self.sendJson({"code": 0, "data": comic.getDetail(server.base_url)})
+                elif endpoint == "GetImageIndex":
+                    ep_id = int(form["ep_id"])
+                    paths = server.getComic(ep_id // 10000).getImagePaths(ep_id)
+                    images = [{"path": path, "x": IMAGE_WIDTH, "y": 0} for path in paths]
+                    self.sendJson({"code": 0, "data": {"images": images}})
+                elif endpoint == "ImageToken":
+                    tokens = [
+                        {"url": f"{server.base_url}{path}", "token": f"mock{time.time():.0f}"}
+                        for path in json.loads(form["urls"])
+                    ]
+                    self.sendJson({"code": 0, "data": tokens})
+                elif endpoint in ("image", "cover"):
+                    img, etag = server.getImage(url.path)
+                    if endpoint == "image":
+                        with server.stats_lock:
+                            server.stats["image_bytes"] += len(img)
+                    self.send(200, img, "image/jpeg", {"Etag": etag})
+                elif endpoint == "BiliPlusDetail":
+                    self.sendBiliPlusDetail(int(query["mangaid"]))
+                elif endpoint == "BiliPlusRead":
+                    self.sendBiliPlusRead(int(query["mangaid"]), int(query["epid"]))
+                else:
+                    self.send(404, b"Not Found", "text/plain")
+
+            ############################################################
+
+            @staticmethod
+            def getEndpoint(path: str, query: dict) -> str:
+                if path.startswith("/twirp/comic.v1.Comic/"):
+                    return path.rsplit("/", 1)[1]
+                if path.startswith("/bfs/manga/"):
+                    return "image"
+                if path.startswith("/bfs/cover/"):
+                    return "cover"
+                if path.startswith("/manga/") and query.get("act") == "detail_preview":
+                    return "BiliPlusDetail"
+                if path.startswith("/manga/") and query.get("act") == "read":
+                    return "BiliPlusRead"
+                return "other"
+
+            ############################################################
+
+            def sendBiliPlusDetail(self, comic_id: int) -> None:
+                # ? 模拟在BiliPlus上所有章节都已经被分享
+                items = "".join(
+                    f'<div class="episode-item"><a href="/manga/?act=read&epid={episode["id"]}">'
+                    f'<img src="{server.base_url}/bfs/cover/{episode["id"]}.jpg"></a></div>'
+                    for episode in server.getComic(comic_id).ep_list
+                )
+                self.send(200, f"<html><body>{items}</body></html>".encode(), "text/html")
+
+            ############################################################
+
+            def sendBiliPlusRead(self, comic_id: int, ep_id: int) -> None:
+                imgs = "".join(
+                    f'<img class="comic-single" _src="{server.base_url}{path}?token=mock">'
+                    for path in server.getComic(comic_id).getImagePaths(ep_id)
+                )
+                self.send(200, f"<html><body>{imgs}</body></html>".encode(), "text/html")
+
+            ############################################################
+
+            def sendJson(self, data: dict) -> None:
+                self.send(200, json.dumps(data, ensure_ascii=False).encode(), "application/json")
+
+            ############################################################
+
+            def send(
+                self, status: int, body: bytes, content_type: str, headers: dict = None
+            ) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if server.bandwidth <= 0:
+                    self.wfile.write(body)
+                    return
+                # ? 按带宽分块发送
+                for start in range(0, len(body), SEND_CHUNK_SIZE):
+                    chunk = body[start : start + SEND_CHUNK_SIZE]
+                    self.wfile.write(chunk)
+                    time.sleep(len(chunk) / server.bandwidth)
+
+        return Handler
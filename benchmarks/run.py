@@ -0,0 +1,215 @@
+"""
+性能测试入口，启动本地模拟服务器，每种保存方式在独立的子进程中解析并下载同一部模拟漫画，
+输出每秒章节数、每秒图片数、每秒字节数、峰值内存以及各阶段耗时。
+例如：python -m benchmarks.run --episodes 20 --pages 20 --latency 0.02 --error-rate 0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.mock_server import MockServer
+
+# ? 不导入 src, 避免在真实的用户数据目录下创建日志, 各场景的子进程使用临时的用户数据目录
+SAVE_METHODS = ["PDF", "文件夹-图片", "7z压缩包", "Zip压缩包", "Cbz压缩包"]
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def runSaveMethod(server: MockServer, save_method: str, args: argparse.Namespace) -> dict:
+    """在子进程中运行一种保存方式的测试场景, 并结合服务器的统计数据计算吞吐量
+
+    Args:
+        server (MockServer): 模拟服务器
+        save_method (str): 保存方式
+        args (argparse.Namespace): 命令行参数
+
+    Returns:
+        dict: 测试结果
+    """
+    temp_dir = tempfile.mkdtemp(prefix="bilibili-manga-bench-")
+    save_path = os.path.join(temp_dir, "save")
+    os.makedirs(save_path)
+    # ? data_path 由 HOME/APPDATA 决定, 子进程的缓存、本地库存数据库和日志都写到临时目录
+    env = dict(os.environ, HOME=temp_dir, APPDATA=temp_dir)
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.scenario",
+        "--server-url",
+        server.base_url,
+        "--save-path",
+        save_path,
+        "--save-method",
+        save_method,
+        "--source",
+        args.source,
+        "--engine",
+        args.engine,
+        "--workers",
+        str(args.workers),
+        "--page-workers",
+        str(args.page_workers),
+    ]
+    if args.no_rate_limit:
+        command.append("--no-rate-limit")
+
+    server.resetStats()
+    try:
+        process = subprocess.run(command, cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+        stats = server.resetStats()
+        lines = process.stdout.strip().splitlines()
+        if process.returncode != 0 or not lines:
+            return {"save_method": save_method, "error": process.stderr.strip()[-2000:]}
+        result = json.loads(lines[-1])
+    finally:
+        if not args.keep:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    if "error" in result:
+        return {"save_method": save_method, **result}
+
+    # ?###########################################################
+    # ? 章节数按全部完成计算, 图片数和字节数按下载阶段计算
+    stages = result["stages"]
+    pages = result["chapters"] * args.pages
+    result["pages"] = pages
+    result["bytes"] = stats["image_bytes"]
+    result["requests"] = stats["requests"]
+    result["injected_errors"] = stats["errors"]
+    result["chapters_per_sec"] = result["chapters"] / stages["total"] if stages["total"] else 0
+    result["pages_per_sec"] = pages / stages["download"] if stages["download"] else 0
+    result["bytes_per_sec"] = stats["image_bytes"] / stages["download"] if stages["download"] else 0
+    if args.keep:
+        result["temp_dir"] = temp_dir
+    return result
+
+
+############################################################
+
+
+def formatBytes(size: float | None) -> str:
+    """格式化字节数
+
+    Args:
+        size (float | None): 字节数
+
+    Returns:
+        str: 格式化后的字节数, 例如: 1.23MB
+    """
+    if size is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+
+############################################################
+
+
+def printTable(results: list[dict]) -> None:
+    """以表格形式输出测试结果
+
+    Args:
+        results (list[dict]): 各保存方式的测试结果
+    """
+    header = (
+        f"{'保存方式':<10}{'章节':>6}{'失败':>6}{'章节/秒':>10}{'图片/秒':>10}{'字节/秒':>12}"
+        f"{'峰值内存':>12}{'子进程峰值':>12}{'详情':>9}{'章节列表':>9}{'下载':>9}{'保存均值':>9}"
+        f"{'保存最大':>9}{'总计':>9}"
+    )
+    print(header)
+    for result in results:
+        if "error" in result:
+            print(f"{result['save_method']:<10} 失败: {result['error']}")
+            continue
+        stages = result["stages"]
+        print(
+            f"{result['save_method']:<10}{result['chapters']:>6}{result['failed']:>6}"
+            f"{result['chapters_per_sec']:>10.2f}{result['pages_per_sec']:>10.1f}"
+            f"{formatBytes(result['bytes_per_sec']) + '/s':>12}"
+            f"{formatBytes(result['peak_rss']['self']):>12}"
+            f"{formatBytes(result['peak_rss']['children']):>12}"
+            + "".join(
+                f"{stages[key]:>9.3f}"
+                for key in (
+                    "comic_detail",
+                    "episode_list",
+                    "download",
+                    "save_mean",
+                    "save_max",
+                    "total",
+                )
+            )
+        )
+        # ? 按主机汇总的各类资源耗时, 判断瓶颈在网络、CPU还是磁盘
+        for host, summary in result.get("metrics", {}).get("hosts", {}).items():
+            print(
+                f"    {host}: 网络 {summary['network']:.3f}s  CPU {summary['cpu']:.3f}s  "
+                f"磁盘 {summary['disk']:.3f}s  限速等待 {summary['throttle']:.3f}s  "
+                f"瓶颈: {summary['bound']}"
+            )
+
+
+############################################################
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="benchmarks.run", description="哔哩哔哩漫画下载器 性能测试 (使用本地模拟服务器)"
+    )
+    parser.add_argument("--episodes", type=int, default=20, help="模拟漫画的章节数")
+    parser.add_argument("--pages", type=int, default=20, help="每章的图片数")
+    parser.add_argument("--locked", type=int, default=0, help="未解锁的章节数")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求额外的延迟(秒)")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="每个响应的带宽(字节/秒)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="随机返回 503 的概率")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    parser.add_argument(
+        "--save-methods",
+        default=",".join(SAVE_METHODS),
+        help="逗号分隔的保存方式, 默认测试全部",
+    )
+    parser.add_argument("--source", choices=["bilibili", "biliplus"], default="bilibili")
+    parser.add_argument("--engine", choices=["thread", "async"], default="thread")
+    parser.add_argument("--workers", type=int, default=8, help="同时下载的章节数")
+    parser.add_argument("--page-workers", type=int, default=4, help="单章同时下载的图片数")
+    parser.add_argument("--no-rate-limit", action="store_true", help="关闭按主机限速")
+    parser.add_argument("--keep", action="store_true", help="保留下载结果和临时用户数据目录")
+    parser.add_argument("--json", help="把完整结果写入指定的JSON文件")
+    args = parser.parse_args()
+
+    save_methods = [method.strip() for method in args.save_methods.split(",") if method.strip()]
+    for method in save_methods:
+        if method not in SAVE_METHODS:
+            parser.error(f"未知的保存方式: {method}, 可选: {', '.join(SAVE_METHODS)}")
+
+    server = MockServer(
+        num_episodes=args.episodes,
+        num_pages=args.pages,
+        num_locked=args.locked,
+        latency=args.latency,
+        bandwidth=args.bandwidth,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    ).start()
+    try:
+        results = [runSaveMethod(server, method, args) for method in save_methods]
+    finally:
+        server.stop()
+
+    printTable(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=4, ensure_ascii=False)
+    return 1 if any("error" in result or result["failed"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+单个性能测试场景，由 benchmarks.run 在独立的子进程中启动，
+把请求转发到本地模拟服务器，解析并下载一部模拟漫画后以一行JSON输出结果
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+
+from src import RateLimiter
+from src.AsyncDownloadManager import AsyncDownloadManager
+from src.BiliPlus import BiliPlusComic
+from src.Comic import Comic
+from src.Config import Config
+from src.DownloadManager import DownloadManager
+from src.Episode import Episode
+from src.Metrics import getMetrics
+from src.Reporter import Reporter
+from src.Utils import getSession
+
+# ? 真实的接口都转发到模拟服务器, 图片地址本身就指向模拟服务器
+REDIRECT_PREFIXES = ("https://manga.bilibili.com", "https://www.biliplus.com")
+# ? 不限速时各主机使用的 (每秒请求数, 令牌桶容量, 最小并发, 最大并发, 初始并发)
+UNLIMITED_HOST_LIMIT = (1e9, 1e9, 256, 256, 256)
+
+
+class MockRedirectAdapter(HTTPAdapter):
+    """把发往哔哩哔哩和BiliPlus的请求转发到模拟服务器, 限速器仍然按原来的主机名工作"""
+
+    def __init__(self, base_url: str, **kwargs) -> None:
+        """
+        Args:
+            base_url (str): 模拟服务器的地址
+        """
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    def send(self, request, *args, **kwargs):
+        for prefix in REDIRECT_PREFIXES:
+            if request.url.startswith(prefix):
+                request.url = f"{self.base_url}{request.url[len(prefix):]}"
+                break
+        return super().send(request, *args, **kwargs)
+
+
+############################################################
+
+
+class BenchReporter(Reporter):
+    """记录每个章节任务结束的时间, 全部结束后通知主线程"""
+
+    def __init__(self, num_tasks: int) -> None:
+        self.num_tasks = num_tasks
+        self.finished: dict[int, float] = {}
+        self.failed: list[int] = []
+        self.messages: list[str] = []
+        self.all_done = threading.Event()
+        self.lock = threading.Lock()
+
+    def showMessage(self, msg: str) -> None:
+        self.messages.append(msg)
+
+    def showInformation(self, msg: str) -> None:
+        pass
+
+    def reportProgress(self, result: dict) -> None:
+        with self.lock:
+            if result["rate"] == 100:
+                self.finished[result["taskID"]] = time.perf_counter()
+            elif result["rate"] == -1:
+                self.failed.append(result["taskID"])
+            if len(self.finished) + len(self.failed) == self.num_tasks:
+                self.all_done.set()
+
+
+############################################################
+
+
+class TimingMixin:
+    """记录每个章节图片全部下载完成, 开始交给后处理进程保存的时间"""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.post_submitted: dict[int, float] = {}
+
+    def submitPostTask(self, curr_id: int, epi: Episode, imgs_path: list[str]) -> None:
+        self.post_submitted[curr_id] = time.perf_counter()
+        super().submitPostTask(curr_id, epi, imgs_path)
+
+
+class BenchDownloadManager(TimingMixin, DownloadManager):
+    pass
+
+
+class BenchAsyncDownloadManager(TimingMixin, AsyncDownloadManager):
+    pass
+
+
+############################################################
+
+
+def getPeakRss() -> dict[str, int | None]:
+    """获取本进程和已结束的子进程 (后处理进程池) 的峰值内存
+
+    Returns:
+        dict[str, int | None]: {"self": 字节数, "children": 字节数}, 不支持的平台为 None
+    """
+    try:
+        import resource
+    except ImportError:
+        return {"self": None, "children": None}
+    # ? Linux 上单位为KB, macOS 上单位为字节
+    unit = 1 if sys.platform == "darwin" else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit,
+    }
+
+
+############################################################
+
+
+def runScenario(args: argparse.Namespace) -> dict:
+    """解析并下载一部模拟漫画
+
+    Args:
+        args (argparse.Namespace): 场景参数
+
+    Returns:
+        dict: 各阶段耗时, 完成和失败的章节数以及峰值内存
+    """
+    if args.no_rate_limit:
+        for host in ("manga.bilibili.com", "www.biliplus.com", "127.0.0.1"):
+            RateLimiter.HOST_LIMITS[host] = UNLIMITED_HOST_LIMIT
+    adapter = MockRedirectAdapter(args.server_url, pool_maxsize=args.workers * args.page_workers)
+    for prefix in REDIRECT_PREFIXES:
+        getSession().mount(f"{prefix}/", adapter)
+
+    config = Config(
+        save_path=args.save_path,
+        save_method=args.save_method,
+        cookie="benchmark",
+        biliplus_cookie="benchmark",
+        num_thread=args.workers,
+        num_page_thread=args.page_workers,
+    )
+    comic_class = BiliPlusComic if args.source == "biliplus" else Comic
+    stages: dict[str, float] = {}
+
+    # ?###########################################################
+    # ? 解析漫画和章节
+    start = time.perf_counter()
+    comic = comic_class(args.comic, config, Reporter())
+    data = comic.getComicInfo(use_cache=False)
+    stages["comic_detail"] = time.perf_counter() - start
+    if not data:
+        return {"error": "获取漫画信息失败"}
+    os.makedirs(data["save_path"], exist_ok=True)
+
+    start = time.perf_counter()
+    episodes = [epi for epi in comic.getEpisodesInfo() if epi.isAvailable()]
+    stages["episode_list"] = time.perf_counter() - start
+
+    # ?###########################################################
+    # ? 下载全部已解锁章节, 保存由后处理进程完成
+    reporter = BenchReporter(len(episodes))
+    manager_class = BenchDownloadManager
+    if args.engine == "async":
+        if not AsyncDownloadManager.isSupported():
+            return {"error": "未安装 aiohttp, 无法使用异步下载引擎"}
+        manager_class = BenchAsyncDownloadManager
+    manager = manager_class(
+        max_workers=args.workers, reporter=reporter, max_page_workers=args.page_workers
+    )
+
+    start = time.perf_counter()
+    for epi in episodes:
+        manager.createEpisodeTask(epi)
+    if episodes:
+        reporter.all_done.wait()
+    end = time.perf_counter()
+
+    manager.shutdown(cancel=False)
+
+    stages["download"] = max(manager.post_submitted.values(), default=start) - start
+    save_times = [
+        reporter.finished[task_id] - submitted
+        for task_id, submitted in manager.post_submitted.items()
+        if task_id in reporter.finished
+    ]
+    stages["save_mean"] = sum(save_times) / len(save_times) if save_times else 0.0
+    stages["save_max"] = max(save_times, default=0.0)
+    stages["total"] = end - start
+
+    return {
+        "save_method": args.save_method,
+        "chapters": len(reporter.finished),
+        "received_bytes": manager.speed_meter.total_bytes,
+        "failed": len(reporter.failed),
+        "messages": reporter.messages[:5],
+        "stages": stages,
+        "peak_rss": getPeakRss(),
+        "metrics": json.loads(getMetrics().toJson()),
+    }
+
+
+############################################################
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="benchmarks.scenario", description="单个性能测试场景")
+    parser.add_argument("--server-url", required=True, help="模拟服务器的地址")
+    parser.add_argument("--save-path", required=True, help="保存目录")
+    parser.add_argument("--save-method", required=True, help="保存方式")
+    parser.add_argument("--comic", type=int, default=1, help="模拟漫画id")
+    parser.add_argument("--source", choices=["bilibili", "biliplus"], default="bilibili")
+    parser.add_argument("--engine", choices=["thread", "async"], default="thread")
+    parser.add_argument("--workers", type=int, default=8, help="同时下载的章节数")
+    parser.add_argument("--page-workers", type=int, default=4, help="单章同时下载的图片数")
+    parser.add_argument("--no-rate-limit", action="store_true", help="关闭按主机限速")
+    args = parser.parse_args()
+
+    print(json.dumps(runScenario(args), ensure_ascii=False), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
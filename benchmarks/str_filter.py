@@ -0,0 +1,157 @@
+"""
+myStrFilter 的微基准测试和等价性检查，与改用 str.translate 之前的逐个 re.sub 实现对比，
+先用随机字符串检查两者输出完全一致，再分别测量处理常见漫画名和章节名的耗时。
+例如：python -m benchmarks.str_filter --cases 100000 --exhaustive
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import timeit
+
+# ? 导入 src 会在用户数据目录下创建日志, 改用临时目录, 与 benchmarks.run 的子进程一致
+_temp_dir = tempfile.mkdtemp(prefix="bilibili-manga-bench-")
+os.environ["HOME"] = os.environ["APPDATA"] = _temp_dir
+atexit.register(shutil.rmtree, _temp_dir, ignore_errors=True)
+
+from src.Utils import STR_FILTER_TABLE, myStrFilter  # noqa: E402
+
+# ? 常见的漫画名和章节名, 包括需要替换的字符和首尾空白
+SAMPLES = [
+    "航海王",
+    "间谍过家家",
+    "第1话 开端",
+    "第103话 “你好, 世界” ",
+    "  特别篇 特别篇: 夏日祭?",
+    "1 第1话",
+    "Re:从零开始的异世界生活 第三章 Truth of Zero",
+    "咒术回战 第237话 人外魔境 <上>",
+    'Vol.12 "最终决战" | 后篇*',
+    "/斜杠开头与结尾\\",
+]
+
+
+def legacyStrFilter(s: str) -> str:
+    """改用 str.translate 之前的 myStrFilter, 作为等价性检查的基准
+
+    Args:
+        s (str): 待过滤的字符串
+
+    Returns:
+        str: 过滤后的字符串
+    """
+
+    s = re.sub(r"[\\/]", " ", s)
+    s = re.sub(r":", "：", s)
+    s = re.sub(r"\*", "⭐", s)
+    s = re.sub(r"\?", "？", s)
+    s = re.sub(r'"', "'", s)
+    s = re.sub(r"<", "《", s)
+    s = re.sub(r">", "》", s)
+    s = re.sub(r"\|", "丨", s)
+    s = re.sub(r"\s+$", "", s)
+    s = re.sub(r"^\s+", " ", s)
+    s = re.sub(r"\.", "·", s)
+
+    return s
+
+
+############################################################
+
+
+def buildAlphabet() -> list[str]:
+    """生成随机字符串使用的字符, 包括所有会被替换的字符、所有空白字符和普通文字
+
+    Returns:
+        list[str]: 字符列表
+    """
+    whitespace = [
+        chr(code)
+        for code in range(sys.maxunicode + 1)
+        if chr(code).isspace() or re.match(r"\s", chr(code))
+    ]
+    replaced = [chr(code) for code in STR_FILTER_TABLE]
+    return replaced + whitespace + list("aZ09-_·：《》漫画第话 ")
+
+
+############################################################
+
+
+def checkEquivalence(num_cases: int, seed: int, exhaustive: bool) -> list[str]:
+    """检查新旧实现对相同输入的输出是否一致
+
+    Args:
+        num_cases (int): 随机字符串的个数
+        seed (int): 随机数种子
+        exhaustive (bool): 是否额外检查每个码位单独出现以及被普通字符包围时的输出
+
+    Returns:
+        list[str]: 输出不一致的输入, 全部一致时为空
+    """
+    rng = random.Random(seed)
+    alphabet = buildAlphabet()
+    cases = list(SAMPLES)
+    cases += ["".join(rng.choices(alphabet, k=rng.randint(0, 12))) for _ in range(num_cases)]
+    if exhaustive:
+        for code in range(sys.maxunicode + 1):
+            c = chr(code)
+            cases += [c, f"a{c}", f"{c}a", f"a{c}b"]
+    return [case for case in cases if myStrFilter(case) != legacyStrFilter(case)]
+
+
+############################################################
+
+
+def benchmark(func, number: int) -> float:
+    """测量处理一遍 SAMPLES 中每个字符串的平均耗时
+
+    Args:
+        func (Callable[[str], str]): 被测函数
+        number (int): 重复次数
+
+    Returns:
+        float: 每次调用的平均耗时, 单位为微秒
+    """
+    timer = timeit.Timer(lambda: [func(sample) for sample in SAMPLES])
+    best = min(timer.repeat(repeat=5, number=number))
+    return best / number / len(SAMPLES) * 1e6
+
+
+############################################################
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="benchmarks.str_filter", description="myStrFilter 微基准测试和等价性检查"
+    )
+    parser.add_argument("--cases", type=int, default=100000, help="随机字符串的个数")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    parser.add_argument("--exhaustive", action="store_true", help="额外检查所有码位, 需要数十秒")
+    parser.add_argument("--number", type=int, default=2000, help="每轮计时重复的次数")
+    args = parser.parse_args()
+
+    mismatches = checkEquivalence(args.cases, args.seed, args.exhaustive)
+    if mismatches:
+        print(f"输出不一致: {len(mismatches)} 个输入, 例如:")
+        for case in mismatches[:10]:
+            print(f"    {case!r}: {myStrFilter(case)!r} ≠ {legacyStrFilter(case)!r}")
+        return 1
+    print("输出一致")
+
+    legacy = benchmark(legacyStrFilter, args.number)
+    current = benchmark(myStrFilter, args.number)
+    print(f"re.sub 实现:       {legacy:.2f} 微秒/次")
+    print(f"str.translate 实现: {current:.2f} 微秒/次")
+    print(f"加速: {legacy / current:.2f} 倍")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
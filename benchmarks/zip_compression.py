@@ -0,0 +1,192 @@
+"""
+Zip/Cbz 压缩方式的基准测试，与加入压缩方式设置之前统一使用默认级别 deflate 的写法对比，
+先检查每种压缩方式写出的压缩包解压后与原始图片完全一致，再分别测量写入一个章节的耗时和压缩包大小。
+例如：python -m benchmarks.zip_compression --pages 60 --page-size 350
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import timeit
+from types import SimpleNamespace
+from zipfile import ZIP_DEFLATED, ZipFile
+
+# ? 导入 src 会在用户数据目录下创建日志, 改用临时目录, 与 benchmarks.run 的子进程一致
+_temp_dir = tempfile.mkdtemp(prefix="bilibili-manga-bench-")
+os.environ["HOME"] = os.environ["APPDATA"] = _temp_dir
+atexit.register(shutil.rmtree, _temp_dir, ignore_errors=True)
+
+from src.Episode import ZIP_COMPRESSION, Episode  # noqa: E402
+
+# ? 设置中的压缩方式, auto 为默认值
+MODES = ["auto", *ZIP_COMPRESSION]
+COMIC_INFO = (
+    '<?xml version="1.0" encoding="utf-8"?>\n<ComicInfo>'
+    + "<Title>第1话 开端</Title><Series>航海王</Series><Writer>尾田荣一郎</Writer>" * 4
+    + "</ComicInfo>"
+)
+
+
+def loadPages(images_dir: str | None, num_pages: int, page_size: int, seed: int) -> list:
+    """准备写入压缩包的图片
+
+    Args:
+        images_dir (str | None): 图片文件夹, 例如以“文件夹-图片”方式下载的章节, 为 None 时使用随机数据
+        num_pages (int): 随机图片的张数
+        page_size (int): 随机图片的大小, 单位为 KB
+        seed (int): 随机数种子
+
+    Returns:
+        list[tuple[str, bytes]]: (扩展名, 图片内容) 列表
+    """
+    if images_dir is not None:
+        pages = []
+        for name in sorted(os.listdir(images_dir)):
+            img_format = name.split(".")[-1]
+            if img_format.lower() in ("jpg", "jpeg", "png", "webp", "gif", "avif"):
+                with open(os.path.join(images_dir, name), "rb") as f:
+                    pages.append((img_format, f.read()))
+        return pages
+    # ? 随机数据与 jpg 一样几乎无法再压缩
+    rng = random.Random(seed)
+    return [("jpg", rng.randbytes(page_size * 1024)) for _ in range(num_pages)]
+
+
+############################################################
+
+
+def writeLegacy(pages: list) -> bytes:
+    """加入压缩方式设置之前的写法, 所有文件都使用默认级别的 deflate
+
+    Args:
+        pages (list[tuple[str, bytes]]): (扩展名, 图片内容) 列表
+
+    Returns:
+        bytes: 压缩包内容
+    """
+    buffer = io.BytesIO()
+    with ZipFile(buffer, "w", compression=ZIP_DEFLATED) as z:
+        for index, (img_format, img) in enumerate(pages, start=1):
+            z.writestr(f"{str(index).zfill(3)}.{img_format}", img)
+        z.writestr("ComicInfo.xml", COMIC_INFO)
+    return buffer.getvalue()
+
+
+############################################################
+
+
+def writeWithMode(pages: list, mode: str) -> bytes:
+    """按设置中的压缩方式写入, 每个文件的压缩方式由 Episode.getZipCompression 决定
+
+    Args:
+        pages (list[tuple[str, bytes]]): (扩展名, 图片内容) 列表
+        mode (str): 压缩方式
+
+    Returns:
+        bytes: 压缩包内容
+    """
+    # ? getZipCompression 只用到 zip_compression, 不需要构造完整的章节
+    epi = SimpleNamespace(zip_compression=mode)
+    buffer = io.BytesIO()
+    with ZipFile(buffer, "w", compression=ZIP_DEFLATED) as z:
+        for index, (img_format, img) in enumerate(pages, start=1):
+            compress_type, compress_level = Episode.getZipCompression(epi, img_format)
+            z.writestr(
+                f"{str(index).zfill(3)}.{img_format}",
+                img,
+                compress_type=compress_type,
+                compresslevel=compress_level,
+            )
+        compress_type, compress_level = Episode.getZipCompression(epi, "xml")
+        z.writestr(
+            "ComicInfo.xml", COMIC_INFO, compress_type=compress_type, compresslevel=compress_level
+        )
+    return buffer.getvalue()
+
+
+############################################################
+
+
+def checkContent(pages: list, archive: bytes) -> bool:
+    """检查压缩包解压后的文件名和内容是否与原始图片一致
+
+    Args:
+        pages (list[tuple[str, bytes]]): (扩展名, 图片内容) 列表
+        archive (bytes): 压缩包内容
+
+    Returns:
+        bool: 是否一致
+    """
+    expected = {f"{str(index).zfill(3)}.{fmt}": img for index, (fmt, img) in enumerate(pages, 1)}
+    expected["ComicInfo.xml"] = COMIC_INFO.encode()
+    with ZipFile(io.BytesIO(archive)) as z:
+        if z.testzip() is not None or set(z.namelist()) != expected.keys():
+            return False
+        return all(z.read(name) == content for name, content in expected.items())
+
+
+############################################################
+
+
+def benchmark(func, repeat: int) -> tuple[float, int]:
+    """测量写入一个压缩包的最短耗时
+
+    Args:
+        func (Callable[[], bytes]): 被测函数
+        repeat (int): 重复次数
+
+    Returns:
+        tuple[float, int]: (耗时, 单位为毫秒; 压缩包大小, 单位为字节)
+    """
+    size = len(func())
+    best = min(timeit.repeat(func, repeat=repeat, number=1))
+    return best * 1000, size
+
+
+############################################################
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="benchmarks.zip_compression", description="Zip/Cbz 压缩方式基准测试"
+    )
+    parser.add_argument("--pages", type=int, default=60, help="随机图片的张数")
+    parser.add_argument("--page-size", type=int, default=350, help="随机图片的大小, 单位为 KB")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    parser.add_argument("--images", default=None, help="使用文件夹中的真实图片代替随机数据")
+    parser.add_argument("--repeat", type=int, default=5, help="每种写法计时的次数")
+    args = parser.parse_args()
+
+    pages = loadPages(args.images, args.pages, args.page_size, args.seed)
+    if not pages:
+        print("没有找到图片")
+        return 1
+    writers = {"旧实现 (deflate 6)": lambda: writeLegacy(pages)}
+    writers.update({mode: (lambda mode=mode: writeWithMode(pages, mode)) for mode in MODES})
+
+    mismatches = [name for name, func in writers.items() if not checkContent(pages, func())]
+    if mismatches:
+        print(f"解压后内容不一致: {', '.join(mismatches)}")
+        return 1
+    print(f"内容一致, {len(pages)} 张图片, 共 {sum(len(img) for _, img in pages) / 2**20:.2f} MB")
+
+    legacy_ms, legacy_size = benchmark(writers.pop("旧实现 (deflate 6)"), args.repeat)
+    print(f"{'旧实现 (deflate 6)':<16} {legacy_ms:8.1f} 毫秒  {legacy_size / 2**20:7.2f} MB")
+    for mode, func in writers.items():
+        elapsed_ms, size = benchmark(func, args.repeat)
+        print(
+            f"{mode:<16} {elapsed_ms:8.1f} 毫秒  {size / 2**20:7.2f} MB  "
+            f"加速: {legacy_ms / elapsed_ms:.2f} 倍"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
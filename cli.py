@@ -0,0 +1,368 @@
+"""
+这是哔哩哔哩漫画下载器的命令行入口，不依赖Qt，可以在服务器或者定时任务中批量下载漫画。
+例如：python -m cli download --comic 12345 --eps 1-200 --workers 32
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+from multiprocessing import freeze_support
+from typing import Callable
+
+from src.AsyncDownloadManager import AsyncDownloadManager
+from src.Comic import Comic
+from src.Config import Config
+from src.DownloadManager import DownloadManager
+from src.Episode import Episode
+from src.LibraryDB import getLibraryDB
+from src.LibraryUpdater import LibraryUpdater
+from src.Metrics import getMetrics, startMetricsServer
+from src.Reporter import Reporter
+from src.Utils import data_path, logger
+
+SAVE_METHODS = ["PDF", "文件夹-图片", "7z压缩包", "Zip压缩包", "Cbz压缩包"]
+
+
+class CliReporter(Reporter):
+    """命令行模式的报告接口，--json 模式下每行输出一个JSON对象，否则输出文本"""
+
+    def __init__(self, json_output: bool) -> None:
+        self.json_output = json_output
+        self.print_lock = threading.Lock()
+        self.progress_callback: Callable[[dict], None] = None
+
+    ############################################################
+
+    def printEvent(self, event: dict, text: str, file=sys.stdout) -> None:
+        """输出一条事件
+
+        Args:
+            event (dict): 事件内容
+            text (str): 事件的文本形式
+            file: 文本模式下的输出流
+        """
+        with self.print_lock:
+            if self.json_output:
+                print(json.dumps(event, ensure_ascii=False), flush=True)
+            else:
+                print(text, file=file, flush=True)
+
+    ############################################################
+
+    def showMessage(self, msg: str) -> None:
+        self.printEvent({"event": "message", "message": msg}, msg, sys.stderr)
+
+    def showInformation(self, msg: str) -> None:
+        self.printEvent({"event": "information", "message": msg}, msg)
+
+    def reportProgress(self, result: dict) -> None:
+        if self.progress_callback is not None:
+            self.progress_callback(result)
+
+
+############################################################
+
+
+def loadConfig() -> dict:
+    """读取图形界面保存的配置文件, 以便共用 Cookie 和保存设置
+
+    Returns:
+        dict: 配置内容, 读取失败时返回空字典
+    """
+    config_path = os.path.join(data_path, "config.json")
+    if not os.path.exists(config_path):
+        return {}
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"读取配置文件失败 - 目录:{config_path}\n{e}")
+        return {}
+
+
+############################################################
+
+
+def parseEpisodeRange(spec: str) -> set[int]:
+    """解析章节范围, 序号与图形界面章节列表中的顺序一致, 从1开始
+
+    Args:
+        spec (str): 章节范围, 例如 "1-10,15,20-30"
+
+    Returns:
+        set[int]: 章节序号集合
+    """
+    result = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            result.update(range(int(start), int(end) + 1))
+        else:
+            result.add(int(part))
+    return result
+
+
+############################################################
+
+
+def buildConfig(args: argparse.Namespace, library_paths: dict[int, str] = None) -> Config:
+    """合并配置文件和命令行参数, 命令行参数优先
+
+    Args:
+        args (argparse.Namespace): 命令行参数
+        library_paths (dict): 我的库存中漫画id到保存目录的映射
+
+    Returns:
+        Config: 设置快照
+    """
+    config = loadConfig()
+    config["save_path"] = args.save_path or config.get("save_path") or os.getcwd()
+    config["save_method"] = args.save_method or config.get("save_method")
+    config["cookie"] = args.cookie or config.get("cookie")
+    config["num_thread"] = args.workers or config.get("num_thread")
+    config["num_page_thread"] = args.page_workers or config.get("num_page_thread")
+    return Config.fromDict(config, library_paths)
+
+
+############################################################
+
+
+def download(args: argparse.Namespace) -> int:
+    """下载漫画章节
+
+    Args:
+        args (argparse.Namespace): 命令行参数
+
+    Returns:
+        int: 退出码, 有章节下载失败时为1
+    """
+    config = buildConfig(args)
+    reporter = CliReporter(args.json)
+
+    # ?###########################################################
+    # ? 解析漫画和章节
+    comic = Comic(args.comic, config, reporter)
+    data = comic.getComicInfo(use_cache=False)
+    if not data:
+        reporter.printEvent(
+            {"event": "error", "message": "获取漫画信息失败"},
+            f"漫画id:{args.comic} 获取漫画信息失败! 请检查网络连接和Cookie",
+            sys.stderr,
+        )
+        return 1
+    if not os.path.exists(data["save_path"]):
+        os.makedirs(data["save_path"])
+    if not os.path.exists(os.path.join(data["save_path"], "元数据.json")):
+        comic.saveMeta()
+
+    episodes = comic.getEpisodesInfo()
+    if args.eps:
+        selected = parseEpisodeRange(args.eps)
+        episodes = [epi for epi in episodes if epi.real_ord in selected]
+    episodes = [epi for epi in episodes if epi.isAvailable() and not epi.isDownloaded()]
+    if not episodes:
+        reporter.printEvent({"event": "done", "finished": 0, "failed": 0}, "没有需要下载的章节")
+        return 0
+
+    return runEpisodes(episodes, config, reporter, args)
+
+
+############################################################
+
+
+def sync(args: argparse.Namespace) -> int:
+    """增量更新我的库存中的所有漫画, 可选下载新章节
+
+    Args:
+        args (argparse.Namespace): 命令行参数
+
+    Returns:
+        int: 退出码, 有漫画更新失败或章节下载失败时为1
+    """
+    save_path = buildConfig(args).save_path
+    library_db = getLibraryDB()
+    comics = library_db.getComics(save_path)
+    if not comics:
+        library_db.importLegacyMeta(save_path)
+        comics = library_db.getComics(save_path)
+
+    library_paths = {comic_id: info["comic_path"] for comic_id, info in comics.items()}
+    config = buildConfig(args, library_paths)
+    reporter = CliReporter(args.json)
+    updater = LibraryUpdater(config, reporter, library_db)
+
+    # ?###########################################################
+    # ? 逐部更新, 只解析新增的章节
+    to_download: list[Episode] = []
+    failed: list[int] = []
+    for comic_id, info in comics.items():
+        result = updater.updateComic(comic_id)
+        if result is None:
+            failed.append(comic_id)
+            reporter.printEvent(
+                {"event": "error", "comic_id": comic_id, "message": "获取漫画信息失败"},
+                f"《{info['comic_name']}》获取漫画信息失败!",
+                sys.stderr,
+            )
+            continue
+        to_download.extend(result["to_download"])
+        reporter.printEvent(
+            {
+                "event": "synced",
+                "comic_id": comic_id,
+                "new_episodes": [epi.title for epi in result["new_episodes"]],
+                "num_downloaded": result["num_downloaded"],
+                "num_episodes": result["num_episodes"],
+            },
+            f"《{info['comic_name']}》{result['num_downloaded']}/{result['num_episodes']}"
+            + (f"  新章节: {len(result['new_episodes'])}" if result["new_episodes"] else ""),
+        )
+
+    reporter.printEvent(
+        {"event": "sync_done", "comics": len(comics), "failed": len(failed)},
+        f"库存更新结束, 漫画数: {len(comics)}, 失败: {len(failed)}, 可下载的新章节: {len(to_download)}",
+    )
+    if args.download and to_download:
+        return runEpisodes(to_download, config, reporter, args) or (1 if failed else 0)
+    return 1 if failed else 0
+
+
+############################################################
+
+
+def runEpisodes(
+    episodes: list[Episode], config: Config, reporter: CliReporter, args: argparse.Namespace
+) -> int:
+    """下载章节并等待全部结束, 进度由下载管理器通过 reporter 回调报告
+
+    Args:
+        episodes (list[Episode]): 要下载的章节
+        config (Config): 设置快照
+        reporter (CliReporter): 输出进度的接口
+        args (argparse.Namespace): 命令行参数
+
+    Returns:
+        int: 退出码, 有章节下载失败时为1, 被中断时为130
+    """
+    titles: dict[int, str] = {}
+    finished: list[int] = []
+    failed: list[int] = []
+    all_done = threading.Event()
+
+    def onProgress(result: dict) -> None:
+        task_id, rate = result["taskID"], result["rate"]
+        title = titles.get(task_id, "")
+        if rate == 100:
+            finished.append(task_id)
+        elif rate == -1:
+            failed.append(task_id)
+        if args.json:
+            reporter.printEvent({"event": "progress", "title": title, **result}, "")
+        elif rate in (-1, 100):
+            status = "完成" if rate == 100 else "失败"
+            reporter.printEvent(
+                {},
+                f"[{len(finished) + len(failed)}/{len(episodes)}] {title} {status}"
+                f"  {manager.getTotalSpeedStr()}  剩余时间：{manager.getTotalRemainedTimeStr()}",
+            )
+        if len(finished) + len(failed) >= len(episodes):
+            all_done.set()
+
+    manager_class = DownloadManager
+    if args.async_engine:
+        if AsyncDownloadManager.isSupported():
+            manager_class = AsyncDownloadManager
+        else:
+            logger.warning("未安装 aiohttp, 无法使用异步下载引擎, 已退回多线程下载引擎")
+    reporter.progress_callback = onProgress
+    if args.metrics_port:
+        startMetricsServer(args.metrics_port)
+        logger.info(f"各阶段耗时统计: http://127.0.0.1:{args.metrics_port}/metrics")
+    manager = manager_class(
+        max_workers=config.num_thread,
+        max_page_workers=config.num_page_thread,
+        reporter=reporter,
+    )
+
+    comic_names = list(dict.fromkeys(epi.comic_name for epi in episodes))
+    reporter.printEvent(
+        {"event": "start", "comics": comic_names, "episodes": len(episodes)},
+        f"开始下载《{'》《'.join(comic_names)}》, 章节数: {len(episodes)}",
+    )
+    for epi in episodes:
+        titles[manager.createEpisodeTask(epi)] = f"《{epi.comic_name}》{epi.title}"
+
+    try:
+        while not all_done.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        manager.shutdown()
+        return 130
+    manager.shutdown(cancel=False)
+
+    reporter.printEvent(
+        {"event": "done", "finished": len(finished), "failed": len(failed)},
+        f"下载结束, 成功: {len(finished)}, 失败: {len(failed)}",
+    )
+    if args.metrics_json:
+        with open(args.metrics_json, "w", encoding="utf-8") as f:
+            f.write(getMetrics().toJson())
+    return 1 if failed else 0
+
+
+############################################################
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="cli", description="哔哩哔哩漫画下载器 命令行模式")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    parser_download = subparsers.add_parser("download", help="下载漫画章节")
+    parser_download.add_argument("--comic", type=int, required=True, help="漫画id")
+    parser_download.add_argument("--eps", help='章节范围, 例如 "1-10,15", 默认下载全部章节')
+    parser_download.add_argument("--workers", type=int, help="同时下载的章节数")
+    parser_download.add_argument("--page-workers", type=int, help="单章同时下载的图片数")
+    parser_download.add_argument("--save-path", help="保存目录, 默认沿用图形界面的设置")
+    parser_download.add_argument("--save-method", choices=SAVE_METHODS, help="保存方式")
+    parser_download.add_argument("--cookie", help="SESSDATA, 默认沿用图形界面的设置")
+    parser_download.add_argument(
+        "--async", dest="async_engine", action="store_true", help="使用异步下载引擎"
+    )
+    parser_download.add_argument("--json", action="store_true", help="以JSON行的形式输出进度")
+    parser_download.add_argument(
+        "--metrics-port", type=int, help="在本机指定端口提供 Prometheus 格式的各阶段耗时统计"
+    )
+    parser_download.add_argument("--metrics-json", help="下载结束后把各阶段耗时统计写入JSON文件")
+
+    parser_sync = subparsers.add_parser("sync", help="增量更新我的库存中的所有漫画")
+    parser_sync.add_argument("--download", action="store_true", help="下载更新后发现的新章节")
+    parser_sync.add_argument("--workers", type=int, help="同时下载的章节数")
+    parser_sync.add_argument("--page-workers", type=int, help="单章同时下载的图片数")
+    parser_sync.add_argument("--save-path", help="库存目录, 默认沿用图形界面的设置")
+    parser_sync.add_argument("--save-method", choices=SAVE_METHODS, help="保存方式")
+    parser_sync.add_argument("--cookie", help="SESSDATA, 默认沿用图形界面的设置")
+    parser_sync.add_argument(
+        "--async", dest="async_engine", action="store_true", help="使用异步下载引擎"
+    )
+    parser_sync.add_argument("--json", action="store_true", help="以JSON行的形式输出进度")
+    parser_sync.add_argument(
+        "--metrics-port", type=int, help="在本机指定端口提供 Prometheus 格式的各阶段耗时统计"
+    )
+    parser_sync.add_argument("--metrics-json", help="下载结束后把各阶段耗时统计写入JSON文件")
+
+    args = parser.parse_args()
+    if args.command == "download":
+        return download(args)
+    if args.command == "sync":
+        return sync(args)
+    return 0
+
+
+if __name__ == "__main__":
+    freeze_support()
+    sys.exit(main())
@@ -0,0 +1,399 @@
+"""
+该模块包含了基于 asyncio 的下载管理器类，所有章节的图片请求都在同一个事件循环中并发进行
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlparse
+
+from src.DownloadManager import DownloadManager
+from src.DownloadQueue import STATUS_ACTIVE, DownloadQueue
+from src.Episode import Episode
+from src.Metrics import STAGE_CHECKSUM, STAGE_PAGE_GET, STAGE_THROTTLE, getMetrics
+from src.RateLimiter import getHostLimiter, isThrottled
+from src.Reporter import Reporter
+from src.Throughput import TaskTransfer
+from src.TokenScheduler import TokenScheduler
+from src.Utils import (
+    MAX_RETRY_LARGE,
+    RETRY_WAIT_EX,
+    STREAM_CHUNK_SIZE,
+    TIMEOUT_LARGE,
+    TIMEOUT_SMALL,
+    isCheckSumValid,
+    logger,
+)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncDownloadManager(DownloadManager):
+    """异步下载管理器类，与 DownloadManager 接口一致
+
+    图片请求由一个后台线程中的事件循环统一调度，并发量取决于连接数而不是线程数；
+    获取图片列表等阻塞操作仍交给线程池执行, 写入临时图片等磁盘操作交给事件循环的默认线程池,
+    保存章节交给后处理进程池
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        reporter: Reporter,
+        max_page_workers: int = 4,
+        download_queue: DownloadQueue = None,
+    ) -> None:
+        super().__init__(max_workers, reporter, max_page_workers, download_queue)
+        self.max_connections = max_workers * self.max_page_workers
+        self.session = None
+        # ? 与多线程引擎一致, 同时进行的章节数不超过 max_workers, 其余章节排队等待,
+        # ? 避免所有章节同时获取图片列表, 并同时把Zip和Cbz格式的图片保存在内存中
+        self.episode_semaphore = asyncio.Semaphore(max_workers)
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    ############################################################
+
+    @staticmethod
+    def isSupported() -> bool:
+        """判断当前环境是否安装了异步引擎所需的 aiohttp
+
+        Returns:
+            bool: 是否可以使用异步下载引擎
+        """
+        return aiohttp is not None
+
+    ############################################################
+
+    def submitEpisodeTask(self, curr_id: int, epi: Episode) -> Future:
+        """将章节任务提交到事件循环中执行
+
+        Args:
+            curr_id (int): 当前任务的ID
+            epi (Episode): 要下载的章节
+
+        Returns:
+            Future: 章节任务的 Future
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self.__async__queuedEpisodeTask(curr_id, epi), self.loop
+        )
+
+    ############################################################
+
+    async def __async__queuedEpisodeTask(self, curr_id: int, epi: Episode) -> None:
+        """等待空闲的章节名额后再下载章节
+
+        Args:
+            curr_id (int): 当前任务的ID
+            epi (Episode): 要下载的章节
+        """
+        async with self.episode_semaphore:
+            if self.terminated:
+                return
+            await self.__async__EpisodeTask(curr_id, epi)
+
+    ############################################################
+
+    def getAsyncSession(self) -> "aiohttp.ClientSession":
+        """获取事件循环内共享的 aiohttp 会话, 只能在事件循环线程中调用
+
+        Returns:
+            aiohttp.ClientSession: 共享会话
+        """
+        if self.session is None:
+            if self.terminated:
+                # ? 退出时会话已经关闭, 不再创建新的会话, 按连接错误处理
+                raise aiohttp.ClientConnectionError("下载引擎已停止")
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections, limit_per_host=self.max_connections
+                ),
+                cookie_jar=aiohttp.DummyCookieJar(),
+                # ? 排队等待连接的时间不计入超时, 只限制建立连接和读取数据的时间
+                timeout=aiohttp.ClientTimeout(
+                    total=None, sock_connect=TIMEOUT_LARGE, sock_read=TIMEOUT_LARGE
+                ),
+            )
+        return self.session
+
+    ############################################################
+
+    def shutdown(self, cancel: bool = True) -> None:
+        """停止下载引擎, 并在事件循环中关闭共享的 aiohttp 会话
+
+        Args:
+            cancel (bool): 是否终止进行中的任务并取消排队的任务, 为 False 时等待所有任务结束
+        """
+        super().shutdown(cancel)
+        try:
+            asyncio.run_coroutine_threadsafe(self.__async__closeSession(), self.loop).result(
+                timeout=TIMEOUT_SMALL
+            )
+        except TimeoutError:
+            logger.warning("关闭异步下载会话超时")
+
+    ############################################################
+
+    async def __async__closeSession(self) -> None:
+        """关闭共享的 aiohttp 会话, 进行中的请求会以连接错误结束"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    ############################################################
+
+    async def __async__EpisodeTask(self, curr_id: int, epi: Episode) -> None:
+        """下载漫画章节的协程, 包括下载图片和保存图片任务
+
+        Args:
+            curr_id (int): 当前任务的ID
+            epi (Episode): 要下载的章节
+        """
+        loop = asyncio.get_running_loop()
+        self.updateQueueStatus(epi.id, STATUS_ACTIVE)
+
+        # ?###########################################################
+        # ? 初始化下载图片需要的参数
+        if not await loop.run_in_executor(self.executor, self.token_batcher.initImgsList, epi):
+            self.reportError(curr_id)
+            return
+
+        # ?###########################################################
+        # ? 断点续传, 跳过上次已经下载并校验过的图片
+        num_imgs = len(epi.imgs_token)
+        if num_imgs == 0:
+            logger.error(f"《{epi.comic_name}》章节：{epi.title} 图片列表为空, 跳过!")
+            self.reporter.showMessage(
+                f"《{epi.comic_name}》章节：{epi.title} 获取到的图片列表为空!\n已暂时跳过此章节!\n请重新尝试或者重启软件!\n\n更多详细信息请查看日志文件, 或联系开发者！"
+            )
+            self.reportError(curr_id)
+            return
+        imgs_path: list[str | None] = [None] * num_imgs
+        resumed = await loop.run_in_executor(self.executor, epi.loadManifest)
+        for index, img_path in resumed.items():
+            imgs_path[index - 1] = img_path
+        if len(resumed) == num_imgs:
+            self.submitPostTask(curr_id, epi, imgs_path)
+            return
+        self.updateTaskInfo(curr_id, len(resumed) / num_imgs, num_imgs - len(resumed))
+
+        # ?###########################################################
+        # ? 并发下载剩余图片, 按图片序号存放路径以保证保存时的顺序
+        # ? 图片按序号创建任务, 同时下载的图片数不超过 max_page_workers,
+        # ? 拿到名额后才从调度器中取用token, 过期的token会先重新获取
+        token_scheduler = TokenScheduler(epi, resumed)
+        transfer = self.all_tasks[curr_id]["transfer"]
+        page_semaphore = asyncio.Semaphore(self.max_page_workers)
+        tasks = [
+            asyncio.create_task(
+                self.__async__downloadImg(epi, index, token_scheduler, transfer, page_semaphore)
+            )
+            for index in range(1, num_imgs + 1)
+            if index not in resumed
+        ]
+
+        for num_finished, task in enumerate(asyncio.as_completed(tasks), start=len(resumed) + 1):
+            index, img_path = await task
+            if self.terminated:
+                imgs_downloaded = list(resumed.values()) + await self.__stopPageTasks(tasks)
+                await loop.run_in_executor(None, epi.suspend, imgs_downloaded)
+                return
+            if img_path is None:
+                self.reportError(curr_id)
+                imgs_downloaded = list(resumed.values()) + await self.__stopPageTasks(tasks)
+                await loop.run_in_executor(None, epi.clearAfterSave, imgs_downloaded)
+                return
+
+            imgs_path[index - 1] = img_path
+
+            # ? 以完成的图片数计算进度, 保证进度单调递增
+            rate = num_finished / num_imgs
+
+            # ?###########################################################
+            # ? 保存图片, 交给后处理进程池, 保存完成后才会更新为100%
+            if rate == 1:
+                self.submitPostTask(curr_id, epi, imgs_path)
+                return
+
+            self.updateTaskInfo(curr_id, rate, num_imgs - num_finished)
+            self.reporter.reportProgress({"taskID": curr_id, "rate": int(rate * 100), "path": None})
+
+    ############################################################
+
+    async def __stopPageTasks(self, tasks: list[asyncio.Task]) -> list[str]:
+        """取消章节内尚未完成的图片下载
+
+        Args:
+            tasks (list): 图片下载任务列表
+
+        Returns:
+            list: 已经下载到本地的临时图片路径列表
+        """
+        for task in tasks:
+            task.cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        return [result[1] for result in results if isinstance(result, tuple) and result[1]]
+
+    ############################################################
+
+    async def __async__downloadImg(
+        self,
+        epi: Episode,
+        index: int,
+        token_scheduler: TokenScheduler,
+        transfer: TaskTransfer,
+        page_semaphore: asyncio.Semaphore,
+    ) -> tuple[int, str | None]:
+        """等待章节内空闲的图片名额后下载图片
+
+        Args:
+            epi (Episode): 图片所属章节
+            index (int): 章节中图片的序号
+            token_scheduler (TokenScheduler): 章节的token调度器
+            transfer (TaskTransfer): 章节任务的字节统计
+            page_semaphore (asyncio.Semaphore): 章节内同时下载图片数的限制
+
+        Returns:
+            tuple[int, str | None]: (图片序号, 图片的保存路径)
+        """
+        async with page_semaphore:
+            return await self.__async__retryDownloadImg(epi, index, token_scheduler, transfer)
+
+    ############################################################
+
+    async def __async__retryDownloadImg(
+        self, epi: Episode, index: int, token_scheduler: TokenScheduler, transfer: TaskTransfer
+    ) -> tuple[int, str | None]:
+        """根据 url 和 token 下载图片, 重试策略与 Episode.downloadImg 保持一致
+
+        Args:
+            epi (Episode): 图片所属章节
+            index (int): 章节中图片的序号
+            token_scheduler (TokenScheduler): 章节的token调度器
+            transfer (TaskTransfer): 章节任务的字节统计
+
+        Returns:
+            tuple[int, str | None]: (图片序号, 图片的保存路径)
+        """
+        loop = asyncio.get_running_loop()
+        start_time = time.monotonic()
+        attempt = 0
+
+        while True:
+            # ? 退出时共享会话会被关闭, 不再重试, 由章节协程保存断点续传清单
+            if self.terminated:
+                return index, None
+            error = None
+            # ? 重新获取token是阻塞的网络请求, 由调度器交给线程池, 其他协程在事件循环中等待
+            img_url = await token_scheduler.getImgUrlAsync(index, self.executor)
+            try:
+                result = await self.__async__fetchImg(
+                    epi, index, img_url, token_scheduler, transfer
+                )
+                if result is not None:
+                    break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+
+            elapsed = (time.monotonic() - start_time) * 1000
+            if elapsed > MAX_RETRY_LARGE:
+                logger.error(
+                    f"《{epi.comic_name}》章节：{epi.title} - {index} - {img_url} 重复下载图片多次后失败!\n{error}"
+                )
+                self.reporter.showMessage(
+                    f"《{epi.comic_name}》章节：{epi.title} 重复下载图片多次后失败!\n已暂时跳过此章节!\n请检查网络连接或者重启软件!\n\n更多详细信息请查看日志文件, 或联系开发者！"
+                )
+                return index, None
+
+            # ? 退避时间不超过剩余的重试时间, 与 retrying 的 stop_max_delay 一致
+            attempt += 1
+            await asyncio.sleep(min(RETRY_WAIT_EX * 2**attempt, MAX_RETRY_LARGE - elapsed) / 1000)
+
+        token_scheduler.markFinished(index)
+        transfer.finishPage(len(result[0]))
+        # ? 写入临时文件是阻塞的磁盘操作, 交给事件循环的默认线程池
+        return index, await loop.run_in_executor(None, epi.saveImg, index, img_url, *result)
+
+    ############################################################
+
+    async def __async__fetchImg(
+        self,
+        epi: Episode,
+        index: int,
+        img_url: str,
+        token_scheduler: TokenScheduler,
+        transfer: TaskTransfer,
+    ) -> tuple[bytes, str] | None:
+        """请求一次图片并校验 Checksum
+
+        Args:
+            epi (Episode): 图片所属章节
+            index (int): 章节中图片的序号
+            img_url (str): 图片的合法 url
+            token_scheduler (TokenScheduler): 章节的token调度器, 服务器拒绝token时通知它重新获取
+            transfer (TaskTransfer): 章节任务的字节统计, 每收到一块数据就更新
+
+        Returns:
+            tuple[bytes, str] | None: (图片内容, 图片的MD5), 状态码或 Checksum 不正确时返回 None
+        """
+        host = urlparse(img_url).hostname
+        limiter = getHostLimiter(host)
+        wait_start = time.monotonic()
+        start_time = await limiter.acquireAsync()
+        getMetrics().observe(STAGE_THROTTLE, start_time - wait_start, host)
+        success, retry_after, latency = False, None, None
+        try:
+            async with self.getAsyncSession().get(img_url) as res:
+                # ? 与多线程引擎一致, 自适应并发按收到响应头的耗时调整
+                latency = time.monotonic() - start_time
+                if res.status != 200:
+                    success = not isThrottled(res.status)
+                    if res.status == 429:
+                        retry_after = res.headers.get("Retry-After")
+                    if res.status in (401, 403):
+                        token_scheduler.invalidate(index)
+                    logger.warning(
+                        f"《{epi.comic_name}》章节：{epi.title} - {index} - {img_url} 获取图片 header 失败! "
+                        f"状态码：{res.status}, 理由: {res.reason} 重试中..."
+                    )
+                    return None
+                chunks = []
+                async for chunk in res.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    chunks.append(chunk)
+                    transfer.addChunk(len(chunk))
+                img = b"".join(chunks)
+                etag = res.headers.get("Etag")
+                success = True
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(
+                f"《{epi.comic_name}》章节：{epi.title} - {index} - {img_url} 下载图片失败! 重试中...\n{e}"
+            )
+            raise e
+        finally:
+            limiter.release(start_time, success, retry_after, latency)
+            # ? 与多线程引擎一致, 网络耗时包含等待限速器的时间
+            getMetrics().observe(STAGE_PAGE_GET, time.monotonic() - wait_start, host)
+
+        if etag is None:
+            # ? 服务器没有返回 Etag 时无法校验, 只要下载完整就直接使用
+            logger.warning(
+                f"《{epi.comic_name}》章节：{epi.title} - {index} - {img_url} - 响应中没有 Etag, 跳过校验"
+            )
+            return img, hashlib.md5(img).hexdigest()
+        with getMetrics().timer(STAGE_CHECKSUM, host):
+            isValid, md5 = isCheckSumValid(etag, img)
+        if not isValid:
+            logger.warning(
+                f"《{epi.comic_name}》章节：{epi.title} - {index} - {img_url} - 下载内容Checksum不正确! 重试中...\n"
+                f"\t{etag} ≠ {md5}"
+            )
+            return None
+        return img, md5
@@ -5,6 +5,7 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING
+from urllib.parse import urlparse
 
 import time
 import requests
@@ -12,26 +13,30 @@ from bs4 import BeautifulSoup
 from retrying import retry
 
 from src.Comic import Comic
+from src.DirectoryIndex import getDirectoryIndex
 from src.Episode import Episode
+from src.Metrics import STAGE_INDEX, getMetrics
+from src.Reporter import Reporter
 from src.Utils import (
     MAX_RETRY_SMALL,
     RETRY_WAIT_EX,
     TIMEOUT_SMALL,
     __app_name__,
     __version__,
+    getSession,
     logger,
 )
 
 if TYPE_CHECKING:
-    from ui.MainGUI import MainGUI
+    from src.Config import Config
 
 
 class BiliPlusComic(Comic):
     """BiliPlus 单本漫画 综合信息类"""
 
-    def __init__(self, comic_id: int, mainGUI: MainGUI) -> None:
-        super().__init__(comic_id, mainGUI)
-        self.cookie = mainGUI.getConfig("biliplus_cookie")
+    def __init__(self, comic_id: int, config: Config, reporter: Reporter) -> None:
+        super().__init__(comic_id, config, reporter)
+        self.cookie = config.biliplus_cookie
         self.headers = {
             "User-Agent": f"{__app_name__}/{__version__}",
             "cookie": f"{self.cookie};manga_sharing=on;manga_pic_format=jpg-full;",
@@ -51,10 +56,11 @@ class BiliPlusComic(Comic):
 
         # ?###########################################################
         # ? 解析 Biliplus 章节
+        getDirectoryIndex().invalidate(self.data["save_path"])
         biliplus_ep_list = self.data["ep_list"]
         for idx, episode in enumerate(reversed(biliplus_ep_list), start=1):
             epi = BiliPlusEpisode(
-                episode, self.headers, self.comic_id, self.data, self.mainGUI, idx
+                episode, self.headers, self.comic_id, self.data, self.config, self.reporter, idx
             )
             self.episodes.append(epi)
             if epi.isDownloaded():
@@ -75,7 +81,7 @@ class BiliPlusComic(Comic):
         @retry(stop_max_delay=MAX_RETRY_SMALL, wait_exponential_multiplier=RETRY_WAIT_EX)
         def _(url: str) -> str:
             try:
-                res = requests.post(
+                res = getSession().post(
                     url,
                     headers=self.headers,
                     timeout=TIMEOUT_SMALL,
@@ -100,7 +106,7 @@ class BiliPlusComic(Comic):
             if "" == biliplus_html:
                 return None
             if "cookie invalid" == biliplus_html:
-                self.mainGUI.signal_message_box.emit(
+                self.reporter.showMessage(
                     "您的BiliPlus Cookie无效，请更新您的BiliPlus Cookie!"
                 )
                 return None
@@ -123,7 +129,7 @@ class BiliPlusComic(Comic):
                 total_ep = total_ep_element.contents[0].split("/")[1]
                 total_pages = int(int(total_ep) / 200) + 1
                 for pages in range(2, total_pages + 1):
-                    self.mainGUI.signal_resolve_status.emit(
+                    self.reporter.reportStatus(
                         f"正在解析漫画章节({pages}/{total_pages})..."
                     )
                     page_html = _(f"{biliplus_detail_url}&page={pages}")
@@ -147,7 +153,7 @@ class BiliPlusComic(Comic):
                 msg = f"BiliPlus为本漫画额外解锁{unlock_times}个章节\n\n"
             else:
                 msg = "BiliPlus未能为此漫画解锁更多章节\n\n"
-            self.mainGUI.signal_information_box.emit(
+            self.reporter.showInformation(
                 f"{msg}Ciallo～(∠・ω< )⌒★\n"
                 "您的主动分享能温暖每一个漫画人\n"
                 "请在BiliPlus漫画主页进入功能“查看已购漫画”展示你的实力!"
@@ -156,7 +162,7 @@ class BiliPlusComic(Comic):
             msg = f"漫画id:{self.comic_id} 处理BiliPlus解锁章节数据多次后失败!"
             logger.error(msg)
             logger.exception(e)
-            self.mainGUI.signal_message_box.emit(
+            self.reporter.showMessage(
                 f"{msg}\n请检查网络连接或者重启软件!\n\n"
                 f"更多详细信息请查看日志文件, 或联系开发者！"
             )
@@ -164,25 +170,28 @@ class BiliPlusComic(Comic):
             msg = f"漫画id:{self.comic_id} 处理BiliPlus解锁章节数据时意外失败!"
             logger.error(msg)
             logger.exception(e)
-            self.mainGUI.signal_message_box.emit(f"{msg}\n\n更多详细信息请查看日志文件, 或联系开发者！")
+            self.reporter.showMessage(f"{msg}\n\n更多详细信息请查看日志文件, 或联系开发者！")
 
 
 ############################################################
 class BiliPlusEpisode(Episode):
     """BiliPlus漫画章节类，用于管理漫画章节的详细信息"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         episode: dict,
         headers: str,
         comic_id: str,
         comic_info: dict,
-        mainGUI: MainGUI,
+        config: Config,
+        reporter: Reporter,
         idx: int,
     ) -> None:
-        super().__init__(episode, comic_id, comic_info, mainGUI, idx)
+        super().__init__(episode, comic_id, comic_info, config, reporter, idx)
         self.headers = headers
-        self.comic_id = comic_id
+        self.source = "biliplus"
 
     ############################################################
     def init_imgsList(self) -> bool:
@@ -191,6 +200,23 @@ class BiliPlusEpisode(Episode):
         Returns
             bool: 是否初始化成功
         """
+        imgs_token = self.fetchBiliPlusImgsToken()
+        if imgs_token is None:
+            return False
+        self.imgs_token = imgs_token
+        self.imgs_token_time = time.monotonic()
+        return True
+
+    ############################################################
+    def fetchBiliPlusImgsToken(self, silent: bool = False) -> list[dict] | None:
+        """从BiliPlus获取章节内所有图片的地址和token
+
+        Args:
+            silent (bool): 获取失败时不弹出提示, 用于重新获取token, 章节会继续使用旧的token下载
+
+        Returns
+            list[dict] | None: {"url": 图片地址, "token": token} 列表, 失败或列表为空时返回 None
+        """
         # ?###########################################################
         # ? 获取图片列表
         biliplus_img_url = (
@@ -202,11 +228,13 @@ class BiliPlusEpisode(Episode):
         @retry(stop_max_delay=MAX_RETRY_SMALL, wait_exponential_multiplier=RETRY_WAIT_EX)
         def _() -> list[dict]:
             try:
-                res = requests.post(
-                    biliplus_img_url,
-                    headers=self.headers,
-                    timeout=TIMEOUT_SMALL,
-                )
+                # ? BiliPlus 的图片列表自带token, 整个请求计入 index 阶段
+                with getMetrics().timer(STAGE_INDEX, urlparse(biliplus_img_url).hostname):
+                    res = getSession().post(
+                        biliplus_img_url,
+                        headers=self.headers,
+                        timeout=TIMEOUT_SMALL,
+                    )
             except requests.RequestException as e:
                 logger.warning(
                     f"《{self.comic_name}》章节：{self.title}"
@@ -227,12 +255,13 @@ class BiliPlusEpisode(Episode):
             msg = f"《{self.comic_name}》章节：{self.title} 从BiliPlus重复获取图片列表多次后失败!"
             logger.error(msg)
             logger.exception(e)
-            self.mainGUI.signal_message_box.emit(
-                f"{msg}\n已暂时跳过此章节!\n"
-                f"请检查网络连接或者重启软件!\n\n"
-                f"更多详细信息请查看日志文件, 或联系开发者！"
-            )
-            return False
+            if not silent:
+                self.reporter.showMessage(
+                    f"{msg}\n已暂时跳过此章节!\n"
+                    f"请检查网络连接或者重启软件!\n\n"
+                    f"更多详细信息请查看日志文件, 或联系开发者！"
+                )
+            return None
 
         # ?###########################################################
         # ? 解析BiliPlus解锁章节图片地址
@@ -242,26 +271,44 @@ class BiliPlusEpisode(Episode):
                 msg = f"《{self.comic_name}》章节：{self.title} " \
                        "在BiliPlus上的章节共享者已退出登陆，下载失败！"
                 logger.error(msg)
-                self.mainGUI.signal_message_box.emit(msg)
-                return False
+                if not silent:
+                    self.reporter.showMessage(msg)
+                return None
             document = BeautifulSoup(biliplus_html, "html.parser")
             images = document.find_all("img", {"class": "comic-single"})
             for img in images:
                 img_url = img["_src"]
                 url, token = img_url.split("?token=")
                 biliplus_imgs_token.append({"url": url, "token": token})
-            self.imgs_token = biliplus_imgs_token
             if not biliplus_imgs_token:
                 msg = f"《{self.comic_name}》章节：{self.title} " \
                        "在处理BiliPlus章节图片地址时因获取的Token无效导致失败!\n\n"
                 logger.error(msg)
-                self.mainGUI.signal_message_box.emit(f"{msg}此问题不是下载器引发的")
-                return False
+                if not silent:
+                    self.reporter.showMessage(f"{msg}此问题不是下载器引发的")
+                return None
         except Exception as e:
             msg = f"《{self.comic_name}》章节：{self.title} 在处理BiliPlus解锁章节图片地址时意外失败!"
             logger.error(msg)
             logger.exception(e)
-            self.mainGUI.signal_message_box.emit(f"{msg}\n\n更多详细信息请查看日志文件, 或联系开发者！")
-            return False
+            if not silent:
+                self.reporter.showMessage(f"{msg}\n\n更多详细信息请查看日志文件, 或联系开发者！")
+            return None
 
-        return True
+        return biliplus_imgs_token
+
+    ############################################################
+    def refreshImgsToken(self, indexes: list[int]) -> list[dict] | None:
+        """重写用于从BiliPlus重新获取部分图片的token, BiliPlus 只能整章重新获取
+
+        Args:
+            indexes (list[int]): 需要重新获取token的图片序号
+
+        Returns
+            list[dict] | None: 与图片序号一一对应的 {"url": 图片地址, "token": token}, 失败时返回 None
+        """
+        imgs_token = self.fetchBiliPlusImgsToken(silent=True)
+        # ? 图片数变化时无法按序号对应, 继续使用旧的token
+        if imgs_token is None or len(imgs_token) != len(self.imgs_token):
+            return None
+        return [imgs_token[index - 1] for index in indexes]
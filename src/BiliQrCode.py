@@ -14,7 +14,7 @@ from PySide6.QtCore import SignalInstance
 from PySide6.QtWidgets import QMessageBox
 from retrying import retry
 
-from src.Utils import MAX_RETRY_SMALL, RETRY_WAIT_EX, TIMEOUT_SMALL, logger
+from src.Utils import MAX_RETRY_SMALL, RETRY_WAIT_EX, TIMEOUT_SMALL, getSession, logger
 
 if TYPE_CHECKING:
     from ui.MainGUI import MainGUI
@@ -46,7 +46,9 @@ class QrCode:
         @retry(stop_max_delay=MAX_RETRY_SMALL, wait_exponential_multiplier=RETRY_WAIT_EX)
         def _() -> dict:
             try:
-                res = requests.get(self.generate_url, headers=self.headers, timeout=TIMEOUT_SMALL)
+                res = getSession().get(
+                    self.generate_url, headers=self.headers, timeout=TIMEOUT_SMALL
+                )
             except requests.RequestException as e:
                 logger.warning(f"获取登入二维码失败! 重试中...\n {e}")
                 raise e
@@ -91,7 +93,7 @@ class QrCode:
         @retry(stop_max_delay=MAX_RETRY_SMALL, wait_exponential_multiplier=RETRY_WAIT_EX)
         def _() -> dict:
             try:
-                res = requests.get(
+                res = getSession().get(
                     self.poll_url,
                     headers=self.headers,
                     params={
@@ -4,33 +4,42 @@
 
 from __future__ import annotations
 
+import json
+import os
 from typing import TYPE_CHECKING
 
 import requests
 from retrying import RetryError, retry
 
+from src.ComicCache import getComicCache
+from src.CoverCache import getCoverCache
+from src.DirectoryIndex import getDirectoryIndex
 from src.Episode import Episode
+from src.LibraryDB import getLibraryDB
+from src.Reporter import Reporter
 from src.Utils import (
     MAX_RETRY_SMALL,
     RETRY_WAIT_EX,
     TIMEOUT_SMALL,
+    getSession,
     isCheckSumValid,
     logger,
     myStrFilter,
 )
 
 if TYPE_CHECKING:
-    from ui.MainGUI import MainGUI
+    from src.Config import Config
 
 
 class Comic:
     """单本漫画 综合信息类"""
 
-    def __init__(self, comic_id: int, mainGUI: MainGUI) -> None:
-        self.mainGUI = mainGUI
+    def __init__(self, comic_id: int, config: Config, reporter: Reporter) -> None:
+        self.config = config
+        self.reporter = reporter
         self.comic_id = comic_id
-        self.save_path = mainGUI.getConfig("save_path")
-        self.num_thread = mainGUI.getConfig("num_thread")
+        self.save_path = config.save_path
+        self.num_thread = config.num_thread
         self.num_downloaded = 0
         self.episodes = []
         self.data = None
@@ -41,13 +50,17 @@ class Comic:
             "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
             "origin": "https://manga.bilibili.com",
             "referer": f"https://manga.bilibili.com/detail/mc{comic_id}?from=manga_homepage",
-            "cookie": f"SESSDATA={mainGUI.getConfig('cookie')}",
+            "cookie": f"SESSDATA={config.cookie}",
         }
         self.payload = {"comic_id": self.comic_id}
 
     ############################################################
-    def getComicInfo(self) -> dict:
-        """使用哔哩哔哩漫画 API 分析漫画数据
+    def getComicInfo(self, use_cache: bool = False) -> dict:
+        """使用哔哩哔哩漫画 API 分析漫画数据, 网络请求失败时退回本地缓存
+
+        Args:
+            use_cache (bool): 是否直接使用未过期的本地缓存, 默认总是重新获取,
+                以便新章节和刚解锁的章节立即出现; 只有不需要最新章节列表的地方才应该使用缓存
 
         Returns:
             dict: 漫画信息
@@ -59,7 +72,7 @@ class Comic:
         )
         def _() -> dict:
             try:
-                res = requests.post(
+                res = getSession().post(
                     self.detail_url,
                     headers=self.headers,
                     data=self.payload,
@@ -75,12 +88,22 @@ class Comic:
                 raise requests.HTTPError()
             return res.json()["data"]
 
-        try:
-            self.data = _()
-        except requests.RequestException as e:
-            logger.error(f"漫画id:{self.comic_id} 重复获取漫画信息多次后失败!\n{e}")
-            logger.exception(e)
-            return {}
+        comic_cache = getComicCache()
+        fingerprint = comic_cache.getFingerprint(self.headers["cookie"])
+        self.data = comic_cache.get(self.comic_id, fingerprint) if use_cache else None
+        if self.data is None:
+            try:
+                self.data = _()
+            except requests.RequestException as e:
+                logger.error(f"漫画id:{self.comic_id} 重复获取漫画信息多次后失败!\n{e}")
+                logger.exception(e)
+                # ? 网络不可用时退回过期的缓存
+                self.data = comic_cache.get(self.comic_id, fingerprint, stale=True)
+                if self.data is None:
+                    return {}
+                logger.warning(f"漫画id:{self.comic_id} 使用过期的漫画信息缓存")
+            else:
+                comic_cache.put(self.comic_id, fingerprint, self.data)
 
         # ?###########################################################
         # ? 解析漫画信息
@@ -91,25 +114,55 @@ class Comic:
         )
         self.data["author_name"] = myStrFilter(self.data["author_name"])
         self.data["styles"] = "，".join(self.data["styles"])
-        if self.comic_id in self.mainGUI.my_library:
-            self.data["save_path"] = self.mainGUI.my_library[self.comic_id].get("comic_path")
+        if self.comic_id in self.config.library_paths:
+            self.data["save_path"] = self.config.library_paths[self.comic_id]
         else:
             self.data["save_path"] = f"{self.save_path}/{self.data['title']}"
 
         return self.data
 
     ############################################################
-    def getComicCover(self, data: dict) -> bytes:
-        """获取漫画封面图片
+    def saveMeta(self) -> None:
+        """保存漫画元数据到保存目录下的 元数据.json, 并添加到本地库存数据库, 需要先调用 getComicInfo"""
+        meta = {
+            "id": self.data["id"],
+            "title": self.data["title"],
+            "horizontal_cover": self.data["horizontal_cover"],
+            "square_cover": self.data["square_cover"],
+            "vertical_cover": self.data["vertical_cover"],
+            "author_name": self.data["author_name"],
+            "styles": self.data["styles"],
+            "evaluate": self.data["evaluate"],
+            "renewal_time": self.data["renewal_time"],
+            "hall_icon_text": self.data["hall_icon_text"],
+            "tags": [tag["name"] for tag in self.data["tags"]],
+        }
+
+        with open(
+            os.path.join(self.data["save_path"], "元数据.json"), "w", encoding="utf-8"
+        ) as f:
+            json.dump(meta, f, indent=4, ensure_ascii=False)
+        getLibraryDB().upsertComic(self.data)
+
+    ############################################################
+    def getComicCover(self, data: dict, width: int = None) -> bytes:
+        """获取漫画封面图片, 优先使用本地缓存
+
+        Args:
+            data (dict): 漫画信息
+            width (int): 显示宽度, 返回不小于此宽度的缩略图, 为 None 时返回原图
 
         Returns:
             bytes: 漫画封面图片
         """
+        cover_cache = getCoverCache()
+        if img := cover_cache.get(data["vertical_cover"], width):
+            return img
 
         @retry(stop_max_delay=MAX_RETRY_SMALL, wait_exponential_multiplier=RETRY_WAIT_EX)
         def _() -> bytes:
             try:
-                res = requests.get(data["vertical_cover"], timeout=TIMEOUT_SMALL)
+                res = getSession().get(data["vertical_cover"], timeout=TIMEOUT_SMALL)
             except requests.RequestException() as e:
                 logger.warning(f"获取封面图片失败! 重试中...\n{e}")
                 raise e
@@ -129,10 +182,11 @@ class Comic:
         logger.info(f"获取《{data['title']}》的封面图片中...")
         try:
             img = _()
-            return img
+            cover_cache.put(data["vertical_cover"], img)
+            return cover_cache.get(data["vertical_cover"], width) or img
         except RetryError as e:
             logger.error(f"获取封面图片多次后失败，跳过!\n{e}")
-            self.mainGUI.signal_message_box.emit(
+            self.reporter.showMessage(
                 "获取封面图片多次后失败!\n"
                 "请检查网络连接或者重启软件!\n\n"
                 "更多详细信息请查看日志文件, 或联系开发者！"
@@ -152,10 +206,11 @@ class Comic:
             return []
 
         # ?###########################################################
-        # ? 解析章节
+        # ? 解析章节, 每次解析重新读取一次漫画目录, 之后各章节的 isDownloaded 都使用这次的结果
+        getDirectoryIndex().invalidate(self.data["save_path"])
         ep_list = self.data["ep_list"]
         for idx, episode in enumerate(reversed(ep_list), start=1):
-            epi = Episode(episode, self.comic_id, self.data, self.mainGUI, idx)
+            epi = Episode(episode, self.comic_id, self.data, self.config, self.reporter, idx)
             self.episodes.append(epi)
             if epi.isDownloaded():
                 self.num_downloaded += 1
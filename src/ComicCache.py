@@ -0,0 +1,124 @@
+"""
+该模块包含了漫画详情的本地缓存类，缓存 ComicDetail 接口返回的原始数据，
+网络请求失败时退回缓存，恢复下载队列等不需要最新章节列表的地方直接使用未过期的缓存
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from src.Utils import data_path, logger
+
+# ? 直接使用缓存时的有效期, 解析漫画和检查更新总是重新获取, 不受有效期影响
+CACHE_TTL = 60 * 60
+
+
+class ComicCache:
+    """漫画详情缓存类，每部漫画一个 JSON 文件，按 Cookie 区分 (章节是否解锁与账号有关)"""
+
+    def __init__(self, cache_dir: str) -> None:
+        """
+        Args:
+            cache_dir (str): 缓存目录
+        """
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+
+    ############################################################
+
+    @staticmethod
+    def getFingerprint(cookie: str) -> str:
+        """计算 Cookie 的指纹, 缓存文件中不保存 Cookie 本身
+
+        Args:
+            cookie (str): 请求头中的 cookie
+
+        Returns:
+            str: Cookie 的指纹
+        """
+        return hashlib.md5(cookie.encode()).hexdigest()
+
+    ############################################################
+
+    def load(self, comic_id: int) -> dict | None:
+        """读取缓存条目
+
+        Args:
+            comic_id (int): 漫画ID
+
+        Returns:
+            dict | None: {"fetched_at": 获取时间, "fingerprint": Cookie指纹, "data": 漫画详情},
+                没有缓存或读取失败时返回 None
+        """
+        path = os.path.join(self.cache_dir, f"{comic_id}.json")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"漫画id:{comic_id} 读取漫画详情缓存失败, 忽略缓存\n{e}")
+            return None
+
+    ############################################################
+
+    def get(self, comic_id: int, fingerprint: str, stale: bool = False) -> dict | None:
+        """获取缓存的漫画详情
+
+        Args:
+            comic_id (int): 漫画ID
+            fingerprint (str): 当前 Cookie 的指纹
+            stale (bool): 是否接受已经过期的缓存, 用于网络请求失败时退回
+
+        Returns:
+            dict | None: ComicDetail 接口返回的原始数据, 没有可用的缓存时返回 None
+        """
+        entry = self.load(comic_id)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return None
+        if not stale and time.time() - entry["fetched_at"] > CACHE_TTL:
+            return None
+        return entry["data"]
+
+    ############################################################
+
+    def put(self, comic_id: int, fingerprint: str, data: dict) -> None:
+        """保存新获取的漫画详情
+
+        Args:
+            comic_id (int): 漫画ID
+            fingerprint (str): 当前 Cookie 的指纹
+            data (dict): ComicDetail 接口返回的原始数据, 需要在修改前保存
+        """
+        # ? 先写入临时文件再替换, 避免程序中断时留下不完整的缓存
+        entry = {"fetched_at": time.time(), "fingerprint": fingerprint, "data": data}
+        path = os.path.join(self.cache_dir, f"{comic_id}.json")
+        try:
+            with self.lock:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                    json.dump(entry, f, ensure_ascii=False)
+                os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.warning(f"漫画id:{comic_id} 写入漫画详情缓存失败\n{e}")
+
+
+############################################################
+
+_comic_cache: ComicCache | None = None
+
+
+def getComicCache() -> ComicCache:
+    """获取全局共享的漫画详情缓存
+
+    Returns:
+        ComicCache: 漫画详情缓存
+    """
+    global _comic_cache
+    if _comic_cache is None:
+        _comic_cache = ComicCache(os.path.join(data_path, "cache", "comic_detail"))
+    return _comic_cache
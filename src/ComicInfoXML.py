@@ -3,6 +3,7 @@
 https://anansi-project.github.io/docs/comicinfo/documentation
 """
 
+import io
 import os
 from xml.sax.saxutils import escape
 from datetime import datetime
@@ -64,6 +65,15 @@ class ComicInfoXML:
             output_path (str): ComicInfo.xml写出路径
         """
         with open(os.path.join(output_path, "ComicInfo.xml"), "w", encoding="utf-8") as f:
+            f.write(self.toString())
+
+    def toString(self) -> str:
+        """生成ComicInfo.xml的内容, 可以直接写入压缩包而不经过磁盘
+
+        Returns:
+            str: ComicInfo.xml的内容
+        """
+        with io.StringIO() as f:
             f.write('<?xml version="1.0" encoding="utf-8"?>\n')
             f.write(
                 '<ComicInfo xmlns:xsd="http://www.w3.org/2001/XMLSchema" '
@@ -88,6 +98,7 @@ class ComicInfoXML:
             self.xml_write_simple_tag(f, "Day", self.metadata["Day"])
 
             f.write("</ComicInfo>")
+            return f.getvalue()
 
     def xml_write_simple_tag(self, f, name: str, val, indent=1) -> None:
         """xml帮手函数
@@ -0,0 +1,73 @@
+"""
+该模块包含了设置快照类Config，核心模块通过它读取设置，而不是直接访问主窗口
+"""
+
+from __future__ import annotations
+
+
+class Config:
+    """下载相关设置的只读快照，不依赖主窗口，可以序列化后发送到子进程"""
+
+    def __init__(
+        self,
+        save_path: str = "",
+        save_method: str = "PDF",
+        exif: bool = True,
+        zip_compression: str = "auto",
+        resume_download: bool = True,
+        auto_download_new: bool = False,
+        cookie: str = "",
+        biliplus_cookie: str = "",
+        num_thread: int = 8,
+        num_page_thread: int = 4,
+        async_engine: bool = False,
+        library_paths: dict[int, str] = None,
+    ) -> None:
+        """
+        Args:
+            save_path (str): 漫画保存的根目录
+            save_method (str): 章节保存方式
+            exif (bool): 是否在文件属性中记录章节信息
+            zip_compression (str): Zip/Cbz压缩方式
+            resume_download (bool): 是否开启断点续传
+            auto_download_new (bool): 更新我的库存时是否自动下载新章节
+            cookie (str): 哔哩哔哩的 SESSDATA
+            biliplus_cookie (str): BiliPlus的 Cookie
+            num_thread (int): 同时下载的章节数
+            num_page_thread (int): 单章同时下载的图片数
+            async_engine (bool): 是否使用异步下载引擎
+            library_paths (dict): 我的库存中漫画id到保存目录的映射
+        """
+        self.save_path = save_path
+        self.save_method = save_method
+        self.exif = exif
+        self.zip_compression = zip_compression
+        self.resume_download = resume_download
+        self.auto_download_new = auto_download_new
+        self.cookie = cookie
+        self.biliplus_cookie = biliplus_cookie
+        self.num_thread = num_thread
+        self.num_page_thread = num_page_thread
+        self.async_engine = async_engine
+        self.library_paths = library_paths or {}
+
+    ############################################################
+
+    @classmethod
+    def fromDict(cls, config: dict, library_paths: dict[int, str] = None) -> Config:
+        """根据配置文件的内容创建快照, 缺失或为空的配置项使用默认值
+
+        Args:
+            config (dict): 配置文件的内容
+            library_paths (dict): 我的库存中漫画id到保存目录的映射
+
+        Returns:
+            Config: 设置快照
+        """
+        defaults = cls()
+        kwargs = {
+            key: config[key]
+            for key in vars(defaults)
+            if key != "library_paths" and config.get(key) is not None
+        }
+        return cls(**kwargs, library_paths=library_paths)
@@ -0,0 +1,173 @@
+"""
+该模块包含了漫画封面的缓存类，在磁盘和内存中按最近最少使用的顺序淘汰，并预先生成界面使用的缩略图
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from src.Utils import data_path, logger
+
+# ? 预先生成的缩略图宽度, 界面取不小于显示宽度的最小一档, 都不够时使用原图
+THUMBNAIL_WIDTHS = (200, 400, 600)
+MAX_DISK_BYTES = 200 * 1024 * 1024
+MAX_MEMORY_ITEMS = 64
+
+
+class CoverCache:
+    """封面缓存类，缓存的都是已经通过 Checksum 校验的图片，以图片 url 为键"""
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_disk_bytes: int = MAX_DISK_BYTES,
+        max_memory_items: int = MAX_MEMORY_ITEMS,
+    ) -> None:
+        """
+        Args:
+            cache_dir (str): 缓存目录
+            max_disk_bytes (int): 磁盘缓存的最大字节数
+            max_memory_items (int): 内存缓存的最大图片数
+        """
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_items = max_memory_items
+        self.memory: OrderedDict[str, bytes] = OrderedDict()
+        self.lock = threading.Lock()
+
+    ############################################################
+
+    @staticmethod
+    def getFileName(url: str, width: int = None) -> str:
+        """获取图片在缓存中的文件名
+
+        Args:
+            url (str): 封面 url
+            width (int): 缩略图宽度, 为 None 时表示原图
+
+        Returns:
+            str: 文件名
+        """
+        return f"{hashlib.md5(url.encode()).hexdigest()}_{width or 'orig'}"
+
+    ############################################################
+
+    def get(self, url: str, width: int = None) -> bytes | None:
+        """获取缓存的封面
+
+        Args:
+            url (str): 封面 url
+            width (int): 显示宽度, 返回不小于此宽度的最小缩略图, 为 None 时返回原图
+
+        Returns:
+            bytes | None: 图片内容, 没有缓存时返回 None
+        """
+        candidates = [w for w in THUMBNAIL_WIDTHS if width is not None and w >= width]
+        for file_name in [self.getFileName(url, w) for w in candidates] + [self.getFileName(url)]:
+            with self.lock:
+                if file_name in self.memory:
+                    self.memory.move_to_end(file_name)
+                    return self.memory[file_name]
+            path = os.path.join(self.cache_dir, file_name)
+            try:
+                with open(path, "rb") as f:
+                    img = f.read()
+                # ? 以修改时间记录最近一次使用, 淘汰时从最久未使用的开始
+                os.utime(path)
+            except OSError:
+                continue
+            self.__remember(file_name, img)
+            return img
+        return None
+
+    ############################################################
+
+    def put(self, url: str, img: bytes) -> None:
+        """缓存新下载的封面, 同时生成各档缩略图
+
+        Args:
+            url (str): 封面 url
+            img (bytes): 已经通过校验的图片内容
+        """
+        files = {self.getFileName(url): img}
+        try:
+            with Image.open(io.BytesIO(img)) as image:
+                for width in THUMBNAIL_WIDTHS:
+                    if image.width <= width:
+                        break
+                    thumbnail = image.convert("RGB")
+                    thumbnail.thumbnail((width, image.height * width // image.width + 1))
+                    buffer = io.BytesIO()
+                    thumbnail.save(buffer, format="JPEG", quality=90)
+                    files[self.getFileName(url, width)] = buffer.getvalue()
+        except OSError as e:
+            logger.warning(f"生成封面缩略图失败, 只缓存原图 - {url}\n{e}")
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for file_name, content in files.items():
+                path = os.path.join(self.cache_dir, file_name)
+                with open(f"{path}.tmp", "wb") as f:
+                    f.write(content)
+                os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.warning(f"写入封面缓存失败 - {url}\n{e}")
+            return
+        self.__evict()
+
+    ############################################################
+
+    def __remember(self, file_name: str, img: bytes) -> None:
+        """把图片放入内存缓存, 超出数量时淘汰最久未使用的
+
+        Args:
+            file_name (str): 缓存文件名
+            img (bytes): 图片内容
+        """
+        with self.lock:
+            self.memory[file_name] = img
+            self.memory.move_to_end(file_name)
+            while len(self.memory) > self.max_memory_items:
+                self.memory.popitem(last=False)
+
+    ############################################################
+
+    def __evict(self) -> None:
+        """磁盘缓存超出大小时, 从最久未使用的文件开始删除, 直到降到上限的九成"""
+        with self.lock:
+            entries = [entry for entry in os.scandir(self.cache_dir) if entry.is_file()]
+            total = sum(entry.stat().st_size for entry in entries)
+            if total <= self.max_disk_bytes:
+                return
+            for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+                if total <= self.max_disk_bytes * 0.9:
+                    break
+                total -= entry.stat().st_size
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    continue
+                self.memory.pop(entry.name, None)
+
+
+############################################################
+
+_cover_cache: CoverCache | None = None
+
+
+def getCoverCache() -> CoverCache:
+    """获取全局共享的封面缓存
+
+    Returns:
+        CoverCache: 封面缓存
+    """
+    global _cover_cache
+    if _cover_cache is None:
+        _cover_cache = CoverCache(os.path.join(data_path, "cache", "covers"))
+    return _cover_cache
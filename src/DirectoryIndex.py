@@ -0,0 +1,88 @@
+"""
+该模块包含了目录内容索引类，一次读取漫画目录下的所有文件名，用于快速判断章节是否已经下载
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from bisect import bisect_left
+
+
+class DirectoryIndex:
+    """目录内容索引类
+
+    每个目录只用 os.scandir 读取一次, 文件名排序后按前缀二分查找,
+    代替每个章节各自 glob 一次整个目录; 目录内容变化后需要调用 invalidate
+    """
+
+    def __init__(self) -> None:
+        self.entries: dict[str, list[str]] = {}
+        self.lock = threading.Lock()
+
+    ############################################################
+
+    def hasPrefix(self, dir_path: str, prefix: str) -> bool:
+        """判断目录下是否存在以指定前缀开头的文件或文件夹, 与 glob(f"{dir_path}/{prefix}*") 是否有结果一致
+
+        Args:
+            dir_path (str): 目录
+            prefix (str): 文件名前缀
+
+        Returns:
+            bool: 是否存在
+        """
+        names = self.__getNames(dir_path)
+        prefix = os.path.normcase(prefix)
+        index = bisect_left(names, prefix)
+        return index < len(names) and names[index].startswith(prefix)
+
+    ############################################################
+
+    def invalidate(self, dir_path: str) -> None:
+        """目录内容变化后调用, 下次查询时重新读取
+
+        Args:
+            dir_path (str): 目录
+        """
+        with self.lock:
+            self.entries.pop(os.path.normcase(os.path.abspath(dir_path)), None)
+
+    ############################################################
+
+    def __getNames(self, dir_path: str) -> list[str]:
+        """获取目录下排好序的文件名, 没有索引时读取一次目录
+
+        Args:
+            dir_path (str): 目录
+
+        Returns:
+            list[str]: 排好序的文件名, 目录不存在时为空
+        """
+        key = os.path.normcase(os.path.abspath(dir_path))
+        with self.lock:
+            names = self.entries.get(key)
+        if names is not None:
+            return names
+        try:
+            with os.scandir(dir_path) as it:
+                names = sorted(os.path.normcase(entry.name) for entry in it)
+        except OSError:
+            names = []
+        with self.lock:
+            self.entries[key] = names
+        return names
+
+
+############################################################
+
+_directory_index = DirectoryIndex()
+
+
+def getDirectoryIndex() -> DirectoryIndex:
+    """获取全局共享的目录内容索引
+
+    Returns:
+        DirectoryIndex: 目录内容索引
+    """
+    return _directory_index
@@ -2,12 +2,50 @@
 该模块包含了一个下载管理器类，用于管理漫画下载任务的创建、更新和删除等操作
 """
 
-import time
-from concurrent.futures import ThreadPoolExecutor
+from __future__ import annotations
 
-from PySide6.QtCore import SignalInstance
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import partial
 
+from src.DirectoryIndex import getDirectoryIndex
+from src.DownloadQueue import STATUS_ACTIVE, STATUS_FAILED, DownloadQueue
 from src.Episode import Episode
+from src.ImageTokenBatcher import ImageTokenBatcher
+from src.LibraryDB import LibraryDB, getLibraryDB
+from src.Metrics import getMetrics
+from src.Reporter import Reporter
+from src.Throughput import SpeedMeter, TaskTransfer
+from src.TokenScheduler import TokenScheduler
+from src.Utils import logger, setSessionPoolSize
+
+
+def postProcessEpisode(
+    epi: Episode, imgs_path: list[str]
+) -> tuple[str | None, list[str], tuple[int | None, str | None], dict]:
+    """在后处理进程中保存章节, 需要定义在模块顶层以便序列化
+
+    Args:
+        epi (Episode): 要保存的章节
+        imgs_path (list): 临时图片路径列表
+
+    Returns:
+        tuple: (保存路径, 需要由主进程弹出的提示, (文件大小, 文件MD5), 本次保存的耗时统计),
+            保存失败时保存路径为 None
+    """
+    # ? 进程池中的进程会被复用, 每次只返回本次保存的统计, 由主进程合并
+    getMetrics().reset()
+    save_path = epi.save(imgs_path)
+    file_info = (None, None)
+    if save_path is not None:
+        try:
+            file_info = LibraryDB.getFileInfo(save_path)
+        except OSError as e:
+            logger.warning(
+                f"《{epi.comic_name}》章节：{epi.title} 读取保存结果失败 - {save_path}\n{e}"
+            )
+    return save_path, epi.reporter.messages, file_info, getMetrics().snapshot()
 
 
 class DownloadManager:
@@ -16,17 +54,34 @@ class DownloadManager:
     def __init__(
         self,
         max_workers: int,
-        signal_rate_progress: SignalInstance,
-        signal_message_box: SignalInstance,
+        reporter: Reporter,
+        max_page_workers: int = 4,
+        download_queue: DownloadQueue = None,
     ) -> None:
         self.id_count = 0
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
-        self.signal_rate_progress = signal_rate_progress
-        self.signal_message_box = signal_message_box
+        # ? 单个章节内部并发下载图片的线程数, 与章节级别的线程池分开配置
+        self.max_page_workers = max_page_workers or 4
+        # ? 所有图片请求都会落到同一个图片服务器, 连接池需要容纳所有同时进行的下载
+        setSessionPoolSize(max_workers * self.max_page_workers)
+        # ? 合并PDF, 写入exif和压缩等CPU密集的保存工作交给独立的进程池, 不占用下载线程
+        # ? 使用 spawn 启动子进程, fork 会把其他线程正持有的锁 (耗时统计, 限速器, 目录索引) 复制到子进程中导致死锁
+        self.post_executor = ProcessPoolExecutor(
+            max_workers=min(max_workers, os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self.post_futures: set[Future] = set()
+        # ? 进度和错误提示都通过注入的 reporter 报告, 不依赖界面
+        self.reporter = reporter
+        # ? 持久化的下载队列, 为 None 时任务只保存在内存中
+        self.download_queue = download_queue
+        # ? 提前获取后续章节的图片列表, 并合并多个章节的图片token请求
+        self.token_batcher = ImageTokenBatcher(lookahead=max_workers)
 
         self.terminated = False
         self.all_tasks = {}
-        self.avg_speed_in_last_three_sec = {}
+        # ? 所有任务共用的测速器, 由下载图片时实际收到的字节数驱动
+        self.speed_meter = SpeedMeter()
 
     ############################################################
 
@@ -39,37 +94,176 @@ class DownloadManager:
         Returns:
             int: 新创建任务的ID。
         """
-        self.all_tasks[self.id_count] = {
+        if self.download_queue is not None:
+            self.download_queue.add(epi)
+        self.token_batcher.schedule(epi)
+        # ? 先登记任务再提交, 任务开始执行时就能取到自己的字节统计
+        task = {
+            "ep_id": epi.id,
             "size": epi.size,
             "curr_rate": 0.0,
-            "last_rate": 0.0,
-            "last_time": time.time(),
-            "curr_speed": 0.1,
-            "avg_speed": 0.1,
-            "future": self.executor.submit(self.__thread__EpisodeTask, self.id_count, epi),
+            "num_imgs_left": None,
+            "transfer": TaskTransfer(self.speed_meter),
         }
+        self.all_tasks[self.id_count] = task
+        task["future"] = self.submitEpisodeTask(self.id_count, epi)
+        task["future"].add_done_callback(partial(self.__onEpisodeTaskDone, self.id_count, epi))
         self.id_count += 1
         return self.id_count - 1
 
     ############################################################
 
-    def updateTaskInfo(self, curr_id: int, rate: float) -> None:
-        """更新任务信息，包括当前速度、当前下载速率、上一次下载速率和上一次更新时间
+    def submitEpisodeTask(self, curr_id: int, epi: Episode) -> Future:
+        """将章节任务提交给下载引擎执行
+
+        Args:
+            curr_id (int): 当前任务的ID
+            epi (Episode): 要下载的章节
+
+        Returns:
+            Future: 章节任务的 Future
+        """
+        return self.executor.submit(self.__thread__EpisodeTask, curr_id, epi)
+
+    ############################################################
+
+    def __onEpisodeTaskDone(self, curr_id: int, epi: Episode, future: Future) -> None:
+        """章节任务结束的回调, 任务中抛出了未处理的异常时报告失败, 避免界面和命令行一直等待
+
+        Args:
+            curr_id (int): 当前任务的ID
+            epi (Episode): 要下载的章节
+            future (Future): 章节任务的 Future
+        """
+        if future.cancelled() or future.exception() is None or self.terminated:
+            return
+        e = future.exception()
+        logger.error(f"《{epi.comic_name}》章节：{epi.title} 下载任务意外失败!\n{e}", exc_info=e)
+        self.reporter.showMessage(
+            f"《{epi.comic_name}》章节：{epi.title} 下载任务意外失败!\n已暂时跳过此章节!\n请重新尝试或者重启软件!\n\n更多详细信息请查看日志文件, 或联系开发者！"
+        )
+        # ? 任务可能在报告失败之后才抛出异常, 已经报告过的任务不再重复报告
+        if curr_id in self.all_tasks:
+            self.reportError(curr_id)
+
+    ############################################################
+
+    def submitPostTask(self, curr_id: int, epi: Episode, imgs_path: list[str]) -> None:
+        """图片全部下载完成后, 将保存章节的工作提交给后处理进程池, 完成后再更新进度
 
         Args:
             curr_id (int): 当前任务的ID
-            rate (float): 下载进度百分比
+            epi (Episode): 要保存的章节
+            imgs_path (list): 临时图片路径列表
         """
-        task: dict = self.all_tasks[curr_id]
-        curr_time = time.time()
+        future = self.post_executor.submit(postProcessEpisode, epi, imgs_path)
+        self.post_futures.add(future)
+        future.add_done_callback(partial(self.__onPostTaskDone, curr_id, epi, imgs_path))
 
-        task["curr_speed"] = (task["size"] * rate - task["size"] * task["last_rate"]) / (
-            curr_time - task["last_time"]
+    ############################################################
+
+    def __onPostTaskDone(
+        self, curr_id: int, epi: Episode, imgs_path: list[str], future: Future
+    ) -> None:
+        """后处理任务结束的回调, 弹出子进程中记录的提示并更新进度
+
+        Args:
+            curr_id (int): 当前任务的ID
+            epi (Episode): 保存的章节
+            imgs_path (list): 临时图片路径列表
+            future (Future): 后处理任务的 Future
+        """
+        self.post_futures.discard(future)
+        if future.cancelled():
+            # ? 退出时还在排队的保存任务被取消, Zip和Cbz格式的图片只在内存中, 需要写入临时文件和清单
+            # ? 以便下次启动时直接从断点续传清单中恢复, 不需要重新下载
+            epi.suspend(imgs_path)
+            epi.imgs_in_memory.clear()
+            return
+        # ? 图片内容已经发送给子进程, 主进程中的副本可以释放了
+        epi.imgs_in_memory.clear()
+        if self.terminated:
+            return
+
+        try:
+            save_path, messages, (file_size, checksum), metrics = future.result()
+        except Exception as e:
+            logger.error(f"《{epi.comic_name}》章节：{epi.title} 后处理进程保存章节失败!\n{e}")
+            logger.exception(e)
+            self.reporter.showMessage(
+                f"《{epi.comic_name}》章节：{epi.title} 保存章节失败!\n已暂时跳过此章节!\n请重新尝试或者重启软件!\n\n更多详细信息请查看日志文件, 或联系开发者！"
+            )
+            self.reportError(curr_id)
+            return
+
+        getMetrics().merge(metrics)
+        for msg in messages:
+            self.reporter.showMessage(msg)
+        if save_path is None:
+            # ? 保存失败, 子进程已经弹出过提示, 保留下载队列中的记录以便重试, 不记录到本地库存
+            self.reportError(curr_id)
+            return
+        # ? 章节已经保存到漫画目录, 目录索引需要重新读取, 并记录到本地库存数据库
+        getDirectoryIndex().invalidate(epi.save_path)
+        getLibraryDB().recordEpisode(epi, save_path, file_size, checksum)
+        self.updateQueueStatus(epi.id, None)
+        self.updateTaskInfo(curr_id, 1, 0)
+        self.reporter.reportProgress({"taskID": curr_id, "rate": 100, "path": save_path})
+
+    ############################################################
+
+    def updateQueueStatus(self, ep_id: int, status: str | None) -> None:
+        """更新持久化下载队列中章节任务的状态
+
+        Args:
+            ep_id (int): 章节ID
+            status (str | None): 新的状态, 为 None 时表示任务已完成, 从队列中删除
+        """
+        if self.download_queue is None:
+            return
+        if status is None:
+            self.download_queue.remove(ep_id)
+        else:
+            self.download_queue.setStatus(ep_id, status)
+
+    ############################################################
+
+    def getDownloadQueueDepth(self) -> int:
+        """获取下载阶段尚未完成的章节数
+
+        Returns:
+            int: 下载队列深度
+        """
+        return sum(
+            "future" not in task or not task["future"].done()
+            for task in list(self.all_tasks.values())
         )
 
+    ############################################################
+
+    def getPostQueueDepth(self) -> int:
+        """获取保存阶段尚未完成的章节数
+
+        Returns:
+            int: 保存队列深度
+        """
+        return len(self.post_futures)
+
+    ############################################################
+
+    def updateTaskInfo(self, curr_id: int, rate: float, num_imgs_left: int) -> None:
+        """更新任务的下载进度和剩余图片数, 速度由收到的字节数单独统计, 不再根据进度估算
+
+        Args:
+            curr_id (int): 当前任务的ID
+            rate (float): 下载进度, 0 到 1 之间, 保存完成后才为 1
+            num_imgs_left (int): 尚未下载的图片数, 用于估算剩余字节数
+        """
+        task = self.all_tasks.get(curr_id)
+        if task is None:
+            return
         task["curr_rate"] = rate
-        task["last_rate"] = task["curr_rate"]
-        task["last_time"] = curr_time
+        task["num_imgs_left"] = num_imgs_left
 
     ############################################################
 
@@ -86,24 +280,12 @@ class DownloadManager:
     ############################################################
 
     def getTotalSpeed(self) -> float:
-        """获取所有任务的平均下载速度
+        """获取所有任务最近3秒内的平均下载速度
 
         Returns:
-            float: 平均下载速度
+            float: 平均下载速度 (字节/秒)
         """
-        self.avg_speed_in_last_three_sec[time.time()] = sum(
-            task["curr_speed"] for task in self.all_tasks.values() if task["curr_rate"] != 1
-        )
-        # 取3秒内的平均速度，以防止速度突然变化
-        # 比如下载完一个文件 速度突然变为0
-        # 或者开始一组新的下载，速度突然变为很大
-        for key in list(self.avg_speed_in_last_three_sec.keys()):
-            if key < time.time() - 3:
-                self.avg_speed_in_last_three_sec.pop(key)
-
-        return sum(self.avg_speed_in_last_three_sec.values()) / len(
-            self.avg_speed_in_last_three_sec
-        )
+        return self.speed_meter.getSpeed()
 
     ############################################################
 
@@ -117,15 +299,42 @@ class DownloadManager:
 
     ############################################################
 
+    def getRemainingBytes(self) -> float:
+        """估算所有任务还需要下载的字节数
+
+        剩余图片数乘以本章已下载图片的平均大小; 本章还没有下载完成的图片时使用所有任务的平均大小;
+        都没有时才退回到接口返回的章节大小。图片已经全部下载、正在保存的任务不再计入
+
+        Returns:
+            float: 剩余字节数
+        """
+        tasks = list(self.all_tasks.values())
+        transfers = [task["transfer"] for task in tasks]
+        num_pages = sum(transfer.num_pages for transfer in transfers)
+        avg_page_size = (
+            sum(transfer.page_bytes for transfer in transfers) / num_pages if num_pages else None
+        )
+
+        remaining = 0.0
+        for task in tasks:
+            if task["curr_rate"] == 1 or ("future" in task and task["future"].done()):
+                continue
+            page_size = task["transfer"].getPageSize() or avg_page_size
+            if task["num_imgs_left"] is not None and page_size is not None:
+                remaining += page_size * task["num_imgs_left"]
+            else:
+                remaining += task["size"] * (1 - task["curr_rate"])
+        return remaining
+
+    ############################################################
+
     def getTotalRemainedTimeStr(self) -> str:
         """获取所有任务的剩余时间的字符串表示
 
         Returns:
             str: 剩余时间的字符串表示
         """
-        total_size_left = sum(
-            task["size"] * (1 - task["curr_rate"]) for task in self.all_tasks.values()
-        )
+        total_size_left = self.getRemainingBytes()
         total_speed = self.getTotalSpeed()
         return self.formatTime(total_size_left / total_speed if total_speed != 0 else 1)
 
@@ -138,40 +347,104 @@ class DownloadManager:
             curr_id (int): 当前任务的ID
             epi (Episode): 要下载的章节
         """
+        self.updateQueueStatus(epi.id, STATUS_ACTIVE)
+
         # ?###########################################################
         # ? 初始化下载图片需要的参数
-        if not epi.init_imgsList():
+        if not self.token_batcher.initImgsList(epi):
             self.reportError(curr_id)
             return
 
         # ?###########################################################
-        # ? 下载所有图片
-        imgs_path = []
-        for index, img in enumerate(epi.imgs_token, start=1):
+        # ? 断点续传, 跳过上次已经下载并校验过的图片
+        num_imgs = len(epi.imgs_token)
+        if num_imgs == 0:
+            logger.error(f"《{epi.comic_name}》章节：{epi.title} 图片列表为空, 跳过!")
+            self.reporter.showMessage(
+                f"《{epi.comic_name}》章节：{epi.title} 获取到的图片列表为空!\n已暂时跳过此章节!\n请重新尝试或者重启软件!\n\n更多详细信息请查看日志文件, 或联系开发者！"
+            )
+            self.reportError(curr_id)
+            return
+        imgs_path: list[str | None] = [None] * num_imgs
+        resumed = epi.loadManifest()
+        for index, img_path in resumed.items():
+            imgs_path[index - 1] = img_path
+        if len(resumed) == num_imgs:
+            self.submitPostTask(curr_id, epi, imgs_path)
+            return
+        self.updateTaskInfo(curr_id, len(resumed) / num_imgs, num_imgs - len(resumed))
+
+        # ?###########################################################
+        # ? 并发下载剩余图片, 按图片序号存放路径以保证保存时的顺序
+        # ? 图片按序号提交, 开始下载时才从调度器中取用token, 过期的token会先重新获取
+        token_scheduler = TokenScheduler(epi, resumed)
+        transfer = self.all_tasks[curr_id]["transfer"]
+        page_executor = ThreadPoolExecutor(max_workers=self.max_page_workers)
+        futures: dict[Future, int] = {
+            page_executor.submit(epi.downloadImg, index, token_scheduler, transfer): index
+            for index in range(1, num_imgs + 1)
+            if index not in resumed
+        }
+
+        for num_finished, future in enumerate(as_completed(futures), start=len(resumed) + 1):
             if self.terminated:
-                epi.clear(imgs_path)
+                epi.suspend(list(resumed.values()) + self.__stopPageTasks(page_executor, futures))
                 return
-            img_url = f"{img['url']}?token={img['token']}"
-            img_path = epi.downloadImg(index, img_url)
+            img_path = future.result()
             if img_path is None:
                 self.reportError(curr_id)
-                epi.clearAfterSave(imgs_path)
+                epi.clearAfterSave(
+                    list(resumed.values()) + self.__stopPageTasks(page_executor, futures)
+                )
                 return
 
-            rate = index / len(epi.imgs_token)
+            imgs_path[futures[future] - 1] = img_path
 
-            imgs_path.append(img_path)
+            # ? 以完成的图片数计算进度, 保证进度单调递增
+            rate = num_finished / num_imgs
 
             # ?###########################################################
-            # ? 保存图片
-            save_path = None
+            # ? 保存图片, 交给后处理进程池, 保存完成后才会更新为100%
             if rate == 1:
-                save_path = epi.save(imgs_path)
+                page_executor.shutdown()
+                self.submitPostTask(curr_id, epi, imgs_path)
+                return
 
-            self.updateTaskInfo(curr_id, rate)
-            self.signal_rate_progress.emit(
-                {"taskID": curr_id, "rate": int(rate * 100), "path": save_path}
-            )
+            self.updateTaskInfo(curr_id, rate, num_imgs - num_finished)
+            self.reporter.reportProgress({"taskID": curr_id, "rate": int(rate * 100), "path": None})
+
+    ############################################################
+
+    def __stopPageTasks(self, page_executor: ThreadPoolExecutor, futures: dict) -> list[str]:
+        """取消章节内尚未开始的图片下载, 等待进行中的下载结束
+
+        Args:
+            page_executor (ThreadPoolExecutor): 章节内的图片下载线程池
+            futures (dict): 图片下载任务到图片序号的映射
+
+        Returns:
+            list: 已经下载到本地的临时图片路径列表
+        """
+        page_executor.shutdown(wait=True, cancel_futures=True)
+        return [
+            future.result()
+            for future in futures
+            if not future.cancelled() and future.exception() is None and future.result()
+        ]
+
+    ############################################################
+
+    def shutdown(self, cancel: bool = True) -> None:
+        """停止下载引擎, 退出程序时使用
+
+        Args:
+            cancel (bool): 是否终止进行中的任务并取消排队的任务, 为 False 时等待所有任务结束
+        """
+        if cancel:
+            self.terminated = True
+        self.executor.shutdown(wait=not cancel, cancel_futures=cancel)
+        self.token_batcher.prefetch_executor.shutdown(wait=not cancel, cancel_futures=cancel)
+        self.post_executor.shutdown(wait=not cancel, cancel_futures=cancel)
 
     ############################################################
     # ? 为以后的特典下载留的接口
@@ -200,13 +473,14 @@ class DownloadManager:
         Args:
             curr_id (int): 当前任务的ID
         """
-        self.signal_rate_progress.emit(
+        self.reporter.reportProgress(
             {
                 "taskID": curr_id,
                 "rate": -1,
             }
         )
-        self.all_tasks.pop(curr_id)
+        task = self.all_tasks.pop(curr_id)
+        self.updateQueueStatus(task["ep_id"], STATUS_FAILED)
 
     ############################################################
     def formatSpeed(self, speed: float) -> str:
@@ -0,0 +1,135 @@
+"""
+该模块包含了持久化的下载队列类，使用 SQLite 记录尚未完成的章节任务，以便程序重启或崩溃后继续下载
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.Episode import Episode
+
+STATUS_PENDING = "pending"
+STATUS_ACTIVE = "active"
+STATUS_FAILED = "failed"
+# ? 失败的任务在启动时自动重试的次数, 超过后从队列中删除, 需要用户手动重新下载
+MAX_FAILED_ATTEMPTS = 3
+
+
+class DownloadQueue:
+    """持久化下载队列类，记录等待中、下载中和失败的章节任务，完成的任务直接删除，
+    失败的任务在之后启动时自动重试，多次失败后删除"""
+
+    def __init__(self, db_path: str) -> None:
+        """
+        Args:
+            db_path (str): 数据库文件路径
+        """
+        self.lock = threading.Lock()
+        # ? 下载线程和主线程都会访问队列, 由 self.lock 保证同一时间只有一个线程使用连接
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    ep_id INTEGER PRIMARY KEY,
+                    comic_id INTEGER NOT NULL,
+                    source TEXT NOT NULL,
+                    save_path TEXT NOT NULL,
+                    comic_name TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            # ? 旧版本创建的队列没有失败次数
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")]
+            if "attempts" not in columns:
+                self.conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+    ############################################################
+
+    def add(self, epi: Episode) -> None:
+        """添加一个等待下载的章节, 已存在时重置为等待状态, 保留失败次数
+
+        Args:
+            epi (Episode): 要下载的章节
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+                ON CONFLICT(ep_id) DO UPDATE SET status = excluded.status, updated_at = excluded.updated_at
+                """,
+                (
+                    epi.id,
+                    epi.comic_id,
+                    epi.source,
+                    epi.save_path,
+                    epi.comic_name,
+                    epi.title,
+                    STATUS_PENDING,
+                    now,
+                    now,
+                ),
+            )
+
+    ############################################################
+
+    def setStatus(self, ep_id: int, status: str) -> None:
+        """更新章节任务的状态, 标记为失败时失败次数加一
+
+        Args:
+            ep_id (int): 章节ID
+            status (str): 新的状态
+        """
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                UPDATE jobs SET status = ?, updated_at = ?, attempts = attempts + ?
+                WHERE ep_id = ?
+                """,
+                (status, time.time(), int(status == STATUS_FAILED), ep_id),
+            )
+
+    ############################################################
+
+    def remove(self, ep_id: int) -> None:
+        """章节保存完成后从队列中删除
+
+        Args:
+            ep_id (int): 章节ID
+        """
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM jobs WHERE ep_id = ?", (ep_id,))
+
+    ############################################################
+
+    def getUnfinished(self) -> list[dict]:
+        """获取上次退出时尚未完成的章节任务, 包括失败次数未超过 MAX_FAILED_ATTEMPTS 的任务,
+        超过的任务从队列中删除, 需要用户手动重新下载
+
+        Returns:
+            list[dict]: 按加入顺序排列的任务列表
+        """
+        with self.lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM jobs WHERE status = ? AND attempts >= ?",
+                (STATUS_FAILED, MAX_FAILED_ATTEMPTS),
+            )
+            cursor = self.conn.execute(
+                """
+                SELECT ep_id, comic_id, source, save_path, comic_name, title, status
+                FROM jobs ORDER BY created_at
+                """
+            )
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -4,22 +4,38 @@
 
 from __future__ import annotations
 
-import glob
+import hashlib
+import io
 import json
 import os
 import re
 import shutil
+import threading
+import time
 from typing import TYPE_CHECKING
-from zipfile import ZipFile, ZIP_DEFLATED
+from urllib.parse import urlparse
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
 
 import piexif
 import requests
-from PIL import Image
 from py7zr import SevenZipFile
-from pypdf import PdfReader, PdfWriter
 from retrying import retry
 
 from src.ComicInfoXML import ComicInfoXML
+from src.DirectoryIndex import getDirectoryIndex
+from src.Metrics import (
+    STAGE_ARCHIVE,
+    STAGE_CHECKSUM,
+    STAGE_CLEANUP,
+    STAGE_EXIF,
+    STAGE_INDEX,
+    STAGE_PAGE_GET,
+    STAGE_TEMP_WRITE,
+    STAGE_TOKEN,
+    getMetrics,
+)
+from src.Reporter import BufferedReporter, Reporter
+from src.StreamingPDF import StreamingPDF
 from src.Utils import (
     MAX_RETRY_LARGE,
     MAX_RETRY_SMALL,
@@ -29,78 +45,248 @@ from src.Utils import (
     __app_name__,
     __copyright__,
     __version__,
+    getSession,
     isCheckSumValid,
     logger,
     myStrFilter,
+    readStream,
 )
 
 if TYPE_CHECKING:
-    from ui.MainGUI import MainGUI
+    from src.Config import Config
+    from src.Throughput import TaskTransfer
+    from src.TokenScheduler import TokenScheduler
+
+# ? Zip/Cbz 压缩方式对应的 (compress_type, compresslevel)
+ZIP_COMPRESSION = {
+    "stored": (ZIP_STORED, None),
+    "fast": (ZIP_DEFLATED, 1),
+    "default": (ZIP_DEFLATED, 6),
+    "best": (ZIP_DEFLATED, 9),
+}
+
+# ? 本身已经压缩过的图片格式, 再次 deflate 几乎不能减小体积, 只会白白占用CPU
+PRECOMPRESSED_FORMATS = {"jpg", "jpeg", "png", "webp", "gif", "avif"}
+
+
+# ?###########################################################
+# ? 修正章节标题使用的正则, 只在模块加载时编译一次
+TITLE_REPEATED_ORD = re.compile(r"^(\d+)\s+(第(\d+)话)")
+TITLE_REPEATED_ORD_NO_SUFFIX = re.compile(r"^(\d+)\s+(第(\d+))$")
+TITLE_REPEATED_SPECIAL = re.compile(r"^特别篇\s+特别篇")
+TITLE_NUMBER_WITH_SUFFIX = re.compile(r"^([0-9\-\.]+)话")
+TITLE_NUMBER_WITH_SPACE = re.compile(r"^([0-9\-\.]+) ")
+TITLE_NUMBER_ONLY = re.compile(r"^([0-9\-\.]+)$")
+
+
+def formatTitle(episode: dict) -> str:
+    """根据章节的原始数据生成用于显示和保存的章节标题
+
+    Args:
+        episode (dict): ComicDetail 接口返回的单个章节数据
+
+    Returns:
+        str: 过滤非法字符并修正重复序号后的章节标题
+    """
+    # ?###########################################################
+    # ? 修复标题中的特殊字符
+    short_title = myStrFilter(episode["short_title"])
+    title = myStrFilter(episode["title"])
+
+    # ?###########################################################
+    # ? 修复重复标题
+    if short_title == title or title == "":
+        title = short_title
+    else:
+        title = f"{short_title} {title}"
+    temp = TITLE_REPEATED_ORD.search(title)
+    if temp and temp[1] == temp[3]:
+        title = f"{temp[2]}{title[temp.end():]}"
+    temp = TITLE_REPEATED_ORD_NO_SUFFIX.search(title)
+    if temp and temp[1] == temp[3]:
+        title = f"{temp[2]}话{title[temp.end():]}"
+    title = TITLE_REPEATED_SPECIAL.sub("特别篇", title)
+
+    # ?###########################################################
+    # ? 修复短标题中的数字
+    title, count = TITLE_NUMBER_WITH_SUFFIX.subn(r"第\1话", title)
+    if not count:
+        title, count = TITLE_NUMBER_WITH_SPACE.subn(r"第\1话 ", title)
+    if not count:
+        title = TITLE_NUMBER_ONLY.sub(r"第\1话", title)
+    return title
 
 
 class Episode:
-    """漫画章节类，用于管理漫画章节的详细信息"""
+    """漫画章节类，用于管理漫画章节的详细信息
+
+    解析漫画时会为每个章节创建实例, 其中大部分章节不会被下载,
+    所以只保存原始数据, 标题、请求头和 ComicInfo.xml 在第一次使用时才生成
+    """
+
+    __slots__ = (
+        "reporter",
+        "id",
+        "comic_id",
+        "source",
+        "available",
+        "ord",
+        "real_ord",
+        "comic_name",
+        "size",
+        "imgs_urls",
+        "imgs_token",
+        "imgs_token_time",
+        "author",
+        "save_method",
+        "exif_setting",
+        "zip_compression",
+        "resume_download",
+        "cookie",
+        "save_path",
+        "episode",
+        "comic_info",
+        "imgs_in_memory",
+        "manifest",
+        "manifest_lock",
+        "_title",
+        "_headers",
+        "_comicinfoxml",
+    )
 
     def __init__(
-        self, episode: dict, comic_id: str, comic_info: dict, mainGUI: MainGUI, idx: int
+        self,
+        episode: dict,
+        comic_id: str,
+        comic_info: dict,
+        config: Config,
+        reporter: Reporter,
+        idx: int,
     ) -> None:
-        self.mainGUI = mainGUI
+        self.reporter = reporter
         self.id = episode["id"]
+        self.comic_id = comic_id
+        # ? 章节来源, 用于重启后恢复下载队列时重新解析章节
+        self.source = "bilibili"
         self.available = not episode["is_locked"]
         self.ord = episode["ord"]
         self.real_ord = idx
         self.comic_name = comic_info["title"]
         self.size = episode["size"]
+        self.imgs_urls = None
         self.imgs_token = None
+        # ? 获取 imgs_token 的时间 (time.monotonic), 用于判断token是否过期
+        self.imgs_token_time = None
         self.author = comic_info["author_name"]
-        self.save_method = mainGUI.getConfig("save_method")
-        self.exif_setting = mainGUI.getConfig("exif")
+        self.save_method = config.save_method
+        self.exif_setting = config.exif
+        self.zip_compression = config.zip_compression
+        self.resume_download = config.resume_download
+        self.cookie = config.cookie
+        self.save_path = comic_info["save_path"]
 
         # if self.ord != self.real_ord:
         #     logger.warning(
         #         f"章节序号错误！{self.comic_name} - {episode["title"]}; ord: {self.ord} ≠ real_ord: {self.real_ord}, 请责怪B站"
         #     )
 
+        # ? 原始数据只是引用, 不复制也不修改, 用于之后生成标题和 ComicInfo.xml
+        self.episode = episode
+        self.comic_info = comic_info
+        self._title = None
+        self._headers = None
+        self._comicinfoxml = None
+
+        # ? Zip和Cbz格式直接从内存写入压缩包, 图片不在磁盘上暂存, 键为对应的临时图片路径
+        self.imgs_in_memory: dict[str, bytes] = {}
+
+        # ? 断点续传清单, 记录已经下载并校验过的图片, 键为图片序号
+        self.manifest: dict[str, dict] = {}
+        self.manifest_lock = threading.Lock()
+
+    ############################################################
+
+    @property
+    def title(self) -> str:
+        """章节标题, 第一次使用时生成"""
+        if self._title is None:
+            self._title = formatTitle(self.episode)
+        return self._title
+
+    ############################################################
+
+    @property
+    def headers(self) -> dict:
+        """请求图片列表和token使用的请求头, 第一次使用时生成"""
+        if self._headers is None:
+            self._headers = {
+                "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
+                "origin": "https://manga.bilibili.com",
+                "referer": f"https://manga.bilibili.com/detail/mc{self.comic_id}/{self.id}?from=manga_homepage",
+                "cookie": f"SESSDATA={self.cookie}",
+            }
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers: dict) -> None:
+        self._headers = headers
+
+    ############################################################
+
+    @property
+    def comicinfoxml(self) -> ComicInfoXML:
+        """Cbz压缩包中的 ComicInfo.xml, 第一次使用时生成"""
+        if self._comicinfoxml is None:
+            self._comicinfoxml = ComicInfoXML(self.comic_info, self.episode)
+        return self._comicinfoxml
+
+    ############################################################
+
+    @property
+    def epi_path(self) -> str:
+        """章节的保存路径, 不含扩展名"""
+        return os.path.join(self.save_path, self.title)
+
+    ############################################################
+
+    @property
+    def manifest_path(self) -> str:
+        """断点续传清单的路径"""
+        return os.path.join(self.save_path, f".{self.id}_manifest.json")
+
+    ############################################################
+
+    def __getstate__(self) -> dict:
+        """章节会被发送到后处理进程中保存, 锁无法序列化,
+        子进程中需要提示的内容先记录在 BufferedReporter 中, 再由主进程转发
+
+        漫画的原始数据包含全部章节, 发送前先生成需要的字段, 不把原始数据一起序列化
+
+        Returns:
+            dict: 可以序列化的章节属性
+        """
+        state = {slot: getattr(self, slot) for slot in Episode.__slots__}
+        state["reporter"] = BufferedReporter()
+        state["manifest_lock"] = None
+        state["_title"] = self.title
         if self.save_method == "Cbz压缩包":
-            self.comicinfoxml = ComicInfoXML(comic_info, episode)
+            state["_comicinfoxml"] = self.comicinfoxml
+        state["episode"] = None
+        state["comic_info"] = None
+        return state
 
-        # ?###########################################################
-        # ? 修复标题中的特殊字符
-        episode["short_title"] = myStrFilter(episode["short_title"])
-        episode["title"] = myStrFilter(episode["title"])
+    ############################################################
 
-        # ?###########################################################
-        # ? 修复重复标题
-        if episode["short_title"] == episode["title"] or episode["title"] == "":
-            self.title = episode["short_title"]
-        else:
-            self.title = f"{episode['short_title']} {episode['title']}"
-        temp = re.search(r"^(\d+)\s+第(\d+)话", self.title)
-        if temp and temp[1] == temp[2]:
-            self.title = re.sub(r"^\d+\s+(第\d+话)", r"\1", self.title)
-        temp = re.search(r"^(\d+)\s+第(\d+)$", self.title)
-        if temp and temp[1] == temp[2]:
-            self.title = re.sub(r"^\d+\s+(第\d+)$", r"\1话", self.title)
-        if re.search(r"^特别篇\s+特别篇", self.title):
-            self.title = re.sub(r"^特别篇\s+特别篇", r"特别篇", self.title)
+    def __setstate__(self, state: dict) -> None:
+        """在后处理进程中恢复章节属性
 
-        # ?###########################################################
-        # ? 修复短标题中的数字
-        if re.search(r"^[0-9\-\.]+话", self.title):
-            self.title = re.sub(r"^([0-9\-\.]+)话", r"第\1话", self.title)
-        elif re.search(r"^[0-9\-\.]+ ", self.title):
-            self.title = re.sub(r"^([0-9\-\.]+) ", r"第\1话 ", self.title)
-        elif re.search(r"^[0-9\-\.]+$", self.title):
-            self.title = re.sub(r"^([0-9\-\.]+)$", r"第\1话", self.title)
-
-        self.headers = {
-            "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-            "origin": "https://manga.bilibili.com",
-            "referer": f"https://manga.bilibili.com/detail/mc{comic_id}/{self.id}?from=manga_homepage",
-            "cookie": f"SESSDATA={mainGUI.getConfig('cookie')}",
-        }
-        self.save_path = comic_info["save_path"]
-        self.epi_path = os.path.join(self.save_path, f"{self.title}")
+        Args:
+            state (dict): __getstate__ 返回的章节属性
+        """
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        # ? 保存失败时需要在子进程中写入断点续传清单
+        self.manifest_lock = threading.Lock()
 
     ############################################################
     def init_imgsList(self) -> bool:
@@ -109,8 +295,21 @@ class Episode:
         Returns
             bool: 是否初始化成功
         """
-        # ?###########################################################
-        # ? 获取图片列表
+        self.imgs_urls = self.fetchImgsIndex()
+        if self.imgs_urls is None:
+            return False
+        self.imgs_token_time = time.monotonic()
+        self.imgs_token = self.fetchImgsToken(self.imgs_urls)
+        return self.imgs_token is not None
+
+    ############################################################
+
+    def fetchImgsIndex(self) -> list[str] | None:
+        """获取章节内所有图片的地址
+
+        Returns
+            list[str] | None: 图片地址列表, 失败时返回 None
+        """
         GetImageIndexURL = (
             "https://manga.bilibili.com/twirp/comic.v1.Comic/GetImageIndex?device=pc&platform=web"
         )
@@ -118,12 +317,13 @@ class Episode:
         @retry(stop_max_delay=MAX_RETRY_SMALL, wait_exponential_multiplier=RETRY_WAIT_EX)
         def _() -> list[dict]:
             try:
-                res = requests.post(
-                    GetImageIndexURL,
-                    data={"ep_id": self.id},
-                    headers=self.headers,
-                    timeout=TIMEOUT_SMALL,
-                )
+                with getMetrics().timer(STAGE_INDEX, urlparse(GetImageIndexURL).hostname):
+                    res = getSession().post(
+                        GetImageIndexURL,
+                        data={"ep_id": self.id},
+                        headers=self.headers,
+                        timeout=TIMEOUT_SMALL,
+                    )
             except requests.RequestException as e:
                 logger.warning(
                     f"《{self.comic_name}》章节：{self.title}，获取图片列表失败! 重试中...\n{e}"
@@ -137,22 +337,45 @@ class Episode:
             return res.json()["data"]["images"]
 
         try:
-            imgs_urls = [img["path"] for img in _()]
+            return [img["path"] for img in _()]
         except requests.RequestException as e:
             logger.error(
                 f"《{self.comic_name}》章节：{self.title} 重复获取图片列表多次后失败!，跳过!\n{e}"
             )
             logger.exception(e)
-            self.mainGUI.signal_message_box.emit(
+            self.reporter.showMessage(
                 f"《{self.comic_name}》章节：{self.title} 重复获取图片列表多次后失败!\n"
                 f"已暂时跳过此章节!\n"
                 f"请检查网络连接或者重启软件!\n\n"
                 f"更多详细信息请查看日志文件, 或联系开发者！"
             )
-            return False
+            return None
 
-        # ?###########################################################
-        # ? 获取图片token
+    ############################################################
+
+    def refreshImgsToken(self, indexes: list[int]) -> list[dict] | None:
+        """为部分图片重新获取token, 用于token过期后继续下载剩余的图片
+
+        Args:
+            indexes (list[int]): 需要重新获取token的图片序号
+
+        Returns
+            list[dict] | None: 与图片序号一一对应的 {"url": 图片地址, "token": token}, 失败时返回 None
+        """
+        return self.fetchImgsToken([self.imgs_urls[index - 1] for index in indexes], silent=True)
+
+    ############################################################
+
+    def fetchImgsToken(self, imgs_urls: list[str], silent: bool = False) -> list[dict] | None:
+        """获取图片的token, 图片地址可以来自多个章节, 以便合并请求
+
+        Args:
+            imgs_urls (list[str]): 图片地址列表
+            silent (bool): 失败时不弹出提示, 用于重新获取token, 章节会继续使用旧的token下载
+
+        Returns
+            list[dict] | None: 与图片地址一一对应的 {"url": 图片地址, "token": token}, 失败时返回 None
+        """
         ImageTokenURL = (
             "https://manga.bilibili.com/twirp/comic.v1.Comic/ImageToken?device=pc&platform=web"
         )
@@ -160,12 +383,13 @@ class Episode:
         @retry(stop_max_delay=MAX_RETRY_SMALL, wait_exponential_multiplier=RETRY_WAIT_EX)
         def _() -> list[dict]:
             try:
-                res = requests.post(
-                    ImageTokenURL,
-                    data={"urls": json.dumps(imgs_urls)},
-                    headers=self.headers,
-                    timeout=TIMEOUT_SMALL,
-                )
+                with getMetrics().timer(STAGE_TOKEN, urlparse(ImageTokenURL).hostname):
+                    res = getSession().post(
+                        ImageTokenURL,
+                        data={"urls": json.dumps(imgs_urls)},
+                        headers=self.headers,
+                        timeout=TIMEOUT_SMALL,
+                    )
             except requests.RequestException as e:
                 logger.warning(
                     f"《{self.comic_name}》章节：{self.title}，获取图片token失败! 重试中...\n{e}"
@@ -179,20 +403,23 @@ class Episode:
             return res.json()["data"]
 
         try:
-            self.imgs_token = _()
+            return _()
         except requests.RequestException as e:
+            if silent:
+                logger.warning(
+                    f"《{self.comic_name}》章节：{self.title} 重新获取图片token多次后失败!\n{e}"
+                )
+                return None
             logger.error(
                 f"《{self.comic_name}》章节：{self.title} 重复获取图片token多次后失败，跳过!\n{e}"
             )
             logger.exception(e)
-            self.mainGUI.signal_message_box.emit(
+            self.reporter.showMessage(
                 f"《{self.comic_name}》章节：{self.title} 重复获取图片token多次后失败!\n"
                 f"已暂时跳过此章节!\n请检查网络连接或者重启软件!\n\n"
                 f"更多详细信息请查看日志文件, 或联系开发者！"
             )
-            return False
-
-        return True
+            return None
 
     ############################################################
 
@@ -206,6 +433,9 @@ class Episode:
         @retry(stop_max_attempt_number=3)
         def _() -> None:
             for img in reversed(imgs_path):
+                if self.imgs_in_memory.pop(img, None) is not None:
+                    imgs_path.remove(img)
+                    continue
                 try:
                     os.remove(img)
                     if os.path.exists(img):
@@ -218,13 +448,15 @@ class Episode:
                 imgs_path.remove(img)
 
         try:
-            _()
+            with getMetrics().timer(STAGE_CLEANUP):
+                _()
+                self.removeManifest()
         except OSError as e:
             logger.error(
                 f"《{self.comic_name}》章节：{self.title} 删除临时图片多次后失败!\n{imgs_path}\n{e}"
             )
             logger.exception(e)
-            self.mainGUI.signal_message_box.emit(
+            self.reporter.showMessage(
                 f"《{self.comic_name}》章节：{self.title} 删除临时图片多次后失败!\n请手动删除!\n\n更多详细信息请查看日志文件, 或联系开发者！"
             )
 
@@ -236,136 +468,241 @@ class Episode:
         Args:
             imgs_path (list): 临时图片路径列表
         """
-        for img in reversed(imgs_path):
-            os.remove(img)
-            imgs_path.remove(img)
+        with getMetrics().timer(STAGE_CLEANUP):
+            for img in reversed(imgs_path):
+                if self.imgs_in_memory.pop(img, None) is None:
+                    os.remove(img)
+                imgs_path.remove(img)
+            self.removeManifest()
+
+    ############################################################
+
+    def suspend(self, imgs_path: list[str]) -> None:
+        """终止下载时使用, 开启断点续传时保留已下载的图片和清单以便下次继续, 否则直接删除
+
+        Args:
+            imgs_path (list): 临时图片路径列表
+        """
+        if not self.resume_download:
+            self.clear(imgs_path)
+            return
+
+        # ? Zip和Cbz格式的图片只在内存中, 需要先写入临时文件才能在下次启动时继续
+        with self.manifest_lock:
+            for index, page in list(self.manifest.items()):
+                img = self.imgs_in_memory.pop(page["path"], None)
+                if img is None:
+                    continue
+                try:
+                    with open(page["path"], "wb") as f:
+                        f.write(img)
+                except OSError as e:
+                    logger.warning(
+                        f"《{self.comic_name}》章节：{self.title} - {page['path']} 保存断点续传图片失败!\n{e}"
+                    )
+                    self.manifest.pop(index)
+            self.writeManifest()
+
+    ############################################################
+
+    def loadManifest(self) -> dict[int, str]:
+        """读取断点续传清单, 重新校验MD5后返回上次已经下载好的图片
+
+        Returns:
+            dict[int, str]: 图片序号到临时图片路径的映射
+        """
+        if not self.resume_download or not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"《{self.comic_name}》章节：{self.title} 读取断点续传清单失败!\n{e}")
+            return {}
+        if not isinstance(manifest, dict) or manifest.get("ep_id") != self.id:
+            return {}
+        pages = manifest.get("pages")
+        if not isinstance(pages, dict):
+            return {}
+
+        finished = {}
+        for index, page in pages.items():
+            # ? 清单可能被截断或手动修改过, 跳过格式不正确的条目, 这些图片会重新下载
+            try:
+                index = int(index)
+                img_path, md5 = str(page["path"]), str(page["md5"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            if not 1 <= index <= len(self.imgs_token):
+                continue
+            try:
+                with open(img_path, "rb") as f:
+                    img = f.read()
+            except OSError:
+                continue
+            if hashlib.md5(img).hexdigest() != md5:
+                continue
+            if self.save_method in ("Zip压缩包", "Cbz压缩包"):
+                self.imgs_in_memory[img_path] = img
+                try:
+                    os.remove(img_path)
+                except OSError:
+                    pass
+            finished[index] = img_path
+            self.manifest[str(index)] = {"path": img_path, "md5": md5}
+
+        if finished:
+            logger.info(
+                f"《{self.comic_name}》章节：{self.title} 断点续传, 跳过已下载的 {len(finished)} 张图片"
+            )
+        return finished
+
+    ############################################################
+
+    def recordPage(self, index: int, img_path: str, md5: str) -> None:
+        """在断点续传清单中记录一张已经下载并校验过的图片
+
+        Args:
+            index (int): 章节中图片的序号
+            img_path (str): 临时图片路径
+            md5 (str): 图片的MD5
+        """
+        if not self.resume_download:
+            return
+        with self.manifest_lock:
+            self.manifest[str(index)] = {"path": img_path, "md5": md5}
+            # ? 只在内存中的图片等到终止时再写入
+            if img_path not in self.imgs_in_memory:
+                self.writeManifest()
+
+    ############################################################
+
+    def writeManifest(self) -> None:
+        """写入断点续传清单, 先写临时文件再替换, 避免中途退出时留下损坏的清单"""
+        temp_path = f"{self.manifest_path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"ep_id": self.id, "pages": self.manifest}, f)
+            os.replace(temp_path, self.manifest_path)
+        except OSError as e:
+            logger.warning(f"《{self.comic_name}》章节：{self.title} 写入断点续传清单失败!\n{e}")
 
     ############################################################
 
-    def save(self, imgs_path: list[str]) -> str:
+    def removeManifest(self) -> None:
+        """章节保存完成或放弃后删除断点续传清单"""
+        self.manifest.clear()
+        try:
+            os.remove(self.manifest_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"《{self.comic_name}》章节：{self.title} 删除断点续传清单失败!\n{e}")
+
+    ############################################################
+
+    def save(self, imgs_path: list[str]) -> str | None:
         """保存章节
 
         Args:
             imgs_path (list): 临时图片路径列表
 
         Returns:
-            str: 保存路径
+            str | None: 保存路径, 保存失败时返回 None
         """
 
         save_path = ""
+        success = False
         if self.save_method == "PDF":
-            self.saveToPDF(imgs_path)
+            success = self.saveToPDF(imgs_path)
             save_path = f"{self.epi_path}.pdf"
         elif self.save_method == "文件夹-图片":
-            self.saveToFolder(imgs_path)
+            success = self.saveToFolder(imgs_path)
             save_path = self.epi_path
         elif self.save_method == "7z压缩包":
-            self.saveTo7z(imgs_path)
+            success = self.saveTo7z(imgs_path)
             save_path = f"{self.epi_path}.7z"
         elif self.save_method == "Zip压缩包":
-            self.saveToZip(imgs_path)
+            success = self.saveToZip(imgs_path)
             save_path = f"{self.epi_path}.zip"
         elif self.save_method == "Cbz压缩包":
-            self.saveToCbz(imgs_path)
+            success = self.saveToCbz(imgs_path)
             save_path = f"{self.epi_path}.cbz"
+        # ? 保存失败时保留断点续传清单, 下次可以从还在的临时图片继续
+        if not success:
+            return None
+        self.removeManifest()
         return save_path
 
     ############################################################
-    def saveToPDF(self, imgs_path: list[str]) -> None:
+    def saveToPDF(self, imgs_path: list[str]) -> bool:
         """将图片保存为PDF文件
 
         Args:
             imgs_path (list): 临时图片路径列表
+
+        Returns:
+            bool: 是否保存成功
         """
 
         @retry(stop_max_attempt_number=5)
         def _() -> None:
             try:
-                # 因为pdf的兼容性, 统一转换为RGB模式
-                temp_imgs = [Image.open(x) for x in imgs_path]
-                for i, img in enumerate(temp_imgs):
-                    if img.mode != "RGB":
-                        temp_imgs[i] = img.convert("RGB")
-
-                temp_imgs[0].save(
-                    f"{self.epi_path}.pdf",
-                    save_all=True,
-                    append_images=temp_imgs[1:],
-                    quality=95,
-                )
-
-                # 关闭所有图像, 释放内存
-                for img in temp_imgs:
-                    img.close()
+                # 逐页写入PDF, JPEG 直接嵌入不重新编码, 内存中只保留当前页
+                with getMetrics().timer(STAGE_ARCHIVE), StreamingPDF(
+                    f"{self.epi_path}.pdf", quality=95
+                ) as pdf:
+                    # 在pdf文件属性中记录章节标题作者和软件版本以及版权信息
+                    if self.exif_setting:
+                        pdf.setMetadata(
+                            {
+                                "Title": f"《{self.comic_name}》 - {self.title}",
+                                "Author": self.author,
+                                "Creator": f"{__app_name__} {__version__} {__copyright__}",
+                            }
+                        )
+                    for img_path in imgs_path:
+                        pdf.addImage(img_path)
                 self.clearAfterSave(imgs_path)
 
-                # 在pdf文件属性中记录章节标题作者和软件版本以及版权信息
-                if not self.exif_setting:
-                    return
-                with open(f"{self.epi_path}.pdf", "rb") as f:
-                    pdf = PdfReader(f)
-                    pdf_writer = PdfWriter()
-                    pdf_writer.append_pages_from_reader(pdf)
-                    pdf_writer.add_metadata(
-                        {
-                            "/Title": f"《{self.comic_name}》 - {self.title}",
-                            "/Author": self.author,
-                            "/Creator": f"{__app_name__} {__version__} {__copyright__}",
-                        }
-                    )
-                    with open(f"{self.epi_path}.pdf", "wb") as f:
-                        pdf_writer.write(f)
-
             except OSError as e:
                 logger.error(f"《{self.comic_name}》章节：{self.title} 合并PDF失败! 重试中...\n{e}")
                 raise e
 
         try:
             _()
+            return True
         except OSError as e:
             logger.error(f"《{self.comic_name}》章节：{self.title} 合并PDF多次后失败!\n{e}")
             logger.exception(e)
-            self.mainGUI.signal_message_box.emit(
+            self.reporter.showMessage(
                 f"《{self.comic_name}》章节：{self.title} 合并PDF多次后失败!\n已暂时跳过此章节!\n请重新尝试或者重启软件!\n\n更多详细信息请查看日志文件, 或联系开发者！"
             )
+            return False
 
     ############################################################
-    def saveToFolder(self, imgs_path: list[str]) -> None:
+    def saveToFolder(self, imgs_path: list[str]) -> bool:
         """将图片保存到文件夹
 
         Args:
             imgs_path (list): 临时图片路径列表
+
+        Returns:
+            bool: 是否保存成功
         """
 
         @retry(stop_max_attempt_number=5)
         def _() -> None:
             try:
                 for index, img_path in enumerate(imgs_path, start=1):
-
-                    def jpg_exif(img_path: str):
-                        # 在jpg文件属性中记录章节标题作者和软件版本以及版权信息
-                        exif_data = {
-                            "0th": {
-                                piexif.ImageIFD.ImageDescription: f"《{self.comic_name}》 - {self.title}".encode(
-                                    "utf-8"
-                                ),
-                                piexif.ImageIFD.Artist: self.author.encode("utf-8"),
-                                piexif.ImageIFD.Software: f"{__app_name__} {__version__}".encode(
-                                    "utf-8"
-                                ),
-                                piexif.ImageIFD.Copyright: __copyright__,
-                            }
-                        }
-                        exif_bytes = piexif.dump(exif_data)
-                        piexif.insert(exif_bytes, img_path)
-
                     img_format = img_path.split(".")[-1]
 
                     # 将 exif 数据插入到图像文件中, 如果插入失败则跳过
                     if self.exif_setting:
                         try:
                             if img_format == "jpg":
-                                jpg_exif(img_path)
+                                with getMetrics().timer(STAGE_EXIF):
+                                    piexif.insert(self.getExifBytes(), img_path)
                         except piexif.InvalidImageDataError as e:
                             logger.warning(f"Failed to insert exif data for {img_path}: {e}")
                             logger.exception(e)
@@ -386,29 +723,37 @@ class Episode:
             if not os.path.exists(self.epi_path):
                 os.makedirs(self.epi_path)
             _()
+            return True
         except OSError as e:
             logger.error(
                 f"《{self.comic_name}》章节：{self.title} 保存图片到文件夹多次后失败!\n{e}"
             )
             logger.exception(e)
-            self.mainGUI.signal_message_box.emit(
+            self.reporter.showMessage(
                 f"《{self.comic_name}》章节：{self.title} 保存图片到文件夹多次后失败!\n已暂时跳过此章节!\n请重新尝试或者重启软件!\n\n更多详细信息请查看日志文件, 或联系开发者！"
             )
+            return False
 
     ############################################################
-    def saveTo7z(self, imgs_path: list[str]) -> None:
+    def saveTo7z(self, imgs_path: list[str]) -> bool:
         """将图片保存到7z压缩文件
 
         Args:
             imgs_path (list): 临时图片路径列表
+
+        Returns:
+            bool: 是否保存成功
         """
 
-        self.saveToFolder(imgs_path)
+        if not self.saveToFolder(imgs_path):
+            return False
 
         @retry(stop_max_attempt_number=5)
         def _() -> None:
             try:
-                with SevenZipFile(f"{self.epi_path}.7z", "w") as z:
+                with getMetrics().timer(STAGE_ARCHIVE), SevenZipFile(
+                    f"{self.epi_path}.7z", "w"
+                ) as z:
                     # 压缩文件里不要子目录，全部存在根目录
                     for root, _dirs, files in os.walk(self.epi_path):
                         for file in files:
@@ -416,6 +761,7 @@ class Episode:
                                 os.path.join(root, file),
                                 os.path.basename(os.path.join(root, file)),
                             )
+                with getMetrics().timer(STAGE_CLEANUP):
                     shutil.rmtree(self.epi_path)
             except OSError as e:
                 logger.error(
@@ -425,150 +771,271 @@ class Episode:
 
         try:
             _()
+            return True
         except OSError as e:
             logger.error(f"《{self.comic_name}》章节：{self.title} 保存图片到7z多次后失败!\n{e}")
             logger.exception(e)
-            self.mainGUI.signal_message_box.emit(
+            self.reporter.showMessage(
                 f"《{self.comic_name}》章节：{self.title} 保存图片到7z多次后失败!\n已暂时跳过此章节!\n请重新尝试或者重启软件!\n\n更多详细信息请查看日志文件, 或联系开发者！"
             )
+            return False
 
     ############################################################
 
-    def saveToZip(self, imgs_path: list[str]) -> None:
+    def saveToZip(self, imgs_path: list[str]) -> bool:
         """将图片保存到Zip压缩文件
 
         Args:
             imgs_path (list): 临时图片路径列表
+
+        Returns:
+            bool: 是否保存成功
+        """
+
+        return self.saveToZipFile(imgs_path, f"{self.epi_path}.zip", "Zip")
+
+    ############################################################
+
+    def saveToCbz(self, imgs_path: list[str]) -> bool:
+        """将图片保存到Cbz压缩文件
+
+        Args:
+            imgs_path (list): 临时图片路径列表
+
+        Returns:
+            bool: 是否保存成功
         """
 
-        self.saveToFolder(imgs_path)
+        return self.saveToZipFile(
+            imgs_path, f"{self.epi_path}.cbz", "Cbz", self.comicinfoxml.toString()
+        )
+
+    ############################################################
+
+    def saveToZipFile(
+        self, imgs_path: list[str], zip_path: str, zip_type: str, comic_info: str = None
+    ) -> bool:
+        """将内存中的图片直接写入Zip格式的压缩文件, 不经过临时文件夹
+
+        Args:
+            imgs_path (list): 临时图片路径列表, 图片内容保存在 imgs_in_memory 中
+            zip_path (str): 压缩文件路径
+            zip_type (str): 压缩文件类型, 用于日志和提示
+            comic_info (str): ComicInfo.xml的内容, 为 None 时不写入
+
+        Returns:
+            bool: 是否保存成功
+        """
 
         @retry(stop_max_attempt_number=5)
         def _() -> None:
             try:
-                with ZipFile(f"{self.epi_path}.zip", "w", compression=ZIP_DEFLATED) as z:
+                with getMetrics().timer(STAGE_ARCHIVE), ZipFile(
+                    zip_path, "w", compression=ZIP_DEFLATED
+                ) as z:
                     # 压缩文件里不要子目录，全部存在根目录
-                    for root, _dirs, files in os.walk(self.epi_path):
-                        for file in files:
-                            z.write(
-                                os.path.join(root, file),
-                                os.path.basename(os.path.join(root, file)),
-                            )
-                    shutil.rmtree(self.epi_path)
+                    for index, img_path in enumerate(imgs_path, start=1):
+                        img_format = img_path.split(".")[-1]
+                        img = self.imgs_in_memory[img_path]
+                        if self.exif_setting and img_format == "jpg":
+                            img = self.insertJpgExif(img, img_path)
+                        compress_type, compress_level = self.getZipCompression(img_format)
+                        z.writestr(
+                            f"{str(index).zfill(3)}.{img_format}",
+                            img,
+                            compress_type=compress_type,
+                            compresslevel=compress_level,
+                        )
+                    if comic_info is not None:
+                        compress_type, compress_level = self.getZipCompression("xml")
+                        z.writestr(
+                            "ComicInfo.xml",
+                            comic_info,
+                            compress_type=compress_type,
+                            compresslevel=compress_level,
+                        )
             except OSError as e:
                 logger.error(
-                    f"《{self.comic_name}》章节：{self.title} 保存图片到Zip失败! 重试中...\n{e}"
+                    f"《{self.comic_name}》章节：{self.title} 保存图片到{zip_type}失败! 重试中...\n{e}"
                 )
                 raise e
 
         try:
             _()
         except OSError as e:
-            logger.error(f"《{self.comic_name}》章节：{self.title} 保存图片到Zip多次后失败!\n{e}")
+            logger.error(
+                f"《{self.comic_name}》章节：{self.title} 保存图片到{zip_type}多次后失败!\n{e}"
+            )
             logger.exception(e)
-            self.mainGUI.signal_message_box.emit(
-                f"《{self.comic_name}》章节：{self.title} 保存图片到Zip多次后失败!\n已暂时跳过此章节!\n请重新尝试或者重启软件!\n\n更多详细信息请查看日志文件, 或联系开发者！"
+            self.reporter.showMessage(
+                f"《{self.comic_name}》章节：{self.title} 保存图片到{zip_type}多次后失败!\n已暂时跳过此章节!\n请重新尝试或者重启软件!\n\n更多详细信息请查看日志文件, 或联系开发者！"
             )
+            # ? 图片只在内存中, 写入临时文件并保留断点续传清单, 下次可以直接从清单恢复
+            self.suspend(imgs_path)
+            return False
+        self.clear(imgs_path)
+        return True
 
     ############################################################
 
-    def saveToCbz(self, imgs_path: list[str]) -> None:
-        """将图片保存到Cbz压缩文件
+    def getZipCompression(self, file_format: str) -> tuple[int, int | None]:
+        """根据设置和文件格式决定写入Zip时的压缩方式
+
+        自动模式下已经压缩过的图片只存储不压缩, 其他文件使用默认级别的 deflate
 
         Args:
-            imgs_path (list): 临时图片路径列表
+            file_format (str): 文件扩展名
+
+        Returns:
+            tuple[int, int | None]: (compress_type, compresslevel)
         """
+        if self.zip_compression in ZIP_COMPRESSION:
+            return ZIP_COMPRESSION[self.zip_compression]
+        if file_format.lower() in PRECOMPRESSED_FORMATS:
+            return ZIP_COMPRESSION["stored"]
+        return ZIP_COMPRESSION["default"]
 
-        self.saveToFolder(imgs_path)
-        self.comicinfoxml.serialize(self.epi_path)
+    ############################################################
 
-        @retry(stop_max_attempt_number=5)
-        def _() -> None:
-            try:
-                with ZipFile(f"{self.epi_path}.cbz", "w", compression=ZIP_DEFLATED) as z:
-                    # 压缩文件里不要子目录，全部存在根目录
-                    for root, _dirs, files in os.walk(self.epi_path):
-                        for file in files:
-                            z.write(
-                                os.path.join(root, file),
-                                os.path.basename(os.path.join(root, file)),
-                            )
-                    shutil.rmtree(self.epi_path)
-            except OSError as e:
-                logger.error(
-                    f"《{self.comic_name}》章节：{self.title} 保存图片到Cbz失败! 重试中...\n{e}"
-                )
-                raise e
+    def getExifBytes(self) -> bytes:
+        """生成在jpg文件属性中记录章节标题作者和软件版本以及版权信息的exif数据
+
+        Returns:
+            bytes: exif数据
+        """
+        exif_data = {
+            "0th": {
+                piexif.ImageIFD.ImageDescription: f"《{self.comic_name}》 - {self.title}".encode(
+                    "utf-8"
+                ),
+                piexif.ImageIFD.Artist: self.author.encode("utf-8"),
+                piexif.ImageIFD.Software: f"{__app_name__} {__version__}".encode("utf-8"),
+                piexif.ImageIFD.Copyright: __copyright__,
+            }
+        }
+        return piexif.dump(exif_data)
+
+    ############################################################
+
+    def insertJpgExif(self, img: bytes, img_path: str) -> bytes:
+        """将 exif 数据插入到内存中的jpg图片, 如果插入失败则返回原图
+
+        Args:
+            img (bytes): 图片内容
+            img_path (str): 临时图片路径, 仅用于日志
 
+        Returns:
+            bytes: 插入 exif 后的图片内容
+        """
         try:
-            _()
-        except OSError as e:
-            logger.error(f"《{self.comic_name}》章节：{self.title} 保存图片到Cbz多次后失败!\n{e}")
+            with getMetrics().timer(STAGE_EXIF), io.BytesIO() as output:
+                piexif.insert(self.getExifBytes(), img, output)
+                return output.getvalue()
+        except (piexif.InvalidImageDataError, ValueError) as e:
+            logger.warning(f"Failed to insert exif data for {img_path}: {e}")
             logger.exception(e)
-            self.mainGUI.signal_message_box.emit(
-                f"《{self.comic_name}》章节：{self.title} 保存图片到Cbz多次后失败!\n已暂时跳过此章节!\n请重新尝试或者重启软件!\n\n更多详细信息请查看日志文件, 或联系开发者！"
-            )
+            return img
 
     ############################################################
 
-    def downloadImg(self, index: int, img_url: str) -> str:
+    def downloadImg(
+        self, index: int, token_scheduler: TokenScheduler, transfer: TaskTransfer = None
+    ) -> str:
         """根据 url 和 token 下载图片
 
         Args:
             index (int): 章节中图片的序号
-            img_url (str): 图片的合法 url
+            token_scheduler (TokenScheduler): 章节的token调度器, 每次请求前从中获取带有效token的 url
+            transfer (TaskTransfer): 章节任务的字节统计, 为 None 时不统计
 
         Returns:
             str: 图片的保存路径
         """
+        img_url = ""
 
         # ?###########################################################
         # ? 下载图片
         @retry(stop_max_delay=MAX_RETRY_LARGE, wait_exponential_multiplier=RETRY_WAIT_EX)
-        def _() -> bytes:
+        def _() -> tuple[bytes, str]:
+            nonlocal img_url
+            img_url = token_scheduler.getImgUrl(index)
+            host = urlparse(img_url).hostname
             try:
-                res = requests.get(img_url, timeout=TIMEOUT_LARGE)
+                with getMetrics().timer(STAGE_PAGE_GET, host):
+                    # ? 分块读取图片, 每收到一块就计入字节统计, 速度按实际收到的字节数计算
+                    res = getSession().get(img_url, timeout=TIMEOUT_LARGE, stream=True)
+                    if res.status_code == 200:
+                        img = readStream(res, transfer.addChunk if transfer else None)
             except requests.RequestException as e:
                 logger.warning(
                     f"《{self.comic_name}》章节：{self.title} - {index} - {img_url} 下载图片失败! 重试中...\n{e}"
                 )
                 raise e
             if res.status_code != 200:
+                res.close()
                 logger.warning(
                     f"《{self.comic_name}》章节：{self.title} - {index} - {img_url} 获取图片 header 失败! "
                     f"状态码：{res.status_code}, 理由: {res.reason} 重试中..."
                 )
+                # ? token 过期时服务器会拒绝请求, 下次重试前重新获取token
+                if res.status_code in (401, 403):
+                    token_scheduler.invalidate(index)
                 raise requests.HTTPError()
-            isValid, md5 = isCheckSumValid(res.headers["Etag"], res.content)
+            with getMetrics().timer(STAGE_CHECKSUM, host):
+                isValid, md5 = isCheckSumValid(res.headers["Etag"], img)
             if not isValid:
                 logger.warning(
                     f"《{self.comic_name}》章节：{self.title} - {index} - {img_url} - 下载内容Checksum不正确! 重试中...\n"
                     f"\t{res.headers['Etag']} ≠ {md5}"
                 )
                 raise requests.HTTPError()
-            return res.content
+            return img, md5
 
         try:
-            img = _()
+            img, md5 = _()
         except requests.RequestException as e:
             logger.error(
                 f"《{self.comic_name}》章节：{self.title} - {index} - {img_url} 重复下载图片多次后失败!\n{e}"
             )
             logger.exception(e)
-            self.mainGUI.signal_message_box.emit(
+            self.reporter.showMessage(
                 f"《{self.comic_name}》章节：{self.title} 重复下载图片多次后失败!\n已暂时跳过此章节!\n请检查网络连接或者重启软件!\n\n更多详细信息请查看日志文件, 或联系开发者！"
             )
             return None
 
-        # ?###########################################################
-        # ? 保存图片
+        token_scheduler.markFinished(index)
+        if transfer is not None:
+            transfer.finishPage(len(img))
+        return self.saveImg(index, img_url, img, md5)
+
+    ############################################################
+
+    def saveImg(self, index: int, img_url: str, img: bytes, md5: str) -> str:
+        """将下载好的图片写入临时文件, 并记录到断点续传清单中
+
+        Args:
+            index (int): 章节中图片的序号
+            img_url (str): 图片的合法 url
+            img (bytes): 图片内容
+            md5 (str): 图片的MD5
+
+        Returns:
+            str: 图片的保存路径
+        """
         img_format = img_url.split(".")[-1].split("?")[0].lower()
         path_to_save = os.path.join(self.save_path, f"{self.real_ord}_{index}.{img_format}")
 
+        if self.save_method in ("Zip压缩包", "Cbz压缩包"):
+            self.imgs_in_memory[path_to_save] = img
+            self.recordPage(index, path_to_save, md5)
+            return path_to_save
+
+        host = urlparse(img_url).hostname
+
         @retry(stop_max_attempt_number=5)
         def _() -> None:
             try:
-                with open(path_to_save, "wb") as f:
+                with getMetrics().timer(STAGE_TEMP_WRITE, host), open(path_to_save, "wb") as f:
                     f.write(img)
             except OSError as e:
                 logger.error(
@@ -583,7 +1050,7 @@ class Episode:
                 f"《{self.comic_name}》章节：{self.title} - {index} - {img_url} - {path_to_save} - 保存图片多次后失败!\n{e}"
             )
             logger.exception(e)
-            self.mainGUI.signal_message_box.emit(
+            self.reporter.showMessage(
                 f"《{self.comic_name}》章节：{self.title} - {index} - 保存图片多次后失败!\n"
                 f"已暂时跳过此章节, 并删除所有缓存文件！\n"
                 f"请重新尝试或者重启软件!\n\n"
@@ -591,6 +1058,7 @@ class Episode:
             )
             return None
 
+        self.recordPage(index, path_to_save, md5)
         return path_to_save
 
     ############################################################
@@ -610,6 +1078,4 @@ class Episode:
         Returns:
             bool: True: 已下载; False: 未下载
         """
-        file_name = re.sub(r"(\[|\])", r"[\1]", self.epi_path)
-        file_list = glob.glob(f"{file_name}*")
-        return len(file_list) > 0
+        return getDirectoryIndex().hasPrefix(self.save_path, self.title)
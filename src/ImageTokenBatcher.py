@@ -0,0 +1,219 @@
+"""
+该模块包含了图片token的批量请求类，提前获取即将下载的章节的图片列表，并把多个章节的 ImageToken 请求合并为一次
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from src.Utils import logger
+
+if TYPE_CHECKING:
+    from src.Episode import Episode
+
+# ? 单次 ImageToken 请求最多包含的图片数, 单个章节超过此数量时仍然单独请求
+IMAGE_TOKEN_BATCH_SIZE = 200
+# ? 后台预取图片列表的线程数
+INDEX_PREFETCH_WORKERS = 2
+# ? 最多提前获取图片列表的章节数为合并章节数的倍数, 避免队列很长时一次性请求所有章节
+INDEX_PREFETCH_FACTOR = 2
+
+
+class ImageTokenBatcher:
+    """图片token批量请求类
+
+    章节任务创建时就在后台获取排在前面的章节的图片列表; 章节开始下载时, 把同一漫画中图片列表已经就绪、
+    即将开始下载的章节合并到同一个 ImageToken 请求中, 其余章节直接使用请求结果,
+    合并请求失败时每个章节再单独请求一次
+    """
+
+    def __init__(self, lookahead: int) -> None:
+        """
+        Args:
+            lookahead (int): 一次请求最多合并的章节数, 通常等于同时下载的章节数, 避免token提前太久获取
+        """
+        self.lookahead = max(lookahead, 1)
+        self.prefetch_limit = self.lookahead * INDEX_PREFETCH_FACTOR
+        self.prefetch_executor = ThreadPoolExecutor(max_workers=INDEX_PREFETCH_WORKERS)
+        self.index_futures: dict[int, Future] = {}
+        self.token_futures: dict[int, Future] = {}
+        # ? 已经创建任务但还没有获取token的章节, 按创建顺序排列
+        self.waiting: dict[int, Episode] = {}
+        self.lock = threading.Lock()
+
+    ############################################################
+
+    def schedule(self, epi: Episode) -> None:
+        """章节任务创建时调用, 排在前面的章节在后台预取图片列表
+
+        Args:
+            epi (Episode): 要下载的章节
+        """
+        # ? BiliPlus 的图片列表自带token, 不需要合并请求
+        if epi.source != "bilibili":
+            return
+        with self.lock:
+            self.waiting[epi.id] = epi
+            self.__prefetch()
+
+    ############################################################
+
+    def __prefetch(self) -> None:
+        """按创建顺序为还没有开始下载的章节预取图片列表, 不超过预取上限, 需要在持有锁时调用"""
+        num_prefetched = sum(1 for ep_id in self.waiting if ep_id in self.index_futures)
+        for epi in self.waiting.values():
+            if num_prefetched >= self.prefetch_limit:
+                break
+            if epi.id not in self.index_futures:
+                self.index_futures[epi.id] = self.prefetch_executor.submit(epi.fetchImgsIndex)
+                num_prefetched += 1
+
+    ############################################################
+
+    def initImgsList(self, epi: Episode) -> bool:
+        """在章节下载线程中调用, 代替 Episode.init_imgsList
+
+        Args:
+            epi (Episode): 要下载的章节
+
+        Returns:
+            bool: 是否初始化成功
+        """
+        fetch_index = False
+        with self.lock:
+            if epi.id not in self.waiting and epi.id not in self.index_futures:
+                return epi.init_imgsList()
+            # ? 超出预取上限还没有开始预取的章节, 在当前线程获取图片列表后照常参与合并
+            index_future = self.index_futures.get(epi.id)
+            if index_future is None:
+                index_future = Future()
+                self.index_futures[epi.id] = index_future
+                fetch_index = True
+        if fetch_index:
+            try:
+                index_future.set_result(epi.fetchImgsIndex())
+            except Exception as e:
+                index_future.set_exception(e)
+
+        imgs_urls = index_future.result()
+        if imgs_urls is None:
+            self.__discard(epi.id)
+            return False
+
+        # ?###########################################################
+        # ? 已经被其他章节合并请求过的直接等待结果, 否则由当前章节发起一次合并请求
+        batch = None
+        with self.lock:
+            token_future = self.token_futures.get(epi.id)
+            if token_future is None:
+                batch = self.__collectBatch(epi, imgs_urls)
+                token_future = Future()
+                for batch_epi, _ in batch:
+                    self.token_futures[batch_epi.id] = token_future
+                    self.waiting.pop(batch_epi.id, None)
+                self.__prefetch()
+        if batch is not None:
+            self.__fetchBatch(epi, batch, token_future)
+
+        issued_at, result = token_future.result()
+        imgs_token = result.get(epi.id)
+        self.__discard(epi.id)
+        if imgs_token is None:
+            # ? 只有当前章节的请求已经提示过用户, 合并请求失败时每个章节单独重新请求
+            if batch is not None and len(batch) == 1:
+                return False
+            logger.warning(
+                f"《{epi.comic_name}》章节：{epi.title} 合并获取图片token失败, 单独重新获取"
+            )
+            issued_at = time.monotonic()
+            imgs_token = epi.fetchImgsToken(imgs_urls)
+            if imgs_token is None:
+                return False
+        epi.imgs_urls = imgs_urls
+        epi.imgs_token = imgs_token
+        epi.imgs_token_time = issued_at
+        return True
+
+    ############################################################
+
+    def __collectBatch(self, epi: Episode, imgs_urls: list[str]) -> list[tuple[Episode, list]]:
+        """挑选可以与当前章节合并请求的章节, 需要在持有锁时调用
+
+        Args:
+            epi (Episode): 发起请求的章节
+            imgs_urls (list[str]): 发起请求的章节的图片列表
+
+        Returns:
+            list[tuple[Episode, list]]: (章节, 图片列表) 列表, 第一项为发起请求的章节
+        """
+        batch = [(epi, imgs_urls)]
+        num_urls = len(imgs_urls)
+        for other in self.waiting.values():
+            if len(batch) >= self.lookahead:
+                break
+            future = self.index_futures.get(other.id)
+            if (
+                other.id == epi.id
+                or other.comic_id != epi.comic_id
+                or other.id in self.token_futures
+                or future is None
+                or not future.done()
+                or future.exception() is not None
+                or future.result() is None
+                or num_urls + len(future.result()) > IMAGE_TOKEN_BATCH_SIZE
+            ):
+                continue
+            batch.append((other, future.result()))
+            num_urls += len(future.result())
+        return batch
+
+    ############################################################
+
+    def __fetchBatch(
+        self, epi: Episode, batch: list[tuple[Episode, list]], token_future: Future
+    ) -> None:
+        """发起合并后的 ImageToken 请求, 并按章节拆分结果
+
+        Args:
+            epi (Episode): 发起请求的章节, 只有它一个章节时失败由它提示用户
+            batch (list[tuple[Episode, list]]): (章节, 图片列表) 列表
+            token_future (Future): 结果为 (获取token的时间, 章节ID到token列表的映射), 失败的章节不在映射中
+        """
+        issued_at = time.monotonic()
+        result: dict[int, list[dict]] = {}
+        try:
+            imgs_urls = [url for _, urls in batch for url in urls]
+            imgs_token = epi.fetchImgsToken(imgs_urls, silent=len(batch) > 1)
+            if imgs_token is not None and len(imgs_token) != len(imgs_urls):
+                logger.error(
+                    f"《{epi.comic_name}》合并获取图片token的数量不正确! "
+                    f"{len(imgs_token)} ≠ {len(imgs_urls)}"
+                )
+                imgs_token = None
+            if imgs_token is not None:
+                start = 0
+                for batch_epi, urls in batch:
+                    result[batch_epi.id] = imgs_token[start : start + len(urls)]
+                    start += len(urls)
+        except Exception as e:
+            logger.error(f"《{epi.comic_name}》章节：{epi.title} 合并获取图片token时意外失败!\n{e}")
+            logger.exception(e)
+        finally:
+            token_future.set_result((issued_at, result))
+
+    ############################################################
+
+    def __discard(self, ep_id: int) -> None:
+        """章节初始化结束后清理记录
+
+        Args:
+            ep_id (int): 章节ID
+        """
+        with self.lock:
+            self.index_futures.pop(ep_id, None)
+            self.token_futures.pop(ep_id, None)
+            self.waiting.pop(ep_id, None)
+            self.__prefetch()
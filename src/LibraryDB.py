@@ -0,0 +1,323 @@
+"""
+该模块包含了本地库存数据库类，使用 SQLite 记录库存中的漫画和已下载的章节，代替每次启动时扫描元数据.json
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from src.Utils import data_path, logger
+
+if TYPE_CHECKING:
+    from src.Episode import Episode
+
+
+class LibraryDB:
+    """本地库存数据库类，下载完成时增量更新，我的库存和已下载章节数直接查询"""
+
+    def __init__(self, db_path: str) -> None:
+        """
+        Args:
+            db_path (str): 数据库文件路径
+        """
+        self.lock = threading.Lock()
+        # ? 下载回调, 解析线程和主线程都会访问, 由 self.lock 保证同一时间只有一个线程使用连接
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS comics (
+                    comic_id INTEGER PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    comic_path TEXT NOT NULL,
+                    author_name TEXT,
+                    styles TEXT,
+                    vertical_cover TEXT,
+                    last_ord REAL,
+                    renewal_time TEXT,
+                    is_finish INTEGER,
+                    num_episodes INTEGER,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS episodes (
+                    ep_id INTEGER PRIMARY KEY,
+                    comic_id INTEGER NOT NULL,
+                    ord REAL,
+                    title TEXT NOT NULL,
+                    save_method TEXT,
+                    file_path TEXT,
+                    file_size INTEGER,
+                    checksum TEXT,
+                    downloaded_at REAL NOT NULL
+                )
+                """
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS episodes_comic_id ON episodes (comic_id)")
+            # ? 上次更新时漫画的全部章节, 用于增量更新时找出新章节
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS known_episodes (
+                    ep_id INTEGER PRIMARY KEY,
+                    comic_id INTEGER NOT NULL
+                )
+                """
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS known_episodes_comic_id ON known_episodes (comic_id)"
+            )
+
+    ############################################################
+
+    def upsertComic(self, data: dict) -> None:
+        """添加或更新库存中的漫画
+
+        Args:
+            data (dict): Comic.getComicInfo 返回的漫画信息
+        """
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO comics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(comic_id) DO UPDATE SET
+                    title = excluded.title,
+                    comic_path = excluded.comic_path,
+                    author_name = excluded.author_name,
+                    styles = excluded.styles,
+                    vertical_cover = excluded.vertical_cover,
+                    last_ord = excluded.last_ord,
+                    renewal_time = excluded.renewal_time,
+                    is_finish = excluded.is_finish,
+                    num_episodes = excluded.num_episodes,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    data["id"],
+                    data["title"],
+                    os.path.abspath(data["save_path"]),
+                    data.get("author_name"),
+                    data.get("styles"),
+                    data.get("vertical_cover"),
+                    data.get("last_ord"),
+                    data.get("renewal_time"),
+                    data.get("is_finish"),
+                    len(data.get("ep_list", [])),
+                    time.time(),
+                ),
+            )
+
+    ############################################################
+
+    def recordEpisode(
+        self, epi: Episode, file_path: str, file_size: int = None, checksum: str = None
+    ) -> None:
+        """章节保存完成后记录到数据库, 漫画不在库存中时一并添加
+
+        Args:
+            epi (Episode): 保存完成的章节
+            file_path (str): 保存路径
+            file_size (int): 文件大小, 文件夹为其中所有文件的大小之和
+            checksum (str): 文件的MD5, 文件夹为 None
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO comics (comic_id, title, comic_path, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(comic_id) DO NOTHING
+                """,
+                (epi.comic_id, epi.comic_name, os.path.abspath(epi.save_path), now),
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO episodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    epi.id,
+                    epi.comic_id,
+                    epi.ord,
+                    epi.title,
+                    epi.save_method,
+                    file_path,
+                    file_size,
+                    checksum,
+                    now,
+                ),
+            )
+
+    ############################################################
+
+    def syncEpisodes(self, comic_id: int, episodes: list[Episode]) -> None:
+        """根据本地文件的实际情况校正已下载章节的记录, 用于导入旧版本下载的章节或者用户手动删除文件之后
+
+        Args:
+            comic_id (int): 漫画ID
+            episodes (list[Episode]): 漫画的全部章节, 需要已经判断过 isDownloaded
+        """
+        downloaded = {epi.id: epi for epi in episodes if epi.isDownloaded()}
+        now = time.time()
+        with self.lock, self.conn:
+            recorded = {
+                row[0]
+                for row in self.conn.execute(
+                    "SELECT ep_id FROM episodes WHERE comic_id = ?", (comic_id,)
+                )
+            }
+            self.conn.executemany(
+                "DELETE FROM episodes WHERE ep_id = ?",
+                [(ep_id,) for ep_id in recorded - downloaded.keys()],
+            )
+            self.conn.executemany(
+                """
+                INSERT INTO episodes (ep_id, comic_id, ord, title, downloaded_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (epi.id, comic_id, epi.ord, epi.title, now)
+                    for ep_id, epi in downloaded.items()
+                    if ep_id not in recorded
+                ],
+            )
+
+    ############################################################
+
+    def getComics(self, root: str) -> dict[int, dict]:
+        """获取保存在指定目录下, 并且文件夹仍然存在的库存漫画
+
+        Args:
+            root (str): 库存目录
+
+        Returns:
+            dict[int, dict]: 漫画ID到 {"comic_name": 漫画名, "comic_path": 保存目录} 的映射
+        """
+        root = os.path.normcase(os.path.abspath(root))
+        with self.lock:
+            rows = self.conn.execute("SELECT comic_id, title, comic_path FROM comics").fetchall()
+        return {
+            comic_id: {"comic_name": title, "comic_path": comic_path}
+            for comic_id, title, comic_path in rows
+            if os.path.normcase(os.path.dirname(comic_path)) == root and os.path.isdir(comic_path)
+        }
+
+    ############################################################
+
+    def getKnownEpisodes(self, comic_id: int) -> set[int]:
+        """获取上次更新时漫画的全部章节ID
+
+        Args:
+            comic_id (int): 漫画ID
+
+        Returns:
+            set[int]: 章节ID集合, 从未更新过时为空
+        """
+        with self.lock:
+            return {
+                row[0]
+                for row in self.conn.execute(
+                    "SELECT ep_id FROM known_episodes WHERE comic_id = ?", (comic_id,)
+                )
+            }
+
+    ############################################################
+
+    def setKnownEpisodes(self, comic_id: int, ep_ids: list[int]) -> None:
+        """记录本次更新时漫画的全部章节ID
+
+        Args:
+            comic_id (int): 漫画ID
+            ep_ids (list[int]): 章节ID列表
+        """
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM known_episodes WHERE comic_id = ?", (comic_id,))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO known_episodes VALUES (?, ?)",
+                [(ep_id, comic_id) for ep_id in ep_ids],
+            )
+
+    ############################################################
+
+    def importLegacyMeta(self, root: str) -> None:
+        """扫描库存目录下各漫画文件夹中的元数据.json, 把数据库中还没有的漫画导入
+
+        Args:
+            root (str): 库存目录
+        """
+        now = time.time()
+        rows = []
+        try:
+            items = os.listdir(root)
+        except OSError as e:
+            logger.error(f"读取库存目录时发生错误\n {e}")
+            return
+        for item in items:
+            meta_path = os.path.join(root, item, "元数据.json")
+            if not os.path.exists(meta_path):
+                continue
+            # ? 单个元数据文件损坏或缺少字段时跳过该漫画, 不影响其他漫画导入
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                comic_path = os.path.abspath(os.path.join(root, item))
+                if not isinstance(meta["title"], str):
+                    raise TypeError(f"title 不是字符串: {meta['title']!r}")
+                rows.append((int(meta["id"]), meta["title"], comic_path, now))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.error(f"读取元数据 {meta_path} 时发生错误, 已跳过\n {e}")
+
+        with self.lock, self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO comics (comic_id, title, comic_path, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(comic_id) DO UPDATE SET comic_path = excluded.comic_path
+                """,
+                rows,
+            )
+
+    ############################################################
+
+    @staticmethod
+    def getFileInfo(path: str) -> tuple[int, str | None]:
+        """计算保存结果的大小和MD5, 在后处理进程中调用
+
+        Args:
+            path (str): 保存路径, 文件或者文件夹
+
+        Returns:
+            tuple[int, str | None]: (大小, MD5), 文件夹没有MD5
+        """
+        if os.path.isdir(path):
+            with os.scandir(path) as it:
+                return sum(entry.stat().st_size for entry in it if entry.is_file()), None
+        md5 = hashlib.md5()
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                md5.update(chunk)
+        return os.path.getsize(path), md5.hexdigest()
+
+
+############################################################
+
+_library_db: LibraryDB | None = None
+_library_db_lock = threading.Lock()
+
+
+def getLibraryDB() -> LibraryDB:
+    """获取全局共享的本地库存数据库
+
+    Returns:
+        LibraryDB: 本地库存数据库
+    """
+    global _library_db
+    if _library_db is None:
+        with _library_db_lock:
+            if _library_db is None:
+                _library_db = LibraryDB(os.path.join(data_path, "library.db"))
+    return _library_db
@@ -0,0 +1,81 @@
+"""
+该模块包含了我的库存的增量更新类，只解析和检查上次更新之后新增的章节
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from src.Comic import Comic
+from src.LibraryDB import LibraryDB, getLibraryDB
+from src.Utils import logger
+
+if TYPE_CHECKING:
+    from src.Config import Config
+    from src.Episode import Episode
+    from src.Reporter import Reporter
+
+
+class LibraryUpdater:
+    """我的库存增量更新类
+
+    每次更新都用目录索引 (每部漫画只读取一次目录) 校正本地库存数据库中的已下载章节,
+    并与上次记录的章节ID比较找出新章节; 所有已解锁但未下载的章节都可以下载
+    """
+
+    def __init__(self, config: Config, reporter: Reporter, library_db: LibraryDB = None) -> None:
+        """
+        Args:
+            config (Config): 设置快照
+            reporter (Reporter): 用于报告错误的接口
+            library_db (LibraryDB): 本地库存数据库, 为 None 时使用全局共享的数据库
+        """
+        self.config = config
+        self.reporter = reporter
+        self.library_db = library_db or getLibraryDB()
+
+    ############################################################
+
+    def updateComic(self, comic_id: int) -> dict | None:
+        """增量更新单部漫画
+
+        Args:
+            comic_id (int): 漫画ID
+
+        Returns:
+            dict | None: {"comic": 漫画实例, "data": 漫画信息, "num_episodes": 章节数,
+                "num_downloaded": 已下载章节数, "new_episodes": 新章节列表, "to_download": 可以下载的新章节},
+                获取漫画信息失败时返回 None
+        """
+        comic = Comic(comic_id, self.config, self.reporter)
+        data = comic.getComicInfo(use_cache=False)
+        if not data:
+            return None
+
+        known_ep_ids = self.library_db.getKnownEpisodes(comic_id)
+        # ? 用户可能删除了文件或者用其他方式下载了章节, 每次更新都按本地文件校正
+        episodes = comic.getEpisodesInfo()
+        self.library_db.syncEpisodes(comic_id, episodes)
+
+        # ? 直接比较章节ID, 每次解析漫画都会覆盖数据库中的 last_ord 和章节数, 不能用来判断更新
+        # ? 第一次更新时没有记录, 不把所有章节都当作新章节
+        new_episodes: list[Episode] = []
+        if known_ep_ids:
+            new_episodes = [epi for epi in episodes if epi.id not in known_ep_ids]
+            if new_episodes:
+                logger.info(f"《{data['title']}》有{len(new_episodes)}个新章节")
+
+        self.library_db.upsertComic(data)
+        self.library_db.setKnownEpisodes(comic_id, [episode["id"] for episode in data["ep_list"]])
+
+        return {
+            "comic": comic,
+            "data": data,
+            "num_episodes": len(episodes),
+            "num_downloaded": comic.getNumDownloaded(),
+            "new_episodes": new_episodes,
+            # ? 包括之前已经知道但是刚刚购买或解锁的章节
+            "to_download": [
+                epi for epi in episodes if epi.isAvailable() and not epi.isDownloaded()
+            ],
+        }
@@ -0,0 +1,328 @@
+"""
+该模块包含下载各阶段的耗时统计，按阶段和主机汇总为直方图，可导出为JSON或Prometheus文本格式，
+用于判断每个主机的下载是受限于网络、CPU还是磁盘
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+# ? 下载和保存的各个阶段, 网络阶段都包含等待限速器的时间, 等待时间另外记录在 throttle 阶段
+STAGE_INDEX = "index"
+STAGE_TOKEN = "token"
+STAGE_PAGE_GET = "page_get"
+STAGE_THROTTLE = "throttle"
+STAGE_CHECKSUM = "checksum"
+STAGE_TEMP_WRITE = "temp_write"
+STAGE_EXIF = "exif"
+STAGE_ARCHIVE = "archive"
+STAGE_CLEANUP = "cleanup"
+
+# ? 各阶段的资源类型, 生成 PDF 和压缩包主要消耗CPU, 归为 cpu
+STAGE_KINDS = {
+    STAGE_INDEX: "network",
+    STAGE_TOKEN: "network",
+    STAGE_PAGE_GET: "network",
+    STAGE_THROTTLE: "throttle",
+    STAGE_CHECKSUM: "cpu",
+    STAGE_TEMP_WRITE: "disk",
+    STAGE_EXIF: "cpu",
+    STAGE_ARCHIVE: "cpu",
+    STAGE_CLEANUP: "disk",
+}
+
+# ? 不涉及网络的保存阶段使用的主机标签
+LOCAL_HOST = "local"
+
+# ? 直方图各个桶的上界, 单位为秒, 覆盖从内存中的计算到很慢的网络请求
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+PROMETHEUS_METRIC = "bilibili_manga_stage_seconds"
+
+
+class Histogram:
+    """耗时直方图, 最后一个桶记录超过 BUCKETS 上界的耗时"""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    ############################################################
+
+    def observe(self, seconds: float) -> None:
+        """记录一次耗时
+
+        Args:
+            seconds (float): 耗时, 单位为秒
+        """
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    ############################################################
+
+    def merge(self, data: dict) -> None:
+        """合并另一个直方图导出的数据, 用于汇总后处理进程中的统计
+
+        Args:
+            data (dict): toDict 返回的数据
+        """
+        for index, count in enumerate(data["counts"]):
+            self.counts[index] += count
+        self.count += data["count"]
+        self.sum += data["sum"]
+        self.max = max(self.max, data["max"])
+
+    ############################################################
+
+    def quantile(self, q: float) -> float:
+        """按桶估算分位数, 返回分位数所在桶的上界
+
+        Args:
+            q (float): 分位, 0 到 1 之间
+
+        Returns:
+            float: 估算的耗时, 超过最大的桶时返回记录到的最大耗时
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts[:-1]):
+            cumulative += count
+            if cumulative >= rank:
+                return min(BUCKETS[index], self.max)
+        return self.max
+
+    ############################################################
+
+    def toDict(self) -> dict:
+        """导出直方图数据
+
+        Returns:
+            dict: {"counts": 各桶计数, "count": 总次数, "sum": 总耗时, "max": 最大耗时,
+                "p50": 中位数, "p95": 95分位数}
+        """
+        return {
+            "counts": list(self.counts),
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+        }
+
+
+############################################################
+
+
+class Metrics:
+    """按 (阶段, 主机) 汇总耗时直方图, 线程安全"""
+
+    def __init__(self) -> None:
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self.lock = threading.Lock()
+
+    ############################################################
+
+    def observe(self, stage: str, seconds: float, host: str = LOCAL_HOST) -> None:
+        """记录一次阶段耗时
+
+        Args:
+            stage (str): 阶段名, 见 STAGE_KINDS
+            seconds (float): 耗时, 单位为秒
+            host (str): 主机名, 不涉及网络的阶段为 LOCAL_HOST
+        """
+        with self.lock:
+            histogram = self.histograms.get((stage, host))
+            if histogram is None:
+                histogram = self.histograms[(stage, host)] = Histogram()
+            histogram.observe(seconds)
+
+    ############################################################
+
+    @contextmanager
+    def timer(self, stage: str, host: str = LOCAL_HOST) -> Iterator[None]:
+        """记录代码块耗时的上下文管理器, 代码块抛出异常时同样记录
+
+        Args:
+            stage (str): 阶段名, 见 STAGE_KINDS
+            host (str): 主机名, 不涉及网络的阶段为 LOCAL_HOST
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, host)
+
+    ############################################################
+
+    def reset(self) -> None:
+        """清空所有统计"""
+        with self.lock:
+            self.histograms.clear()
+
+    ############################################################
+
+    def snapshot(self) -> dict[str, dict[str, dict]]:
+        """导出当前的统计, 可以跨进程传递
+
+        Returns:
+            dict[str, dict[str, dict]]: {阶段: {主机: 直方图数据}}
+        """
+        result: dict[str, dict[str, dict]] = {}
+        with self.lock:
+            for (stage, host), histogram in sorted(self.histograms.items()):
+                result.setdefault(stage, {})[host] = histogram.toDict()
+        return result
+
+    ############################################################
+
+    def merge(self, snapshot: dict[str, dict[str, dict]]) -> None:
+        """合并另一个进程导出的统计
+
+        Args:
+            snapshot (dict[str, dict[str, dict]]): snapshot 返回的数据
+        """
+        with self.lock:
+            for stage, hosts in snapshot.items():
+                for host, data in hosts.items():
+                    histogram = self.histograms.get((stage, host))
+                    if histogram is None:
+                        histogram = self.histograms[(stage, host)] = Histogram()
+                    histogram.merge(data)
+
+    ############################################################
+
+    def getHostSummary(self, snapshot: dict[str, dict[str, dict]] = None) -> dict[str, dict]:
+        """按主机汇总各类资源的总耗时, 并给出耗时最多的资源类型
+
+        等待限速器的时间从网络耗时中扣除, 单独作为 throttle 列出
+
+        Args:
+            snapshot (dict[str, dict[str, dict]]): snapshot 返回的数据, 为 None 时使用当前统计
+
+        Returns:
+            dict[str, dict]: {主机: {"network": 秒, "cpu": 秒, "disk": 秒, "throttle": 秒,
+                "bound": 耗时最多的资源类型}}
+        """
+        if snapshot is None:
+            snapshot = self.snapshot()
+        summary: dict[str, dict] = {}
+        for stage, hosts in snapshot.items():
+            kind = STAGE_KINDS.get(stage)
+            if kind is None:
+                continue
+            for host, data in hosts.items():
+                totals = summary.setdefault(
+                    host, {"network": 0.0, "cpu": 0.0, "disk": 0.0, "throttle": 0.0}
+                )
+                totals[kind] += data["sum"]
+        for totals in summary.values():
+            totals["network"] = max(0.0, totals["network"] - totals["throttle"])
+            totals["bound"] = max(("network", "cpu", "disk"), key=totals.__getitem__)
+        return summary
+
+    ############################################################
+
+    def toJson(self) -> str:
+        """导出为JSON
+
+        Returns:
+            str: {"buckets": 桶上界, "stages": 各阶段直方图, "hosts": 各主机汇总}
+        """
+        snapshot = self.snapshot()
+        return json.dumps(
+            {"buckets": BUCKETS, "stages": snapshot, "hosts": self.getHostSummary(snapshot)},
+            ensure_ascii=False,
+        )
+
+    ############################################################
+
+    def toPrometheus(self) -> str:
+        """导出为 Prometheus 文本格式
+
+        Returns:
+            str: 以 stage 和 host 为标签的 histogram
+        """
+        lines = [
+            f"# HELP {PROMETHEUS_METRIC} Time spent in each download stage.",
+            f"# TYPE {PROMETHEUS_METRIC} histogram",
+        ]
+        for stage, hosts in self.snapshot().items():
+            for host, data in hosts.items():
+                labels = f'stage="{stage}",host="{host}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS, data["counts"]):
+                    cumulative += count
+                    lines.append(
+                        f'{PROMETHEUS_METRIC}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f'{PROMETHEUS_METRIC}_bucket{{{labels},le="+Inf"}} {data["count"]}')
+                lines.append(f"{PROMETHEUS_METRIC}_sum{{{labels}}} {data['sum']}")
+                lines.append(f"{PROMETHEUS_METRIC}_count{{{labels}}} {data['count']}")
+        return "\n".join(lines) + "\n"
+
+
+############################################################
+
+_metrics = Metrics()
+
+
+def getMetrics() -> Metrics:
+    """获取本进程的耗时统计, 后处理进程中的统计随保存结果一起返回给主进程合并
+
+    Returns:
+        Metrics: 耗时统计
+    """
+    return _metrics
+
+
+############################################################
+
+
+def startMetricsServer(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """在后台线程中启动统计接口, /metrics 返回 Prometheus 文本格式, /metrics.json 返回JSON
+
+    Args:
+        port (int): 监听端口
+        host (str): 监听地址, 默认只允许本机访问
+
+    Returns:
+        ThreadingHTTPServer: 已启动的服务器, 调用 shutdown 停止
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            path = self.path.split("?", 1)[0]
+            if path == "/metrics":
+                body = getMetrics().toPrometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            elif path == "/metrics.json":
+                body = getMetrics().toJson().encode("utf-8")
+                content_type = "application/json; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
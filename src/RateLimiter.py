@@ -0,0 +1,277 @@
+"""
+该模块包含了按主机划分的限速器，由令牌桶限制请求速率，并用 AIMD 算法自适应调整并发数
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+
+# ? 各主机的 (每秒请求数, 令牌桶容量, 最小并发, 最大并发, 初始并发)
+# ? 未列出的主机 (主要是图片CDN) 使用 DEFAULT_HOST_LIMIT
+HOST_LIMITS = {
+    "manga.bilibili.com": (10, 10, 2, 16, 4),
+    "www.biliplus.com": (2, 4, 1, 4, 2),
+}
+DEFAULT_HOST_LIMIT = (50, 50, 4, 256, 8)
+
+# ? 延迟超过历史最低延迟的倍数时视为拥塞, 不再增加并发
+LATENCY_TOLERANCE = 3.0
+# ? 两次减半并发之间的最短间隔, 避免同一批失败的请求把并发一下子降到最低
+DECREASE_COOLDOWN = 1.0
+
+
+class TokenBucket:
+    """令牌桶，限制每秒发出的请求数，允许一定程度的突发"""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """
+        Args:
+            rate (float): 每秒补充的令牌数
+            capacity (float): 令牌桶容量
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_time = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    ############################################################
+
+    def reserve(self) -> float:
+        """预订一个令牌
+
+        Returns:
+            float: 需要等待多少秒才能使用该令牌
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_time) * self.rate)
+            self.last_time = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    ############################################################
+
+    def pause(self, seconds: float) -> None:
+        """服务器要求稍后重试时, 暂停发放令牌
+
+        Args:
+            seconds (float): 暂停的秒数
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+############################################################
+
+
+class AdaptiveConcurrency:
+    """AIMD 自适应并发控制
+
+    开始时处于慢启动阶段, 每次成功都增加一个并发; 第一次出错后进入加性增长阶段,
+    每成功一整轮才增加一个并发; 出错时并发减半, 延迟明显变高时停止增长;
+    线程通过 condition 等待名额, 协程则等待各自事件循环中的 Future, 由 release 跨线程唤醒
+    """
+
+    def __init__(self, min_limit: int, max_limit: int, initial_limit: int) -> None:
+        """
+        Args:
+            min_limit (int): 最小并发数
+            max_limit (int): 最大并发数
+            initial_limit (int): 初始并发数
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.slow_start = True
+        self.min_latency = None
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+        # ? 等待名额的协程, 按先后顺序排列的 (事件循环, Future)
+        self.async_waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    ############################################################
+
+    def acquire(self) -> None:
+        """占用一个并发名额, 没有空闲名额时阻塞等待"""
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    ############################################################
+
+    async def acquireAsync(self) -> None:
+        """acquire 的协程版本, 没有空闲名额时在事件循环中等待 release 唤醒"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self.condition:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                waiter = loop.create_future()
+                entry = (loop, waiter)
+                self.async_waiters.append(entry)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self.condition:
+                    if entry in self.async_waiters:
+                        self.async_waiters.remove(entry)
+                    elif not waiter.cancelled():
+                        # ? 已经被唤醒但随后被取消, 把名额让给下一个等待的协程
+                        self.__notifyAsync()
+                raise
+
+    ############################################################
+
+    def __notifyAsync(self) -> None:
+        """按空闲名额数唤醒等待的协程, 需要在持有 condition 时调用"""
+        num_free = int(self.limit) - self.in_flight
+        for _ in range(min(num_free, len(self.async_waiters))):
+            loop, waiter = self.async_waiters.popleft()
+            loop.call_soon_threadsafe(self.__wakeWaiter, waiter)
+
+    ############################################################
+
+    def __wakeWaiter(self, waiter: asyncio.Future) -> None:
+        """在等待者所在的事件循环中执行, 唤醒等待名额的协程
+
+        Args:
+            waiter (asyncio.Future): 协程等待的 Future
+        """
+        if not waiter.done():
+            waiter.set_result(None)
+            return
+        # ? 协程在唤醒前已经被取消, 把名额让给下一个等待的协程
+        with self.condition:
+            self.__notifyAsync()
+
+    ############################################################
+
+    def release(self, success: bool, latency: float) -> None:
+        """释放并发名额, 并根据请求结果调整并发数
+
+        Args:
+            success (bool): 请求是否成功, 429, 5xx 和网络错误视为失败
+            latency (float): 请求耗时, 单位为秒
+        """
+        with self.condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if not success:
+                if now - self.last_decrease > DECREASE_COOLDOWN:
+                    self.limit = max(self.min_limit, self.limit / 2)
+                    self.last_decrease = now
+                self.slow_start = False
+            else:
+                if self.min_latency is None or latency < self.min_latency:
+                    self.min_latency = latency
+                if latency <= self.min_latency * LATENCY_TOLERANCE:
+                    step = 1 if self.slow_start else 1 / self.limit
+                    self.limit = min(self.max_limit, self.limit + step)
+            self.condition.notify_all()
+            self.__notifyAsync()
+
+
+############################################################
+
+
+class HostLimiter:
+    """单个主机的限速器, 组合令牌桶和自适应并发控制"""
+
+    def __init__(
+        self, rate: float, capacity: float, min_limit: int, max_limit: int, initial_limit: int
+    ) -> None:
+        self.bucket = TokenBucket(rate, capacity)
+        self.concurrency = AdaptiveConcurrency(min_limit, max_limit, initial_limit)
+
+    ############################################################
+
+    def acquire(self) -> float:
+        """在发出请求前调用, 等待并发名额和令牌
+
+        Returns:
+            float: 开始请求的时间, 需要传给 release
+        """
+        self.concurrency.acquire()
+        wait = self.bucket.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return time.monotonic()
+
+    ############################################################
+
+    async def acquireAsync(self) -> float:
+        """acquire 的协程版本, 等待时不阻塞事件循环
+
+        Returns:
+            float: 开始请求的时间, 需要传给 release
+        """
+        await self.concurrency.acquireAsync()
+        wait = self.bucket.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return time.monotonic()
+
+    ############################################################
+
+    def release(
+        self, start_time: float, success: bool, retry_after: str = None, latency: float = None
+    ) -> None:
+        """在请求结束后调用
+
+        Args:
+            start_time (float): acquire 返回的开始时间
+            success (bool): 请求是否成功
+            retry_after (str): 响应头中的 Retry-After, 只支持秒数
+            latency (float): 用于调整并发数的请求耗时, 为 None 时使用从开始到现在的时间
+        """
+        if retry_after and retry_after.isdigit():
+            self.bucket.pause(int(retry_after))
+        if latency is None:
+            latency = time.monotonic() - start_time
+        self.concurrency.release(success, latency)
+
+
+############################################################
+
+_limiters: dict[str, HostLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def getHostLimiter(host: str) -> HostLimiter:
+    """获取指定主机的限速器, 同一主机的所有请求共用一个
+
+    Args:
+        host (str): 主机名
+
+    Returns:
+        HostLimiter: 限速器
+    """
+    limiter = _limiters.get(host)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(host)
+            if limiter is None:
+                limiter = HostLimiter(*HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT))
+                _limiters[host] = limiter
+    return limiter
+
+
+def isThrottled(status_code: int) -> bool:
+    """判断响应状态码是否意味着服务器过载或限流
+
+    Args:
+        status_code (int): 响应状态码
+
+    Returns:
+        bool: 是否需要降低并发
+    """
+    return status_code == 429 or status_code >= 500
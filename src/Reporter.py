@@ -0,0 +1,104 @@
+"""
+该模块包含了核心模块向外报告事件的接口Reporter，以及图形界面和子进程使用的实现
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from src.Utils import logger
+
+if TYPE_CHECKING:
+    from PySide6.QtCore import SignalInstance
+
+
+class Reporter:
+    """核心模块向外报告事件的接口，默认实现只写日志，图形界面和命令行分别注入自己的实现"""
+
+    def showMessage(self, msg: str) -> None:
+        """报告需要用户注意的错误或警告
+
+        Args:
+            msg (str): 提示内容
+        """
+        logger.warning(msg)
+
+    ############################################################
+
+    def showInformation(self, msg: str) -> None:
+        """报告普通通知
+
+        Args:
+            msg (str): 通知内容
+        """
+        logger.info(msg)
+
+    ############################################################
+
+    def reportStatus(self, status: str) -> None:
+        """报告解析进度等状态信息
+
+        Args:
+            status (str): 状态信息
+        """
+
+    ############################################################
+
+    def reportProgress(self, result: dict) -> None:
+        """报告章节任务的进度
+
+        Args:
+            result (dict): {"taskID": 任务ID, "rate": 进度百分比, 出错时为-1, "path": 保存路径}
+        """
+
+
+############################################################
+
+
+class SignalReporter(Reporter):
+    """通过Qt信号把事件转发到主线程，没有提供的信号退回默认实现"""
+
+    def __init__(
+        self,
+        signal_message_box: SignalInstance = None,
+        signal_information_box: SignalInstance = None,
+        signal_resolve_status: SignalInstance = None,
+        signal_rate_progress: SignalInstance = None,
+    ) -> None:
+        self.signal_message_box = signal_message_box
+        self.signal_information_box = signal_information_box
+        self.signal_resolve_status = signal_resolve_status
+        self.signal_rate_progress = signal_rate_progress
+
+    def showMessage(self, msg: str) -> None:
+        if self.signal_message_box is None:
+            super().showMessage(msg)
+        else:
+            self.signal_message_box.emit(msg)
+
+    def showInformation(self, msg: str) -> None:
+        if self.signal_information_box is None:
+            super().showInformation(msg)
+        else:
+            self.signal_information_box.emit(msg)
+
+    def reportStatus(self, status: str) -> None:
+        if self.signal_resolve_status is not None:
+            self.signal_resolve_status.emit(status)
+
+    def reportProgress(self, result: dict) -> None:
+        if self.signal_rate_progress is not None:
+            self.signal_rate_progress.emit(result)
+
+
+############################################################
+
+
+class BufferedReporter(Reporter):
+    """先记录需要提示的内容，用于没有界面的后处理子进程，由主进程统一转发"""
+
+    def __init__(self) -> None:
+        self.messages: list[str] = []
+
+    def showMessage(self, msg: str) -> None:
+        self.messages.append(msg)
@@ -7,13 +7,12 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 import requests
-from PySide6.QtWidgets import QMessageBox
 from retrying import retry
 
-from src.Utils import MAX_RETRY_SMALL, RETRY_WAIT_EX, TIMEOUT_SMALL, logger
+from src.Utils import MAX_RETRY_SMALL, RETRY_WAIT_EX, TIMEOUT_SMALL, getSession, logger
 
 if TYPE_CHECKING:
-    from ui.MainGUI import MainGUI
+    from src.Reporter import Reporter
 
 
 class SearchComic:
@@ -34,9 +33,12 @@ class SearchComic:
         self.payload = {"key_word": comic_name, "page_num": 1, "page_size": 99}
 
     ############################################################
-    def getResults(self, mainGUI: MainGUI) -> list:
+    def getResults(self, reporter: Reporter) -> list:
         """获取搜索结果
 
+        Args:
+            reporter (Reporter): 用于报告错误的接口
+
         Returns:
             list: 搜索结果列表
         """
@@ -44,7 +46,7 @@ class SearchComic:
         @retry(stop_max_delay=MAX_RETRY_SMALL, wait_exponential_multiplier=RETRY_WAIT_EX)
         def _() -> list:
             try:
-                res = requests.post(
+                res = getSession().post(
                     self.detail_url,
                     data=self.payload,
                     headers=self.headers,
@@ -67,10 +69,8 @@ class SearchComic:
         except requests.RequestException as e:
             logger.error(f"重复获取搜索结果多次后失败!\n{e}")
             logger.exception(e)
-            QMessageBox.warning(
-                mainGUI,
-                "警告",
-                "重复获取搜索结果多次后失败!\n请检查网络连接或者重启软件!\n\n更多详细信息请查看日志文件",
+            reporter.showMessage(
+                "重复获取搜索结果多次后失败!\n请检查网络连接或者重启软件!\n\n更多详细信息请查看日志文件"
             )
             return []
 
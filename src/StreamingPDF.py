@@ -0,0 +1,221 @@
+"""
+该模块包含了逐页写入的PDF文件类StreamingPDF，用于在不解码JPEG的情况下把图片合并为PDF
+https://opensource.adobe.com/dc-acrobat-sdk-docs/pdfstandards/PDF32000_2008.pdf
+"""
+
+from __future__ import annotations
+
+import io
+import struct
+
+from PIL import Image
+
+# ? JPEG 中记录图片尺寸的 SOF 标记, 不包括 DHT(C4) JPG(C8) DAC(CC)
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# ? JPEG 颜色分量数对应的PDF颜色空间, CMYK 等其他情况需要先转换为RGB
+COLOR_SPACES = {1: "/DeviceGray", 3: "/DeviceRGB"}
+
+
+class StreamingPDF:
+    """逐页写入的PDF文件
+
+    JPEG 图片直接以 DCTDecode 数据流嵌入，不解码也不重新编码；
+    每写完一页就释放该页数据，内存中只保留当前页，文件属性与页面在同一次写入中完成
+    """
+
+    def __init__(self, path: str, quality: int = 95) -> None:
+        """
+        Args:
+            path (str): PDF文件路径
+            quality (int): 非JPEG图片转换为JPEG时使用的质量
+        """
+        self.quality = quality
+        self.file = open(path, "wb")
+        self.offsets: dict[int, int] = {}
+        self.page_ids: list[int] = []
+        self.metadata: dict[str, str] = {}
+        # ? 1 号对象为 Catalog, 2 号对象为 Pages, 都在关闭时写入
+        self.next_id = 3
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self) -> StreamingPDF:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+
+    ############################################################
+
+    def setMetadata(self, metadata: dict[str, str]) -> None:
+        """设置PDF文件属性, 例如 {"Title": "...", "Author": "..."}
+
+        Args:
+            metadata (dict): PDF文件属性
+        """
+        self.metadata = metadata
+
+    ############################################################
+
+    def addImage(self, img_path: str) -> None:
+        """添加一页图片, JPEG 直接嵌入, 其他格式转换为RGB的JPEG后嵌入
+
+        Args:
+            img_path (str): 图片路径
+        """
+        with open(img_path, "rb") as f:
+            img = f.read()
+        info = self.getJpegInfo(img)
+        if info is None:
+            img, info = self.convertToJpeg(img)
+        self.addJpeg(img, *info)
+
+    ############################################################
+
+    def addJpeg(self, jpeg: bytes, width: int, height: int, color_space: str) -> None:
+        """以 DCTDecode 数据流添加一页JPEG图片, 页面大小与图片像素大小一致
+
+        Args:
+            jpeg (bytes): JPEG图片内容
+            width (int): 图片宽度
+            height (int): 图片高度
+            color_space (str): PDF颜色空间
+        """
+        image_id, content_id, page_id = self.next_id, self.next_id + 1, self.next_id + 2
+        self.next_id += 3
+
+        self.writeObject(
+            image_id,
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace {color_space} /BitsPerComponent 8 /Filter /DCTDecode "
+            f"/Length {len(jpeg)} >>".encode(),
+            jpeg,
+        )
+        content = f"q {width} 0 0 {height} 0 0 cm /Im0 Do Q".encode()
+        self.writeObject(content_id, f"<< /Length {len(content)} >>".encode(), content)
+        self.writeObject(
+            page_id,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> "
+            f"/Contents {content_id} 0 R >>".encode(),
+        )
+        self.page_ids.append(page_id)
+
+    ############################################################
+
+    def close(self) -> None:
+        """写入页面目录, 文件属性和交叉引用表, 并关闭文件"""
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self.writeObject(
+            2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode()
+        )
+        self.writeObject(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        trailer = f"/Size {self.next_id} /Root 1 0 R"
+        if self.metadata:
+            info_id = self.next_id
+            self.next_id += 1
+            entries = " ".join(
+                f"/{key} {self.encodeText(value)}" for key, value in self.metadata.items()
+            )
+            self.writeObject(info_id, f"<< {entries} >>".encode())
+            trailer = f"/Size {self.next_id} /Root 1 0 R /Info {info_id} 0 R"
+
+        xref_offset = self.file.tell()
+        self.file.write(f"xref\n0 {self.next_id}\n0000000000 65535 f \n".encode())
+        for obj_id in range(1, self.next_id):
+            self.file.write(f"{self.offsets[obj_id]:010d} 00000 n \n".encode())
+        self.file.write(f"trailer\n<< {trailer} >>\nstartxref\n{xref_offset}\n%%EOF\n".encode())
+        self.file.close()
+
+    ############################################################
+
+    def writeObject(self, obj_id: int, body: bytes, stream: bytes = None) -> None:
+        """写入一个PDF间接对象
+
+        Args:
+            obj_id (int): 对象编号
+            body (bytes): 对象内容
+            stream (bytes): 对象的数据流, 为 None 时不写入
+        """
+        self.offsets[obj_id] = self.file.tell()
+        self.file.write(f"{obj_id} 0 obj\n".encode())
+        self.file.write(body)
+        if stream is not None:
+            self.file.write(b"\nstream\n")
+            self.file.write(stream)
+            self.file.write(b"\nendstream")
+        self.file.write(b"\nendobj\n")
+
+    ############################################################
+
+    @staticmethod
+    def encodeText(text: str) -> str:
+        """将文本编码为带BOM的UTF-16BE十六进制PDF字符串, 以支持中文
+
+        Args:
+            text (str): 文本
+
+        Returns:
+            str: PDF字符串
+        """
+        return f"<FEFF{text.encode('utf-16-be').hex().upper()}>"
+
+    ############################################################
+
+    @staticmethod
+    def getJpegInfo(img: bytes) -> tuple[int, int, str] | None:
+        """读取JPEG的尺寸和颜色空间, 不解码图片
+
+        Args:
+            img (bytes): 图片内容
+
+        Returns:
+            tuple[int, int, str] | None: (宽度, 高度, PDF颜色空间), 不是可直接嵌入的JPEG时返回 None
+        """
+        if img[:2] != b"\xff\xd8":
+            return None
+        i = 2
+        while i + 4 <= len(img):
+            if img[i] != 0xFF:
+                return None
+            marker = img[i + 1]
+            # ? 填充字节以及没有长度字段的标记
+            if marker == 0xFF:
+                i += 1
+                continue
+            if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+                i += 2
+                continue
+            (length,) = struct.unpack(">H", img[i + 2 : i + 4])
+            if marker in SOF_MARKERS:
+                if i + 10 > len(img):
+                    return None
+                precision = img[i + 4]
+                height, width = struct.unpack(">HH", img[i + 5 : i + 9])
+                components = img[i + 9]
+                if precision != 8 or components not in COLOR_SPACES:
+                    return None
+                return width, height, COLOR_SPACES[components]
+            i += 2 + length
+        return None
+
+    ############################################################
+
+    def convertToJpeg(self, img: bytes) -> tuple[bytes, tuple[int, int, str]]:
+        """因为pdf的兼容性, 将其他格式的图片统一转换为RGB模式的JPEG
+
+        Args:
+            img (bytes): 图片内容
+
+        Returns:
+            tuple[bytes, tuple[int, int, str]]: (JPEG图片内容, (宽度, 高度, PDF颜色空间))
+        """
+        with Image.open(io.BytesIO(img)) as image:
+            rgb = image if image.mode == "RGB" else image.convert("RGB")
+            with io.BytesIO() as output:
+                rgb.save(output, format="JPEG", quality=self.quality)
+                return output.getvalue(), (rgb.width, rgb.height, "/DeviceRGB")
@@ -0,0 +1,132 @@
+"""
+该模块包含下载速度和字节数的统计，速度由 HTTP 层实际收到的字节数计算，
+剩余字节数由已经下载的图片大小估算，不再依赖接口返回的章节大小
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+# ? 取3秒内的平均速度，以防止速度突然变化
+# ? 比如下载完一个文件 速度突然变为0, 或者开始一组新的下载，速度突然变为很大
+SPEED_WINDOW = 3.0
+# ? 滑动窗口分成的时间片数, 每个时间片 0.25 秒
+SPEED_SLOTS = 12
+
+
+class SpeedMeter:
+    """滑动窗口测速器, 用固定长度的环形缓冲区按时间片累计字节数, 记录和查询都不随时间变慢"""
+
+    def __init__(self, window: float = SPEED_WINDOW, num_slots: int = SPEED_SLOTS) -> None:
+        """
+        Args:
+            window (float): 窗口长度, 单位为秒
+            num_slots (int): 窗口分成的时间片数
+        """
+        self.num_slots = num_slots
+        self.resolution = window / num_slots
+        # ? 每个位置记录它当前对应的时间片编号, 编号过期的位置在下次写入时清零
+        self.slot_ids = [-1] * num_slots
+        self.slot_bytes = [0] * num_slots
+        self.start_time = None
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    ############################################################
+
+    def add(self, num_bytes: int) -> None:
+        """记录收到的字节数
+
+        Args:
+            num_bytes (int): 字节数
+        """
+        now = time.monotonic()
+        slot = int(now / self.resolution)
+        index = slot % self.num_slots
+        with self.lock:
+            if self.start_time is None:
+                self.start_time = now
+            if self.slot_ids[index] != slot:
+                self.slot_ids[index] = slot
+                self.slot_bytes[index] = 0
+            self.slot_bytes[index] += num_bytes
+            self.total_bytes += num_bytes
+
+    ############################################################
+
+    def getSpeed(self) -> float:
+        """获取窗口内的平均速度, 刚开始下载时按实际经过的时间计算
+
+        Returns:
+            float: 每秒字节数
+        """
+        now = time.monotonic()
+        slot = int(now / self.resolution)
+        # ? 窗口包括当前未满的时间片和之前 num_slots - 1 个完整的时间片
+        window_start = (slot - self.num_slots + 1) * self.resolution
+        with self.lock:
+            if self.start_time is None:
+                return 0.0
+            received = sum(
+                num_bytes
+                for slot_id, num_bytes in zip(self.slot_ids, self.slot_bytes)
+                if slot - slot_id < self.num_slots
+            )
+            elapsed = now - max(window_start, self.start_time)
+        return received / elapsed if elapsed > 0 else 0.0
+
+
+############################################################
+
+
+class TaskTransfer:
+    """单个章节任务的字节统计, 由下载图片的线程或协程在收到数据时更新"""
+
+    def __init__(self, meter: SpeedMeter) -> None:
+        """
+        Args:
+            meter (SpeedMeter): 所有任务共用的测速器
+        """
+        self.meter = meter
+        # ? 实际收到的全部字节, 包括校验失败后重新下载的部分
+        self.received_bytes = 0
+        # ? 下载完成并通过校验的图片的字节数和张数, 用于估算剩余图片的大小
+        self.page_bytes = 0
+        self.num_pages = 0
+        self.lock = threading.Lock()
+
+    ############################################################
+
+    def addChunk(self, num_bytes: int) -> None:
+        """记录从网络收到的一块数据
+
+        Args:
+            num_bytes (int): 字节数
+        """
+        self.meter.add(num_bytes)
+        with self.lock:
+            self.received_bytes += num_bytes
+
+    ############################################################
+
+    def finishPage(self, num_bytes: int) -> None:
+        """记录一张下载完成并通过校验的图片
+
+        Args:
+            num_bytes (int): 图片的字节数
+        """
+        with self.lock:
+            self.page_bytes += num_bytes
+            self.num_pages += 1
+
+    ############################################################
+
+    def getPageSize(self) -> float | None:
+        """获取本章已下载图片的平均大小
+
+        Returns:
+            float | None: 平均字节数, 还没有下载完成的图片时为 None
+        """
+        with self.lock:
+            return self.page_bytes / self.num_pages if self.num_pages else None
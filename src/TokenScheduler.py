@@ -0,0 +1,187 @@
+"""
+该模块包含了章节内图片token的调度器类，在token过期前为尚未下载的图片重新获取token
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import TYPE_CHECKING, Iterable
+
+from src.Utils import logger
+
+if TYPE_CHECKING:
+    from src.Episode import Episode
+
+# ? token 的有效期没有公开, 保守估计, 超过此秒数的token会在请求图片前重新获取
+TOKEN_MAX_AGE = 300
+
+
+class TokenScheduler:
+    """章节内图片token的调度器
+
+    图片按序号依次取用token, 取用时发现token已经超过有效期 (或者服务器拒绝了它),
+    就为所有尚未下载完成的图片统一重新获取一次, 同一时间只有一个线程在获取;
+    获取时不持有锁, 其他线程等待同一个 Future, 协程则在事件循环中等待它
+    """
+
+    def __init__(self, epi: Episode, finished: Iterable[int] = ()) -> None:
+        """
+        Args:
+            epi (Episode): 已经初始化图片列表的章节
+            finished (Iterable[int]): 已经下载完成的图片序号, 例如断点续传恢复的图片
+        """
+        self.epi = epi
+        self.imgs_token = list(epi.imgs_token)
+        issued_at = epi.imgs_token_time or time.monotonic()
+        self.issued_at = [issued_at] * len(self.imgs_token)
+        self.finished = set(finished)
+        self.lock = threading.Lock()
+        # ? 正在进行的重新获取, 没有时为 None
+        self.refreshing: Future | None = None
+
+    ############################################################
+
+    def needsRefresh(self, index: int) -> bool:
+        """判断图片的token是否需要重新获取
+
+        Args:
+            index (int): 章节中图片的序号
+
+        Returns:
+            bool: token 是否已经过期
+        """
+        return time.monotonic() - self.issued_at[index - 1] > TOKEN_MAX_AGE
+
+    ############################################################
+
+    def getImgUrl(self, index: int) -> str:
+        """获取带有有效token的图片地址, token 过期时会阻塞到重新获取结束
+
+        Args:
+            index (int): 章节中图片的序号
+
+        Returns:
+            str: 图片的合法 url
+        """
+        future, is_owner = self.__beginRefresh(index)
+        if is_owner:
+            self.__refresh(future)
+        elif future is not None:
+            future.result()
+        return self.__getUrl(index)
+
+    ############################################################
+
+    async def getImgUrlAsync(self, index: int, executor: Executor) -> str:
+        """getImgUrl 的协程版本, 重新获取token的网络请求交给线程池, 不阻塞事件循环
+
+        Args:
+            index (int): 章节中图片的序号
+            executor (Executor): 执行重新获取的线程池
+
+        Returns:
+            str: 图片的合法 url
+        """
+        future, is_owner = self.__beginRefresh(index)
+        if is_owner:
+            await asyncio.get_running_loop().run_in_executor(executor, self.__refresh, future)
+        elif future is not None:
+            await asyncio.wrap_future(future)
+        return self.__getUrl(index)
+
+    ############################################################
+
+    def invalidate(self, index: int) -> None:
+        """服务器拒绝了图片的token时调用, 下次取用时重新获取
+
+        Args:
+            index (int): 章节中图片的序号
+        """
+        with self.lock:
+            self.issued_at[index - 1] = float("-inf")
+
+    ############################################################
+
+    def markFinished(self, index: int) -> None:
+        """图片下载完成后调用, 之后重新获取token时跳过这张图片
+
+        Args:
+            index (int): 章节中图片的序号
+        """
+        with self.lock:
+            self.finished.add(index)
+
+    ############################################################
+
+    def __getUrl(self, index: int) -> str:
+        """拼接图片当前的 url 和 token
+
+        Args:
+            index (int): 章节中图片的序号
+
+        Returns:
+            str: 图片的 url
+        """
+        with self.lock:
+            img = self.imgs_token[index - 1]
+        return f"{img['url']}?token={img['token']}"
+
+    ############################################################
+
+    def __beginRefresh(self, index: int) -> tuple[Future | None, bool]:
+        """判断图片的token是否需要重新获取, 需要时登记或者加入正在进行的重新获取
+
+        Args:
+            index (int): 章节中图片的序号
+
+        Returns:
+            tuple[Future | None, bool]: (重新获取的 Future, 是否由调用者执行重新获取),
+                token 仍然有效时为 (None, False)
+        """
+        with self.lock:
+            if not self.needsRefresh(index):
+                return None, False
+            if self.refreshing is not None:
+                return self.refreshing, False
+            self.refreshing = Future()
+            return self.refreshing, True
+
+    ############################################################
+
+    def __refresh(self, future: Future) -> None:
+        """为所有尚未下载完成的图片重新获取token, 不持有锁, 失败时继续使用旧的token
+
+        Args:
+            future (Future): __beginRefresh 登记的 Future, 结束时通知所有等待的线程和协程
+        """
+        try:
+            with self.lock:
+                remaining = [
+                    index
+                    for index in range(1, len(self.imgs_token) + 1)
+                    if index not in self.finished
+                ]
+            issued_at = time.monotonic()
+            imgs_token = self.epi.refreshImgsToken(remaining)
+            with self.lock:
+                if imgs_token is None or len(imgs_token) != len(remaining):
+                    logger.warning(
+                        f"《{self.epi.comic_name}》章节：{self.epi.title} 重新获取图片token失败, 继续使用旧的token"
+                    )
+                    # ? 避免每张图片都重新请求一次, 等下一个有效期后再尝试
+                    for index in remaining:
+                        self.issued_at[index - 1] = issued_at
+                    return
+                for index, img in zip(remaining, imgs_token):
+                    self.imgs_token[index - 1] = img
+                    self.issued_at[index - 1] = issued_at
+            logger.info(
+                f"《{self.epi.comic_name}》章节：{self.epi.title} 重新获取了{len(remaining)}张图片的token"
+            )
+        finally:
+            with self.lock:
+                self.refreshing = None
+            future.set_result(None)
@@ -9,17 +9,24 @@ import hashlib
 import logging
 import os
 import re
+import threading
+import time
 from ctypes import CDLL, c_int
+from http.cookiejar import DefaultCookiePolicy
 from logging.handlers import TimedRotatingFileHandler
 from sys import platform
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable
+from urllib.parse import urlparse
 
 import requests
-from PySide6.QtCore import Qt, QUrl
-from PySide6.QtGui import QDesktopServices, QIcon
-from PySide6.QtWidgets import QMessageBox
+from requests.adapters import HTTPAdapter
 from retrying import retry
 
+from src.Metrics import STAGE_THROTTLE, getMetrics
+from src.RateLimiter import getHostLimiter, isThrottled
+
+# ? PySide6 只在界面相关的函数中按需导入, 以便命令行模式下不加载Qt
+
 if TYPE_CHECKING:
     from ui.MainGUI import MainGUI
 
@@ -42,6 +49,133 @@ MAX_RETRY_LARGE = 20000
 
 RETRY_WAIT_EX = 200
 
+# ? 流式读取图片时每块的大小, 每收到一块就更新一次字节统计
+STREAM_CHUNK_SIZE = 64 * 1024
+
+############################################################
+# 配置全局共享的网络请求会话, 复用 TCP/TLS 连接
+############################################################
+
+DEFAULT_POOL_SIZE = 10
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+# ? 当前挂载的 HTTPAdapter 的连接池大小
+_pool_size = 0
+
+
+def _mountAdapters(session: requests.Session, pool_size: int) -> None:
+    """为会话挂载指定连接池大小的 HTTPAdapter, 并关闭被替换的 HTTPAdapter 以释放其中的连接
+
+    Args:
+        session (requests.Session): 会话
+        pool_size (int): 每个域名的最大保持连接数
+    """
+    global _pool_size
+    for prefix in ("https://", "http://"):
+        old_adapter = session.adapters.get(prefix)
+        session.mount(
+            prefix,
+            HTTPAdapter(pool_connections=DEFAULT_POOL_SIZE, pool_maxsize=pool_size),
+        )
+        # ? 空闲连接立即关闭, 正在使用的连接在请求结束归还时关闭
+        if old_adapter is not None:
+            old_adapter.close()
+    _pool_size = pool_size
+
+
+class LimitedSession(requests.Session):
+    """按主机限速的会话, 同一主机的所有请求共享令牌桶和自适应并发数,
+    遇到 429 或 5xx 时自动降低并发, 避免所有线程同时重试导致被服务器限流,
+    以 stream=True 发出的请求需要在读取结束后关闭响应 (例如使用 readStream) 才会释放并发槽位"""
+
+    def request(self, method: str, url: str, *args, **kwargs) -> requests.Response:
+        host = urlparse(url).hostname
+        limiter = getHostLimiter(host)
+        wait_start = time.monotonic()
+        start_time = limiter.acquire()
+        getMetrics().observe(STAGE_THROTTLE, start_time - wait_start, host)
+        success, retry_after = False, None
+        try:
+            res = super().request(method, url, *args, **kwargs)
+            success = not isThrottled(res.status_code)
+            if res.status_code == 429:
+                retry_after = res.headers.get("Retry-After")
+        except BaseException:
+            limiter.release(start_time, success, retry_after)
+            raise
+        if not kwargs.get("stream"):
+            limiter.release(start_time, success, retry_after)
+            return res
+
+        # ? stream=True 时收到响应头就返回, 响应内容读取结束或关闭连接时才释放并发槽位,
+        # ? 否则并发数只限制了获取响应头, 不限制同时传输的图片数
+        close = res.close
+        latency = time.monotonic() - start_time
+        released = threading.Lock()
+
+        def closeAndRelease() -> None:
+            try:
+                close()
+            finally:
+                # ? 只释放一次, 自适应并发仍按收到响应头的耗时调整, 不受图片大小影响
+                if released.acquire(blocking=False):
+                    limiter.release(start_time, success, retry_after, latency)
+
+        res.close = closeAndRelease
+        return res
+
+
+def getSession() -> requests.Session:
+    """获取全局共享的网络请求会话, 所有网络请求都应通过此会话发出以复用连接
+
+    Returns:
+        requests.Session: 线程安全的共享会话
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = LimitedSession()
+                # ? 各请求自带 cookie 请求头, 不保存服务器返回的 cookie, 避免线程之间互相污染
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                _mountAdapters(session, DEFAULT_POOL_SIZE)
+                _session = session
+    return _session
+
+
+def setSessionPoolSize(pool_size: int) -> None:
+    """根据下载线程数调整每个域名的连接池大小, 已经发出的请求不受影响, 大小不变时不重新挂载
+
+    Args:
+        pool_size (int): 每个域名的最大保持连接数
+    """
+    session = getSession()
+    pool_size = max(pool_size, DEFAULT_POOL_SIZE)
+    with _session_lock:
+        if pool_size != _pool_size:
+            _mountAdapters(session, pool_size)
+
+
+def readStream(res: requests.Response, on_chunk: Callable[[int], None] = None) -> bytes:
+    """分块读取以 stream=True 发出的请求的响应内容, 读取结束或出错后释放连接
+
+    Args:
+        res (requests.Response): 响应
+        on_chunk (Callable[[int], None]): 每收到一块数据时以字节数调用, 为 None 时不报告
+
+    Returns:
+        bytes: 响应内容
+    """
+    chunks = []
+    with res:
+        for chunk in res.iter_content(STREAM_CHUNK_SIZE):
+            chunks.append(chunk)
+            if on_chunk is not None:
+                on_chunk(len(chunk))
+    return b"".join(chunks)
+
+
 ############################################################
 # 配置日志记录器
 ############################################################
@@ -89,8 +223,25 @@ logger.addHandler(log_handler)
 ############################################################
 
 
+# ? 文件名中的非法字符与替换后的全角字符, 用 str.translate 一次完成替换
+STR_FILTER_TABLE = str.maketrans(
+    {
+        "\\": " ",
+        "/": " ",
+        ":": "：",
+        "*": "⭐",
+        "?": "？",
+        '"': "'",
+        "<": "《",
+        ">": "》",
+        "|": "丨",
+        ".": "·",
+    }
+)
+
+
 def myStrFilter(s: str) -> str:
-    """过滤字符串中的非法字符
+    """过滤字符串中的非法字符, 去掉末尾的空白, 开头的空白替换为一个空格
 
     Args:
         s (str): 待过滤的字符串
@@ -99,17 +250,11 @@ def myStrFilter(s: str) -> str:
         str: 过滤后的字符串
     """
 
-    s = re.sub(r"[\\/]", " ", s)
-    s = re.sub(r":", "：", s)
-    s = re.sub(r"\*", "⭐", s)
-    s = re.sub(r"\?", "？", s)
-    s = re.sub(r'"', "'", s)
-    s = re.sub(r"<", "《", s)
-    s = re.sub(r">", "》", s)
-    s = re.sub(r"\|", "丨", s)
-    s = re.sub(r"\s+$", "", s)
-    s = re.sub(r"^\s+", " ", s)
-    s = re.sub(r"\.", "·", s)
+    # ? 先替换再去掉空白, 斜杠替换成的空格位于首尾时同样会被处理
+    s = s.translate(STR_FILTER_TABLE).rstrip()
+    stripped = s.lstrip()
+    if len(stripped) != len(s):
+        s = f" {stripped}"
 
     return s
 
@@ -136,6 +281,10 @@ def openFileOrDir(mainGUI: MainGUI, path: str) -> None:
     Args:
         path (str): 文件或文件夹路径
     """
+    from PySide6.QtCore import QUrl
+    from PySide6.QtGui import QDesktopServices
+    from PySide6.QtWidgets import QMessageBox
+
     path = os.path.normpath(path)
     if not os.path.exists(path):
         content = f"目录不存在 - 打开目录失败 - 目录:\n{path}"
@@ -158,6 +307,8 @@ def openFolderAndSelectItems(mainGUI: MainGUI, path: str) -> None:
     Args:
         path (str): 文件或文件夹路径
     """
+    from PySide6.QtWidgets import QMessageBox
+
     path = os.path.normpath(path)
     try:
         if platform == "win32":
@@ -235,12 +386,16 @@ def checkNewVersion(mainGUI: MainGUI):
         mainGUI (MainGUI): 主窗口类实例
 
     """
+    from PySide6.QtCore import Qt
+    from PySide6.QtGui import QIcon
+    from PySide6.QtWidgets import QMessageBox
+
     url = "https://api.github.com/repos/Zeal-L/BiliBili-Manga-Downloader/releases/latest"
 
     @retry(stop_max_delay=MAX_RETRY_SMALL, wait_exponential_multiplier=RETRY_WAIT_EX)
     def _() -> dict:
         try:
-            res = requests.get(url, timeout=TIMEOUT_SMALL)
+            res = getSession().get(url, timeout=TIMEOUT_SMALL)
         except requests.RequestException as e:
             logger.warning(f"获取更新信息失败! 重试中...\n{e}")
             raise e
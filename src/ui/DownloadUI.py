@@ -4,18 +4,27 @@
 
 from __future__ import annotations
 
+import os
+import threading
 from sys import platform
 from typing import TYPE_CHECKING
 
 from PySide6.QtCore import QObject, Qt, Signal
 from PySide6.QtWidgets import QHBoxLayout, QLabel, QProgressBar, QWidget
 
+from src.AsyncDownloadManager import AsyncDownloadManager
+from src.BiliPlus import BiliPlusComic
+from src.Comic import Comic
 from src.DownloadManager import DownloadManager
+from src.DownloadQueue import DownloadQueue
 from src.Episode import Episode
+from src.Reporter import SignalReporter
 from src.Utils import (
     TBPF_NOPROGRESS,
     TBPF_NORMAL,
     EasyProgressBar,
+    data_path,
+    logger,
     openFolderAndSelectItems,
 )
 
@@ -29,20 +38,37 @@ class DownloadUI(QObject):
     # ?###########################################################
     # ? 信号槽，用于更新下载进度条
     signal_rate_progress = Signal(dict)
+    # ? 信号槽，用于在主线程中添加重启后恢复的下载任务
+    signal_resume_task = Signal(Episode)
 
     def __init__(self, mainGUI: MainGUI):
         super().__init__()
         self.tasks_bar = {}
-        self.downloadManager = DownloadManager(
+
+        # ? 根据设置选择下载引擎, 缺少 aiohttp 时退回多线程引擎
+        manager_class = DownloadManager
+        if mainGUI.getConfig("async_engine"):
+            if AsyncDownloadManager.isSupported():
+                manager_class = AsyncDownloadManager
+            else:
+                logger.warning("未安装 aiohttp, 无法使用异步下载引擎, 已退回多线程下载引擎")
+        # ? 持久化的下载队列, 程序重启或崩溃后可以继续下载
+        self.downloadQueue = DownloadQueue(os.path.join(data_path, "download_queue.db"))
+        self.downloadManager = manager_class(
             max_workers=mainGUI.getConfig("num_thread"),
-            signal_rate_progress=self.signal_rate_progress,
-            signal_message_box=mainGUI.signal_message_box,
+            max_page_workers=mainGUI.getConfig("num_page_thread"),
+            reporter=SignalReporter(
+                signal_message_box=mainGUI.signal_message_box,
+                signal_rate_progress=self.signal_rate_progress,
+            ),
+            download_queue=self.downloadQueue,
         )
         if platform == "win32":
             self.sysProgressbar = EasyProgressBar()
             self.sysProgressbarIsInit = False
 
         self.init_DownloadUI(mainGUI)
+        self.resumeQueue(mainGUI)
 
     ############################################################
     def init_DownloadUI(self, mainGUI: MainGUI) -> None:
@@ -82,7 +108,12 @@ class DownloadUI(QObject):
                 del self.tasks_bar[taskID]
 
             # ? 更新当前任务数
-            mainGUI.label_tasks_count.setText(f"任务数：{len(self.tasks_bar)}")
+            # ? 同时显示下载和保存两个阶段的队列深度
+            mainGUI.label_tasks_count.setText(
+                f"任务数：{len(self.tasks_bar)} "
+                f"(下载中：{self.downloadManager.getDownloadQueueDepth()} "
+                f"保存中：{self.downloadManager.getPostQueueDepth()})"
+            )
             # ? 更新总进度条的进度，速度和剩余时间
             total_progress = self.downloadManager.getTotalRate()
             mainGUI.progressBar_total_progress.setValue(total_progress)
@@ -119,6 +150,48 @@ class DownloadUI(QObject):
 
         mainGUI.pushButton_clear_tasks.clicked.connect(_)
 
+        # ?###########################################################
+        # ? 绑定恢复下载任务的信号槽
+        self.signal_resume_task.connect(lambda epi: self.addTask(mainGUI, epi))
+
+    ############################################################
+
+    def resumeQueue(self, mainGUI: MainGUI) -> None:
+        """恢复上次退出时尚未完成的下载任务, 重新解析漫画需要联网, 故在后台线程中进行
+
+        Args:
+            mainGUI (MainGUI): 主窗口类实例
+        """
+        jobs = self.downloadQueue.getUnfinished()
+        if not jobs:
+            return
+        logger.info(f"恢复上次未完成的下载任务, 数量: {len(jobs)}")
+
+        def _() -> None:
+            comics: dict[tuple, set] = {}
+            for job in jobs:
+                key = (job["source"], job["comic_id"], job["save_path"])
+                comics.setdefault(key, set()).add(job["ep_id"])
+
+            config = mainGUI.getConfigSnapshot()
+            for (source, comic_id, save_path), ep_ids in comics.items():
+                if source == "biliplus":
+                    comic = BiliPlusComic(comic_id, config, mainGUI.reporter)
+                else:
+                    comic = Comic(comic_id, config, mainGUI.reporter)
+                # ? 恢复的章节都是上次已经解析过的, 不需要最新的章节列表
+                data = comic.getComicInfo(use_cache=True)
+                if not data:
+                    logger.error(f"漫画id:{comic_id} 恢复下载任务失败, 下次启动时重试")
+                    continue
+                # ? 沿用上次的保存路径, 以便找到断点续传的临时图片
+                data["save_path"] = save_path
+                for epi in comic.getEpisodesInfo():
+                    if epi.id in ep_ids:
+                        self.signal_resume_task.emit(epi)
+
+        threading.Thread(target=_, daemon=True).start()
+
     ############################################################
 
     def addFinished(self, mainGUI: MainGUI, label_title: QWidget, path: str) -> None:
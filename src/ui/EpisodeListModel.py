@@ -0,0 +1,194 @@
+"""
+该模块包含章节列表的数据模型，章节详情界面的列表视图只绘制可见的章节，勾选状态全部保存在模型中
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QPersistentModelIndex, QSize, Qt, Signal
+from PySide6.QtGui import QColor
+
+DOWNLOADED_BACKGROUND = QColor(0, 255, 0, 50)
+ITEM_SIZE = QSize(160, 20)
+
+
+class EpisodeListModel(QAbstractListModel):
+    """章节列表模型类
+
+    每个章节是一个 {"title": 标题, "downloaded": 是否已下载, "available": 是否可以下载,
+    "checked": 是否勾选} 字典, 整个列表一次性替换, 批量勾选只发出一次 dataChanged
+    """
+
+    # ? 勾选的章节数变化时发出, 用于更新已选中数量
+    signal_num_checked_changed = Signal(int)
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.episodes: list[dict] = []
+        self.num_checked = 0
+
+    ############################################################
+
+    def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.episodes)
+
+    ############################################################
+
+    def data(
+        self, index: QModelIndex | QPersistentModelIndex, role: int = Qt.ItemDataRole.DisplayRole
+    ) -> Any:
+        if not index.isValid():
+            return None
+        episode = self.episodes[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return episode["title"]
+        if role == Qt.ItemDataRole.CheckStateRole:
+            if episode["downloaded"] or episode["checked"]:
+                return Qt.CheckState.Checked
+            return Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.BackgroundRole:
+            return DOWNLOADED_BACKGROUND if episode["downloaded"] else None
+        if role == Qt.ItemDataRole.SizeHintRole:
+            return ITEM_SIZE
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignLeft
+        return None
+
+    ############################################################
+
+    def flags(self, index: QModelIndex | QPersistentModelIndex) -> Qt.ItemFlag:
+        if not index.isValid() or not self.isCheckable(index.row()):
+            return Qt.ItemFlag.NoItemFlags
+        return (
+            Qt.ItemFlag.ItemIsSelectable
+            | Qt.ItemFlag.ItemIsDragEnabled
+            | Qt.ItemFlag.ItemIsUserCheckable
+            | Qt.ItemFlag.ItemIsEnabled
+        )
+
+    ############################################################
+
+    def setData(
+        self,
+        index: QModelIndex | QPersistentModelIndex,
+        value: Any,
+        role: int = Qt.ItemDataRole.EditRole,
+    ) -> bool:
+        if role != Qt.ItemDataRole.CheckStateRole or not index.isValid():
+            return False
+        if not self.isCheckable(index.row()):
+            return False
+        self.setChecked([index.row()], Qt.CheckState(value) == Qt.CheckState.Checked)
+        return True
+
+    ############################################################
+
+    def setEpisodes(self, episodes: list[dict]) -> None:
+        """替换整个章节列表, 清空勾选
+
+        Args:
+            episodes (list[dict]): 章节列表
+        """
+        self.beginResetModel()
+        self.episodes = episodes
+        self.num_checked = 0
+        self.endResetModel()
+        self.signal_num_checked_changed.emit(self.num_checked)
+
+    ############################################################
+
+    def isCheckable(self, row: int) -> bool:
+        """章节是否可以勾选, 已下载和未解锁的章节不能勾选
+
+        Args:
+            row (int): 章节所在行
+
+        Returns:
+            bool: 是否可以勾选
+        """
+        episode = self.episodes[row]
+        return episode["available"] and not episode["downloaded"]
+
+    ############################################################
+
+    def isChecked(self, row: int) -> bool:
+        """章节是否被勾选
+
+        Args:
+            row (int): 章节所在行
+
+        Returns:
+            bool: 是否被勾选
+        """
+        return self.episodes[row]["checked"]
+
+    ############################################################
+
+    def setChecked(self, rows: list[int], checked: bool) -> None:
+        """批量勾选或者取消勾选章节, 不能勾选的章节会被跳过
+
+        Args:
+            rows (list[int]): 章节所在行
+            checked (bool): 是否勾选
+        """
+        changed = [
+            row
+            for row in rows
+            if self.isCheckable(row) and self.episodes[row]["checked"] != checked
+        ]
+        if not changed:
+            return
+        for row in changed:
+            self.episodes[row]["checked"] = checked
+        self.num_checked += len(changed) if checked else -len(changed)
+        self.__emitChanged(changed, [Qt.ItemDataRole.CheckStateRole])
+
+    ############################################################
+
+    def setAllChecked(self, checked: bool) -> None:
+        """勾选或者取消勾选全部可以勾选的章节
+
+        Args:
+            checked (bool): 是否勾选
+        """
+        self.setChecked(range(len(self.episodes)), checked)
+
+    ############################################################
+
+    def getCheckedRows(self) -> list[int]:
+        """获取所有被勾选的章节
+
+        Returns:
+            list[int]: 被勾选的章节所在行
+        """
+        return [row for row, episode in enumerate(self.episodes) if episode["checked"]]
+
+    ############################################################
+
+    def markDownloaded(self, rows: list[int]) -> None:
+        """把章节标记为已下载, 之后不能再勾选
+
+        Args:
+            rows (list[int]): 章节所在行
+        """
+        if not rows:
+            return
+        for row in rows:
+            if self.episodes[row]["checked"]:
+                self.episodes[row]["checked"] = False
+                self.num_checked -= 1
+            self.episodes[row]["downloaded"] = True
+        self.__emitChanged(rows, [Qt.ItemDataRole.CheckStateRole, Qt.ItemDataRole.BackgroundRole])
+
+    ############################################################
+
+    def __emitChanged(self, rows: list[int], roles: list[int]) -> None:
+        """发出一次覆盖所有变化行的 dataChanged, 以及新的勾选数量
+
+        Args:
+            rows (list[int]): 变化的行
+            roles (list[int]): 变化的数据角色
+        """
+        self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)), roles)
+        self.signal_num_checked_changed.emit(self.num_checked)
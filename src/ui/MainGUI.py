@@ -13,6 +13,8 @@ from PySide6.QtGui import QCloseEvent, QFont, QKeyEvent
 from PySide6.QtWidgets import QMainWindow, QMessageBox
 from qt_material import QtStyleTools
 
+from src.Config import Config
+from src.Reporter import SignalReporter
 from src.ui.DownloadUI import DownloadUI
 from src.ui.MangaUI import MangaUI
 from src.ui.PySide_src.mainWindow_ui import Ui_MainWindow
@@ -40,6 +42,12 @@ class MainGUI(QMainWindow, Ui_MainWindow, QtStyleTools):
         self.signal_message_box.connect(lambda msg: QMessageBox.warning(self, "警告", msg))
         self.signal_information_box.connect(lambda msg: QMessageBox.information(self, "通知", msg))
         self.signal_resolve_status.connect(partial(self.label_resolve_status.setText))
+        # ? 注入到核心模块中的报告接口, 通过信号把提示转发到主线程
+        self.reporter = SignalReporter(
+            signal_message_box=self.signal_message_box,
+            signal_information_box=self.signal_information_box,
+            signal_resolve_status=self.signal_resolve_status,
+        )
 
         # ?###########################################################
         # ? 初始化功能键状态
@@ -102,8 +110,7 @@ class MainGUI(QMainWindow, Ui_MainWindow, QtStyleTools):
 
         logger.info("\n\n\t\t\t-------------------  程序正常退出 -------------------\n")
 
-        self.downloadUI.downloadManager.terminated = True
-        self.downloadUI.downloadManager.executor.shutdown(wait=False, cancel_futures=True)
+        self.downloadUI.downloadManager.shutdown()
         self.mangaUI.executor.shutdown(wait=False, cancel_futures=True)
         logging.shutdown()
         event.accept()
@@ -234,6 +241,19 @@ class MainGUI(QMainWindow, Ui_MainWindow, QtStyleTools):
             return None
         return self.config.get(key)
 
+    ############################################################
+    def getConfigSnapshot(self) -> Config:
+        """获取当前设置的只读快照, 注入到核心模块中使用
+
+        Returns:
+            Config: 设置快照
+        """
+        self.getConfig("save_path")
+        library_paths = {
+            comic_id: info.get("comic_path") for comic_id, info in self.my_library.items()
+        }
+        return Config.fromDict(self.config, library_paths)
+
     ############################################################
     def updateConfig(self, key: str, value: Any) -> None:
         """更新用户配置文件
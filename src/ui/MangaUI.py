@@ -4,7 +4,6 @@
 
 from __future__ import annotations
 
-import json
 import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import partial
@@ -12,8 +11,8 @@ from re import sub
 from typing import TYPE_CHECKING
 
 from pypinyin import lazy_pinyin
-from PySide6.QtCore import QEvent, QObject, QPoint, QSize, Qt, QUrl, Signal
-from PySide6.QtGui import QColor, QDesktopServices, QImage, QIntValidator, QPixmap
+from PySide6.QtCore import QEvent, QModelIndex, QObject, QPoint, Qt, QUrl, Signal
+from PySide6.QtGui import QDesktopServices, QImage, QIntValidator, QPixmap
 from PySide6.QtWidgets import (
     QHBoxLayout,
     QLabel,
@@ -25,7 +24,11 @@ from PySide6.QtWidgets import (
 
 from src.BiliPlus import BiliPlusComic
 from src.Comic import Comic
+from src.Episode import Episode
+from src.LibraryDB import getLibraryDB
+from src.LibraryUpdater import LibraryUpdater
 from src.SearchComic import SearchComic
+from src.ui.EpisodeListModel import EpisodeListModel
 from src.Utils import logger, openFileOrDir
 
 if TYPE_CHECKING:
@@ -38,6 +41,8 @@ class MangaUI(QObject):
     # ?###########################################################
     # ? 用于多线程更新我的库存
     signal_my_library_add_widget = Signal(dict)
+    # ? 用于在主线程中添加自动下载的新章节
+    signal_auto_download_task = Signal(Episode)
 
     # ? 用于多线程更新漫画详情
     signal_my_comic_detail_widget = Signal(dict)
@@ -48,14 +53,14 @@ class MangaUI(QObject):
     # ? 用于多线程刷新漫画章节信息
     signal_episode_info_update_widget = Signal(dict)
 
-    # ? 用于多线程刷新漫画章节列表
-    signal_episode_list_update_widget = Signal(dict)
+    # ? 用于多线程刷新漫画章节列表, 整个列表一次发送
+    signal_episode_list_update_widget = Signal(list)
 
     def __init__(self, mainGUI: MainGUI):
         super().__init__()
         self.search_info = None
-        self.num_selected = 0
         self.epi_list = []
+        self.episode_model = EpisodeListModel(self)
         self.present_comic_id = 0
         self.mainGUI = mainGUI
         self.executor = ThreadPoolExecutor()
@@ -83,7 +88,7 @@ class MangaUI(QObject):
             self.search_info = SearchComic(
                 self.mainGUI.lineEdit_manga_search_name.text(),
                 self.mainGUI.getConfig("cookie"),
-            ).getResults(self.mainGUI)
+            ).getResults(self.mainGUI.reporter)
             self.mainGUI.listWidget_manga_search.clear()
             self.mainGUI.label_manga_search.setText(f"{len(self.search_info)}条结果")
             for item in self.search_info:
@@ -122,7 +127,9 @@ class MangaUI(QObject):
                 return
             self.present_comic_id = comic_id
             self.resolveEnable("resolving")
-            comic = Comic(self.present_comic_id, self.mainGUI)
+            comic = Comic(
+                self.present_comic_id, self.mainGUI.getConfigSnapshot(), self.mainGUI.reporter
+            )
             self.updateComicInfoEvent(comic, "done")
 
         self.mainGUI.lineEdit_manga_search_id.returnPressed.connect(_)
@@ -137,7 +144,9 @@ class MangaUI(QObject):
             index = self.mainGUI.listWidget_manga_search.indexFromItem(item).row()
             self.present_comic_id = self.search_info[index]["id"]
             self.resolveEnable("resolving")
-            comic = Comic(self.present_comic_id, self.mainGUI)
+            comic = Comic(
+                self.present_comic_id, self.mainGUI.getConfigSnapshot(), self.mainGUI.reporter
+            )
             self.updateComicInfoEvent(comic, "done")
 
         self.mainGUI.listWidget_manga_search.itemDoubleClicked.connect(_)
@@ -188,12 +197,15 @@ class MangaUI(QObject):
         # 布局对齐
         self.mainGUI.v_Layout_myLibrary.setAlignment(Qt.AlignTop)
         self.signal_my_library_add_widget.connect(self.updateMyLibrarySingleAdd)
+        self.signal_auto_download_task.connect(
+            lambda epi: self.mainGUI.downloadUI.addTask(self.mainGUI, epi)
+        )
 
         def _() -> None:
             if not self.mainGUI.getConfig("cookie"):
                 QMessageBox.critical(self.mainGUI, "警告", "请先在设置界面填写自己的Cookie！")
                 return
-            self.readMyLibrary()
+            self.readMyLibrary(rescan=True)
             self.updateMyLibrary(notice=True)
 
         self.mainGUI.pushButton_myLibrary_update.clicked.connect(_)
@@ -204,13 +216,22 @@ class MangaUI(QObject):
     # QObject::setParent: Cannot set parent, new parent is in a different thread
     ############################################################
 
-    def readMyLibrary(self) -> None:
-        """读取我的库存漫画元数据"""
+    def readMyLibrary(self, rescan: bool = False) -> None:
+        """从本地库存数据库读取我的库存漫画
+
+        Args:
+            rescan (bool): 是否先扫描库存目录下的元数据.json, 导入数据库中还没有的漫画
+        """
 
         path = self.mainGUI.getConfig("save_path")
 
         if os.path.exists(path):
-            self.mainGUI.my_library = self.get_meta_dict(path)
+            library_db = getLibraryDB()
+            self.mainGUI.my_library = library_db.getComics(path)
+            # ? 第一次使用数据库时从元数据.json导入, 之后只在手动检查更新时扫描
+            if rescan or not self.mainGUI.my_library:
+                library_db.importLegacyMeta(path)
+                self.mainGUI.my_library = library_db.getComics(path)
         else:
             self.mainGUI.lineEdit_save_path.setText(os.getcwd())
             self.mainGUI.updateConfig("save_path", os.getcwd())
@@ -282,17 +303,22 @@ class MangaUI(QObject):
             comic_path (str): 漫画保存路径
         """
 
-        comic = Comic(comic_id, self.mainGUI)
-        data = comic.getComicInfo()
+        config = self.mainGUI.getConfigSnapshot()
+        result = LibraryUpdater(config, self.mainGUI.reporter).updateComic(comic_id)
         # ? 获取漫画信息失败直接跳过
-        if not data:
+        if result is None:
             return comic_id
-        epi_list = comic.getEpisodesInfo()
+
+        # ? 开启自动下载时把新章节加入下载队列
+        if config.auto_download_new:
+            for epi in result["to_download"]:
+                self.signal_auto_download_task.emit(epi)
 
         info = {
-            "data": data,
-            "comic": comic,
-            "epi_list": epi_list,
+            "data": result["data"],
+            "comic": result["comic"],
+            "num_episodes": result["num_episodes"],
+            "num_downloaded": result["num_downloaded"],
             "comic_path": comic_path,
         }
 
@@ -309,7 +335,8 @@ class MangaUI(QObject):
 
         data: dict = info["data"]
         comic: Comic = info["comic"]
-        epi_list: list = info["epi_list"]
+        num_episodes: int = info["num_episodes"]
+        num_downloaded: int = info["num_downloaded"]
         comic_path: str = info["comic_path"]
 
         h_layout_my_library = QHBoxLayout()
@@ -319,7 +346,7 @@ class MangaUI(QObject):
             )
         )
         h_layout_my_library.addStretch(1)
-        h_layout_my_library.addWidget(QLabel(f"{comic.getNumDownloaded()}/{len(epi_list)}"))
+        h_layout_my_library.addWidget(QLabel(f"{num_downloaded}/{num_episodes}"))
 
         widget = QWidget()
         widget.setStyleSheet("font-size: 10pt;")
@@ -397,7 +424,7 @@ class MangaUI(QObject):
         """
 
         self.mainGUI.signal_resolve_status.emit("正在解析漫画详情...")
-        data = comic.getComicInfo()
+        data = comic.getComicInfo(use_cache=False)
         self.signal_my_comic_detail_widget.emit(
             {
                 "mainGUI": self.mainGUI,
@@ -443,8 +470,10 @@ class MangaUI(QObject):
         )
 
         # ?###########################################################
-        # ? 用多线程获取封面，避免卡顿
-        self.executor.submit(self.getComicCover, comic, data)
+        # ? 用多线程获取封面，避免卡顿; 取不小于封面区域宽度的缩略图, 控件尺寸只能在主线程读取
+        width = max(self.mainGUI.label_manga_image.width(), 200)
+        cover_width = int(width * self.mainGUI.devicePixelRatioF())
+        self.executor.submit(self.getComicCover, comic, data, cover_width)
 
         # ?###########################################################
         # ? 封面的绑定双击和悬停事件
@@ -467,19 +496,21 @@ class MangaUI(QObject):
     ############################################################
 
     ############################################################
-    def getComicCover(self, comic: Comic, data: dict) -> None:
+    def getComicCover(self, comic: Comic, data: dict, width: int) -> None:
         """更新封面的执行函数
 
         Args:
             comic (Comic): 获取的漫画实例
             data (dict): 漫画实例的数据
+            width (int): 缩略图的宽度, 单位为物理像素, 需要在主线程中根据封面区域计算
 
         """
 
-        img_byte = comic.getComicCover(data)
+        # ? 在工作线程中下载和解码, 避免阻塞界面
+        img_byte = comic.getComicCover(data, width)
         self.signal_my_cover_update_widget.emit(
             {
-                "img_byte": img_byte,
+                "image": QImage.fromData(img_byte),
             }
         )
 
@@ -492,10 +523,10 @@ class MangaUI(QObject):
 
         """
 
-        img_byte: bytes = info["img_byte"]
+        image: QImage = info["image"]
 
         # 重写图片大小改变事件，使图片不会变形
-        label_img = QPixmap.fromImage(QImage.fromData(img_byte))
+        label_img = QPixmap.fromImage(image)
 
         def _(event: QEvent = None) -> None:
             new_size = event.size() if event else self.mainGUI.label_manga_image.size()
@@ -523,45 +554,27 @@ class MangaUI(QObject):
         """
 
         self.mainGUI.signal_resolve_status.emit("正在解析漫画章节...")
-        self.num_selected = 0
         num_unlocked = 0
         if comic:
             self.epi_list = comic.getEpisodesInfo()
         self.mainGUI.signal_resolve_status.emit("正在处理章节详情...")
 
         # ?###########################################################
-        # ? 分析章节信息
-        # 清除历史章节列表
-        self.signal_episode_list_update_widget.emit({})
-        # 丝滑插入章节
+        # ? 分析章节信息, 整理好之后一次性替换章节列表
+        episodes = []
         for epi in self.epi_list:
-            title = epi.title
-            check_state = Qt.CheckState.Unchecked
-            flags = (
-                Qt.ItemFlag.ItemIsSelectable
-                | Qt.ItemFlag.ItemIsDragEnabled
-                | Qt.ItemFlag.ItemIsUserCheckable
-                | Qt.ItemFlag.ItemIsEnabled
-            )
-            background = QColor(0, 0, 0, 0)
-
-            if epi.isDownloaded():
-                flags = Qt.ItemFlag.NoItemFlags
-                check_state = Qt.CheckState.Checked
-                background = QColor(0, 255, 0, 50)
-            if not epi.isAvailable():
-                flags = Qt.ItemFlag.NoItemFlags
-            else:
+            available = epi.isAvailable()
+            if available:
                 num_unlocked += 1
-
-            self.signal_episode_list_update_widget.emit(
+            episodes.append(
                 {
-                    "title": title,
-                    "check_state": check_state,
-                    "background": background,
-                    "flags": flags,
+                    "title": epi.title,
+                    "downloaded": epi.isDownloaded(),
+                    "available": available,
+                    "checked": False,
                 }
             )
+        self.signal_episode_list_update_widget.emit(episodes)
 
         self.signal_episode_info_update_widget.emit(
             {
@@ -586,188 +599,119 @@ class MangaUI(QObject):
 
         # ?###########################################################
         # ? 删除教学文本框
-        if self.mainGUI.listWidget_chp_detail.maximumHeight() == 0:
+        if self.mainGUI.listView_chp_detail.maximumHeight() == 0:
             self.mainGUI.textBrowser_tutorial.deleteLater()
-            self.mainGUI.listWidget_chp_detail.setMaximumHeight(16777215)
+            self.mainGUI.listView_chp_detail.setMaximumHeight(16777215)
 
         # ?###########################################################
         # ? 各种章节数与状态显示的更新
         self.mainGUI.label_chp_detail_total_chp.setText(f"总章数：{len(self.epi_list)}")
         self.mainGUI.label_chp_detail_num_unlocked.setText(f"已解锁：{num_unlocked}")
         self.mainGUI.label_chp_detail_num_downloaded.setText(f"已下载：{comic.getNumDownloaded()}")
-        self.mainGUI.label_chp_detail_num_selected.setText(f"已选中：{self.num_selected}")
+        self.updateNumSelected(self.episode_model.num_checked)
         self.resolveEnable(resolve_type)
         self.mainGUI.signal_resolve_status.emit("")
 
     ############################################################
-    def updateEpisodeList(self, info: dict) -> None:
-        """插入漫画列表章节的回调函数
+    def updateEpisodeList(self, episodes: list[dict]) -> None:
+        """替换漫画章节列表的回调函数
 
         Args:
-            info (dict): 执行分析章节信息后返回的数据
+            episodes (list[dict]): 执行分析章节信息后返回的全部章节
 
         """
 
-        if not info:
-            self.mainGUI.listWidget_chp_detail.clear()
-            return
-        title: str = info["title"]
-        check_state: Qt.CheckState = info["check_state"]
-        background: QColor = info["background"]
-        flags: Qt.ItemFlag = info["flags"]
-
-        # ?###########################################################
-        # ? 生成章节元素
-        widget = QListWidgetItem(title)
-        widget.setToolTip(title)
-        widget.setFlags(flags)
-        widget.setCheckState(check_state)
-        widget.setBackground(background)
-        widget.setSizeHint(QSize(160, 20))
-        widget.setTextAlignment(Qt.AlignmentFlag.AlignLeft)
-        self.mainGUI.listWidget_chp_detail.addItem(widget)
+        self.episode_model.setEpisodes(episodes)
 
     ############################################################
 
-    def checkbox_change_callBack(self, item: QListWidgetItem) -> None:
-        """章节详情界面的多选框状态改变时的回调函数
+    def updateNumSelected(self, num_selected: int) -> None:
+        """章节勾选数量改变时的回调函数
 
         Args:
-            item (QListWidgetItem): 被点击的item
+            num_selected (int): 当前勾选的章节数
         """
 
-        if item.flags() == Qt.ItemFlag.NoItemFlags:
-            return
-        if item.checkState() == Qt.CheckState.Checked:
-            self.num_selected += 1
-        elif item.checkState() == Qt.CheckState.Unchecked:
-            self.num_selected -= 1
-        self.mainGUI.label_chp_detail_num_selected.setText(f"已选中：{self.num_selected}")
+        self.mainGUI.label_chp_detail_num_selected.setText(f"已选中：{num_selected}")
 
     ############################################################
 
     def init_episodesDetails(self) -> None:
         """绑定章节界面的多选以及右键菜单事件"""
 
-        self.num_selected = 0
-        self.mainGUI.listWidget_chp_detail.setDragEnabled(False)
+        self.mainGUI.listView_chp_detail.setModel(self.episode_model)
+        self.mainGUI.listView_chp_detail.setDragEnabled(False)
 
         # ?###########################################################
-        # ? 绑定鼠标点击选择信号
-        self.mainGUI.listWidget_chp_detail.itemChanged.connect(self.checkbox_change_callBack)
+        # ? 绑定勾选数量改变信号
+        self.episode_model.signal_num_checked_changed.connect(self.updateNumSelected)
 
-        def _(item: QListWidgetItem) -> None:
-            if item.flags() == Qt.ItemFlag.NoItemFlags:
+        def selectedRows() -> list[int]:
+            return [index.row() for index in self.mainGUI.listView_chp_detail.selectedIndexes()]
+
+        # ?###########################################################
+        # ? 绑定鼠标点击选择信号
+        def _(index: QModelIndex) -> None:
+            if not self.episode_model.isCheckable(index.row()):
                 return
-            if item.checkState() == Qt.CheckState.Checked:
-                item.setCheckState(Qt.CheckState.Unchecked)
-            elif item.checkState() == Qt.CheckState.Unchecked:
-                item.setCheckState(Qt.CheckState.Checked)
+            self.episode_model.setChecked(
+                [index.row()], not self.episode_model.isChecked(index.row())
+            )
 
-        self.mainGUI.listWidget_chp_detail.itemPressed.connect(_)
+        self.mainGUI.listView_chp_detail.pressed.connect(_)
 
         # ?###########################################################
         # ? 绑定回车选择信号
 
-        def _(currentItem: QListWidgetItem) -> None:
-            checked = (
-                Qt.CheckState.Unchecked
-                if currentItem.checkState() == Qt.CheckState.Checked
-                else Qt.CheckState.Checked
-            )
-            selected_items = self.mainGUI.listWidget_chp_detail.selectedItems()
-            for item in selected_items:
-                item.setCheckState(checked)
+        def _(current: QModelIndex) -> None:
+            checked = not self.episode_model.isChecked(current.row())
+            self.episode_model.setChecked(selectedRows(), checked)
 
-        self.mainGUI.listWidget_chp_detail.itemActivated.connect(_)
+        self.mainGUI.listView_chp_detail.activated.connect(_)
 
         # ?###########################################################
         # ? 绑定更改当前选择项信号
         # 原本想实现按住Ctrl移动方向键进行多个选中，但影响按住Ctrl的鼠标选择，原因不明故注释
-        # def _(current: QListWidgetItem, previous: QListWidgetItem) -> None:
+        # def _(current: QModelIndex, previous: QModelIndex) -> None:
         #     if not (self.mainGUI.CtrlPress or self.mainGUI.AltPress):
         #         return
+        #     selection_model = self.mainGUI.listView_chp_detail.selectionModel()
         #     if self.mainGUI.CtrlPress and not self.mainGUI.AltPress:
-        #         current.setSelected(True)
+        #         selection_model.select(current, QItemSelectionModel.Select)
         #     if self.mainGUI.CtrlPress and self.mainGUI.AltPress:
-        #         previous.setSelected(False)
-        # self.mainGUI.listWidget_chp_detail.currentItemChanged.connect(_)
+        #         selection_model.select(previous, QItemSelectionModel.Deselect)
+        # self.mainGUI.listView_chp_detail.selectionModel().currentChanged.connect(_)
 
         # ?###########################################################
         # ? 绑定鼠标划过信号
 
-        def _(item: QListWidgetItem) -> None:
-            if item.flags() == Qt.ItemFlag.NoItemFlags:
+        def _(index: QModelIndex) -> None:
+            if not self.episode_model.isCheckable(index.row()):
                 return
             if not self.mainGUI.isFocus or not (self.mainGUI.ShiftPress or self.mainGUI.AltPress):
                 return
             if self.mainGUI.ShiftPress and self.mainGUI.AltPress:
-                item.setCheckState(Qt.CheckState.Unchecked)
+                self.episode_model.setChecked([index.row()], False)
             elif self.mainGUI.AltPress:
-                item.setCheckState(Qt.CheckState.Checked)
+                self.episode_model.setChecked([index.row()], True)
 
-        self.mainGUI.listWidget_chp_detail.itemEntered.connect(_)
+        self.mainGUI.listView_chp_detail.entered.connect(_)
 
         # ?###########################################################
         # ? 绑定右键菜单，让用户可以勾选或者全选等
 
-        def checkSelected() -> None:
-            self.mainGUI.listWidget_chp_detail.itemChanged.disconnect()
-            for item in self.mainGUI.listWidget_chp_detail.selectedItems():
-                if (
-                    item.flags() != Qt.ItemFlag.NoItemFlags
-                    and item.checkState() == Qt.CheckState.Unchecked
-                ):
-                    item.setCheckState(Qt.CheckState.Checked)
-                    self.num_selected += 1
-            self.mainGUI.label_chp_detail_num_selected.setText(f"已选中：{self.num_selected}")
-            self.mainGUI.listWidget_chp_detail.itemChanged.connect(self.checkbox_change_callBack)
-
-        def uncheckSelected() -> None:
-            self.mainGUI.listWidget_chp_detail.itemChanged.disconnect()
-            for item in self.mainGUI.listWidget_chp_detail.selectedItems():
-                if (
-                    item.flags() != Qt.ItemFlag.NoItemFlags
-                    and item.checkState() == Qt.CheckState.Checked
-                ):
-                    item.setCheckState(Qt.CheckState.Unchecked)
-                    self.num_selected -= 1
-            self.mainGUI.label_chp_detail_num_selected.setText(f"已选中：{self.num_selected}")
-            self.mainGUI.listWidget_chp_detail.itemChanged.connect(self.checkbox_change_callBack)
-
-        def checkAll() -> None:
-            self.mainGUI.listWidget_chp_detail.itemChanged.disconnect()
-            self.num_selected = 0
-            for i in range(self.mainGUI.listWidget_chp_detail.count()):
-                if self.mainGUI.listWidget_chp_detail.item(i).flags() != Qt.ItemFlag.NoItemFlags:
-                    self.mainGUI.listWidget_chp_detail.item(i).setCheckState(Qt.CheckState.Checked)
-                    self.num_selected += 1
-            self.mainGUI.label_chp_detail_num_selected.setText(f"已选中：{self.num_selected}")
-            self.mainGUI.listWidget_chp_detail.itemChanged.connect(self.checkbox_change_callBack)
-
-        def uncheckAll() -> None:
-            self.mainGUI.listWidget_chp_detail.itemChanged.disconnect()
-            self.num_selected = 0
-            for i in range(self.mainGUI.listWidget_chp_detail.count()):
-                if self.mainGUI.listWidget_chp_detail.item(i).flags() != Qt.ItemFlag.NoItemFlags:
-                    self.mainGUI.listWidget_chp_detail.item(i).setCheckState(
-                        Qt.CheckState.Unchecked
-                    )
-            self.mainGUI.label_chp_detail_num_selected.setText(f"已选中：{self.num_selected}")
-            self.mainGUI.listWidget_chp_detail.itemChanged.connect(self.checkbox_change_callBack)
-
         def myMenu(pos: QPoint) -> None:
             menu = QMenu()
-            menu.addAction("勾选", checkSelected)
-            menu.addAction("取消勾选", uncheckSelected)
-            menu.addAction("全选", checkAll)
-            menu.addAction("取消全选", uncheckAll)
-            menu.exec_(self.mainGUI.listWidget_chp_detail.mapToGlobal(pos))
+            menu.addAction("勾选", lambda: self.episode_model.setChecked(selectedRows(), True))
+            menu.addAction("取消勾选", lambda: self.episode_model.setChecked(selectedRows(), False))
+            menu.addAction("全选", lambda: self.episode_model.setAllChecked(True))
+            menu.addAction("取消全选", lambda: self.episode_model.setAllChecked(False))
+            menu.exec_(self.mainGUI.listView_chp_detail.mapToGlobal(pos))
 
-        self.mainGUI.listWidget_chp_detail.setContextMenuPolicy(
+        self.mainGUI.listView_chp_detail.setContextMenuPolicy(
             Qt.ContextMenuPolicy.CustomContextMenu
         )
-        self.mainGUI.listWidget_chp_detail.customContextMenuRequested.connect(myMenu)
+        self.mainGUI.listView_chp_detail.customContextMenuRequested.connect(myMenu)
 
     ############################################################
 
@@ -784,7 +728,9 @@ class MangaUI(QObject):
                 QMessageBox.critical(self.mainGUI, "警告", "请先在设置界面填写自己的Cookie！")
                 return
             self.resolveEnable("resolving")
-            comic = Comic(self.present_comic_id, self.mainGUI)
+            comic = Comic(
+                self.present_comic_id, self.mainGUI.getConfigSnapshot(), self.mainGUI.reporter
+            )
             self.updateComicInfoEvent(comic, "done")
 
         self.mainGUI.pushButton_resolve_detail.clicked.connect(_)
@@ -801,7 +747,9 @@ class MangaUI(QObject):
                 )
                 return
             self.resolveEnable("resolving")
-            comic = BiliPlusComic(self.present_comic_id, self.mainGUI)
+            comic = BiliPlusComic(
+                self.present_comic_id, self.mainGUI.getConfigSnapshot(), self.mainGUI.reporter
+            )
             self.updateComicInfoEvent(comic, "done")
 
         self.mainGUI.pushButton_biliplus_resolve_detail.clicked.connect(_)
@@ -814,19 +762,17 @@ class MangaUI(QObject):
         # ?###########################################################
         # ? 绑定下载选中章节事件
         def _() -> None:
-            if self.num_selected == 0:
+            checked_rows = self.episode_model.getCheckedRows()
+            if not checked_rows:
                 return
-            logger.info(f"开始下载选中章节, 数量: {self.num_selected}")
+            logger.info(f"开始下载选中章节, 数量: {len(checked_rows)}")
 
             # ?###########################################################
             # ? 更新章节详情界面
-            num_downloaded = (
-                int(self.mainGUI.label_chp_detail_num_downloaded.text().split("：")[1])
-                + self.num_selected
-            )
-            self.num_selected = 0
+            num_downloaded = int(
+                self.mainGUI.label_chp_detail_num_downloaded.text().split("：")[1]
+            ) + len(checked_rows)
             self.mainGUI.label_chp_detail_num_downloaded.setText(f"已下载：{num_downloaded}")
-            self.mainGUI.label_chp_detail_num_selected.setText(f"已选中：{self.num_selected}")
 
             # ?###########################################################
             # ? 初始化储存文件夹
@@ -837,23 +783,18 @@ class MangaUI(QObject):
             # ?###########################################################
             # ? 保存元数据
             if not os.path.exists(os.path.join(save_path, "元数据.json")):
-                comic = Comic(self.present_comic_id, self.mainGUI)
-                self.save_meta(comic.getComicInfo())
+                comic = Comic(
+                    self.present_comic_id, self.mainGUI.getConfigSnapshot(), self.mainGUI.reporter
+                )
+                # ? 刚刚解析过这部漫画, 元数据直接使用缓存
+                comic.getComicInfo(use_cache=True)
+                comic.saveMeta()
 
             # ?###########################################################
             # ? 开始下载选中章节
-            self.mainGUI.listWidget_chp_detail.itemChanged.disconnect()
-            for i in range(self.mainGUI.listWidget_chp_detail.count()):
-                item = self.mainGUI.listWidget_chp_detail.item(i)
-                if (
-                    item.flags() != Qt.ItemFlag.NoItemFlags
-                    and item.checkState() == Qt.CheckState.Checked
-                ):
-                    comic = Comic(self.present_comic_id, self.mainGUI)
-                    self.mainGUI.downloadUI.addTask(self.mainGUI, self.epi_list[i])
-                    item.setFlags(Qt.ItemFlag.NoItemFlags)
-                    item.setBackground(QColor(0, 255, 0, 50))
-            self.mainGUI.listWidget_chp_detail.itemChanged.connect(self.checkbox_change_callBack)
+            for row in checked_rows:
+                self.mainGUI.downloadUI.addTask(self.mainGUI, self.epi_list[row])
+            self.episode_model.markDownloaded(checked_rows)
 
             # ?###########################################################
             # ? 更新我的库存界面信息 也就是v_Layout_myLibrary里的章节数量信息
@@ -888,55 +829,3 @@ class MangaUI(QObject):
 
         if resolve_type == "done":
             self.mainGUI.pushButton_chp_detail_download_selected.setEnabled(True)
-
-    ############################################################
-
-    def save_meta(self, data: dict) -> None:
-        """保存元数据
-
-        Args:
-            data (dict): 漫画元数据
-
-        """
-
-        meta = {
-            "id": data["id"],
-            "title": data["title"],
-            "horizontal_cover": data["horizontal_cover"],
-            "square_cover": data["square_cover"],
-            "vertical_cover": data["vertical_cover"],
-            "author_name": data["author_name"],
-            "styles": data["styles"],
-            "evaluate": data["evaluate"],
-            "renewal_time": data["renewal_time"],
-            "hall_icon_text": data["hall_icon_text"],
-            "tags": [tag["name"] for tag in data["tags"]],
-        }
-
-        with open(os.path.join(data["save_path"], "元数据.json"), "w", encoding="utf-8") as f:
-            json.dump(meta, f, indent=4, ensure_ascii=False)
-
-    ############################################################
-
-    def get_meta_dict(self, path: str) -> dict:
-        """读取指定库存目录下所有子漫画文件夹的元数据并返回
-
-        Args:
-            path (str): 库存目录路径
-
-        """
-
-        meta_dict = {}
-        try:
-            for item in os.listdir(path):
-                if os.path.exists(os.path.join(path, item, "元数据.json")):
-                    with open(os.path.join(path, item, "元数据.json"), "r", encoding="utf-8") as f:
-                        comic_path = os.path.join(path, item)
-                        data = json.load(f)
-                        meta_dict[data["id"]] = {
-                            "comic_name": data["title"],
-                            "comic_path": comic_path,
-                        }
-        except (OSError, ValueError) as e:
-            logger.error(f"读取元数据时发生错误\n {e}")
-        return meta_dict
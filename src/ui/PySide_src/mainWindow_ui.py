@@ -345,23 +345,24 @@ class Ui_MainWindow(object):
 
         self.verticalLayout_4.addWidget(self.textBrowser_tutorial)
 
-        self.listWidget_chp_detail = QListWidget(self.groupBox_chp_detail)
-        self.listWidget_chp_detail.setObjectName(u"listWidget_chp_detail")
-        self.listWidget_chp_detail.setMaximumSize(QSize(16777215, 0))
-        self.listWidget_chp_detail.setMouseTracking(True)
-        self.listWidget_chp_detail.setAutoFillBackground(True)
-        self.listWidget_chp_detail.setDragEnabled(True)
-        self.listWidget_chp_detail.setSelectionMode(QAbstractItemView.ExtendedSelection)
-        self.listWidget_chp_detail.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.listWidget_chp_detail.setProperty("isWrapping", True)
-        self.listWidget_chp_detail.setResizeMode(QListView.Adjust)
-        self.listWidget_chp_detail.setSpacing(5)
-        self.listWidget_chp_detail.setViewMode(QListView.IconMode)
-        self.listWidget_chp_detail.setUniformItemSizes(True)
-        self.listWidget_chp_detail.setBatchSize(100)
-        self.listWidget_chp_detail.setWordWrap(False)
-
-        self.verticalLayout_4.addWidget(self.listWidget_chp_detail)
+        self.listView_chp_detail = QListView(self.groupBox_chp_detail)
+        self.listView_chp_detail.setObjectName(u"listView_chp_detail")
+        self.listView_chp_detail.setMaximumSize(QSize(16777215, 0))
+        self.listView_chp_detail.setMouseTracking(True)
+        self.listView_chp_detail.setAutoFillBackground(True)
+        self.listView_chp_detail.setDragEnabled(True)
+        self.listView_chp_detail.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.listView_chp_detail.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.listView_chp_detail.setProperty("isWrapping", True)
+        self.listView_chp_detail.setResizeMode(QListView.Adjust)
+        self.listView_chp_detail.setLayoutMode(QListView.Batched)
+        self.listView_chp_detail.setSpacing(5)
+        self.listView_chp_detail.setViewMode(QListView.IconMode)
+        self.listView_chp_detail.setUniformItemSizes(True)
+        self.listView_chp_detail.setBatchSize(100)
+        self.listView_chp_detail.setWordWrap(False)
+
+        self.verticalLayout_4.addWidget(self.listView_chp_detail)
 
 
         self.horizontalLayout_19.addWidget(self.groupBox_chp_detail)
@@ -691,6 +692,41 @@ class Ui_MainWindow(object):
 
         self.horizontalLayout_5.addWidget(self.checkBox_exif_info)
 
+        self.horizontalSpacer_17 = QSpacerItem(30, 20, QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Minimum)
+
+        self.horizontalLayout_5.addItem(self.horizontalSpacer_17)
+
+        self.label_zip_compression = QLabel(self.tab_setting)
+        self.label_zip_compression.setObjectName(u"label_zip_compression")
+
+        self.horizontalLayout_5.addWidget(self.label_zip_compression)
+
+        self.comboBox_zip_compression = QComboBox(self.tab_setting)
+        self.comboBox_zip_compression.setObjectName(u"comboBox_zip_compression")
+        self.comboBox_zip_compression.setMinimumSize(QSize(100, 0))
+
+        self.horizontalLayout_5.addWidget(self.comboBox_zip_compression)
+
+        self.horizontalSpacer_18 = QSpacerItem(30, 20, QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Minimum)
+
+        self.horizontalLayout_5.addItem(self.horizontalSpacer_18)
+
+        self.checkBox_resume_download = QCheckBox(self.tab_setting)
+        self.checkBox_resume_download.setObjectName(u"checkBox_resume_download")
+        self.checkBox_resume_download.setChecked(True)
+
+        self.horizontalLayout_5.addWidget(self.checkBox_resume_download)
+
+        self.horizontalSpacer_19 = QSpacerItem(30, 20, QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Minimum)
+
+        self.horizontalLayout_5.addItem(self.horizontalSpacer_19)
+
+        self.checkBox_auto_download_new = QCheckBox(self.tab_setting)
+        self.checkBox_auto_download_new.setObjectName(u"checkBox_auto_download_new")
+        self.checkBox_auto_download_new.setChecked(False)
+
+        self.horizontalLayout_5.addWidget(self.checkBox_auto_download_new)
+
         self.horizontalSpacer_12 = QSpacerItem(40, 20, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum)
 
         self.horizontalLayout_5.addItem(self.horizontalSpacer_12)
@@ -761,6 +797,70 @@ class Ui_MainWindow(object):
 
         self.verticalLayout_3.addLayout(self.h_Layout_num_thread)
 
+        self.h_Layout_num_page_thread = QHBoxLayout()
+        self.h_Layout_num_page_thread.setObjectName(u"h_Layout_num_page_thread")
+        self.label_num_page_thread_count = QLabel(self.groupBox)
+        self.label_num_page_thread_count.setObjectName(u"label_num_page_thread_count")
+        self.label_num_page_thread_count.setMinimumSize(QSize(120, 0))
+        self.label_num_page_thread_count.setMaximumSize(QSize(16777215, 16777215))
+
+        self.h_Layout_num_page_thread.addWidget(self.label_num_page_thread_count)
+
+        self.horizontalSpacer_13 = QSpacerItem(40, 20, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum)
+
+        self.h_Layout_num_page_thread.addItem(self.horizontalSpacer_13)
+
+        self.h_Slider_num_page_thread = QSlider(self.groupBox)
+        self.h_Slider_num_page_thread.setObjectName(u"h_Slider_num_page_thread")
+        self.h_Slider_num_page_thread.setMinimumSize(QSize(300, 0))
+        self.h_Slider_num_page_thread.setMaximumSize(QSize(200, 16777215))
+        self.h_Slider_num_page_thread.setMinimum(1)
+        self.h_Slider_num_page_thread.setMaximum(16)
+        self.h_Slider_num_page_thread.setSingleStep(1)
+        self.h_Slider_num_page_thread.setPageStep(2)
+        self.h_Slider_num_page_thread.setValue(4)
+        self.h_Slider_num_page_thread.setOrientation(Qt.Horizontal)
+
+        self.h_Layout_num_page_thread.addWidget(self.h_Slider_num_page_thread)
+
+        self.horizontalSpacer_14 = QSpacerItem(40, 20, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum)
+
+        self.h_Layout_num_page_thread.addItem(self.horizontalSpacer_14)
+
+        self.label_num_page_thread = QLabel(self.groupBox)
+        self.label_num_page_thread.setObjectName(u"label_num_page_thread")
+        self.label_num_page_thread.setWordWrap(False)
+
+        self.h_Layout_num_page_thread.addWidget(self.label_num_page_thread)
+
+        self.horizontalSpacer_15 = QSpacerItem(40, 20, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum)
+
+        self.h_Layout_num_page_thread.addItem(self.horizontalSpacer_15)
+
+
+        self.verticalLayout_3.addLayout(self.h_Layout_num_page_thread)
+
+        self.h_Layout_async_engine = QHBoxLayout()
+        self.h_Layout_async_engine.setObjectName(u"h_Layout_async_engine")
+        self.label_async_engine = QLabel(self.groupBox)
+        self.label_async_engine.setObjectName(u"label_async_engine")
+        self.label_async_engine.setMinimumSize(QSize(120, 0))
+
+        self.h_Layout_async_engine.addWidget(self.label_async_engine)
+
+        self.checkBox_async_engine = QCheckBox(self.groupBox)
+        self.checkBox_async_engine.setObjectName(u"checkBox_async_engine")
+        self.checkBox_async_engine.setChecked(False)
+
+        self.h_Layout_async_engine.addWidget(self.checkBox_async_engine)
+
+        self.horizontalSpacer_16 = QSpacerItem(40, 20, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum)
+
+        self.h_Layout_async_engine.addItem(self.horizontalSpacer_16)
+
+
+        self.verticalLayout_3.addLayout(self.h_Layout_async_engine)
+
 
         self.verticalLayout_5.addWidget(self.groupBox)
 
@@ -958,9 +1058,16 @@ class Ui_MainWindow(object):
         self.label.setText(QCoreApplication.translate("MainWindow", u"\u4fee\u6539\u4fdd\u5b58\u683c\u5f0f\u540e\u9700\u8981\u91cd\u65b0\u89e3\u6790\u6f2b\u753b\u624d\u80fd\u751f\u6548", None))
         self.label_6.setText(QCoreApplication.translate("MainWindow", u"\u6587\u4ef6\u9644\u52a0\u4fe1\u606f\uff1a", None))
         self.checkBox_exif_info.setText(QCoreApplication.translate("MainWindow", u"\u662f\u5426\u5728\u4fdd\u5b58\u6587\u4ef6\u5c5e\u6027\u4e2d\u8bb0\u5f55\u7ae0\u8282\u6807\u9898\u3001\u4f5c\u8005\u3001\u51fa\u7248\u793e\u7b49\u9644\u52a0\u4fe1\u606f", None))
+        self.label_zip_compression.setText(QCoreApplication.translate("MainWindow", u"Zip/Cbz\u538b\u7f29\u65b9\u5f0f\uff1a", None))
+        self.checkBox_resume_download.setText(QCoreApplication.translate("MainWindow", u"\u65ad\u70b9\u7eed\u4f20", None))
+        self.checkBox_auto_download_new.setText(QCoreApplication.translate("MainWindow", u"\u66f4\u65b0\u5e93\u5b58\u65f6\u81ea\u52a8\u4e0b\u8f7d\u65b0\u7ae0\u8282", None))
         self.groupBox.setTitle(QCoreApplication.translate("MainWindow", u"\u6ce8\u610f\uff1a\u4ee5\u4e0b\u8bbe\u7f6e\u53ea\u5728\u4e0b\u6b21\u542f\u52a8\u65f6\u751f\u6548\uff01", None))
         self.label_num_thread_count.setText(QCoreApplication.translate("MainWindow", u"\u540c\u65f6\u4e0b\u8f7d\u7ebf\u7a0b\u6570\uff1a", None))
         self.label_num_thread.setText(QCoreApplication.translate("MainWindow", u"\u7ebf\u7a0b\u6570\u5e76\u4e0d\u662f\u8d8a\u591a\u8d8a\u597d\uff0c\u8bf7\u6839\u636e\u81ea\u5df1\u7684\u7f51\u7edc\u60c5\u51b5\u548c\u5e73\u5747\u4efb\u52a1\u5927\u5c0f\u5408\u7406\u914d\u7f6e\uff08\u63a8\u8350\uff1a16\uff09", None))
+        self.label_num_page_thread_count.setText(QCoreApplication.translate("MainWindow", u"\u5355\u7ae0\u56fe\u7247\u7ebf\u7a0b\u6570\uff1a", None))
+        self.label_num_page_thread.setText(QCoreApplication.translate("MainWindow", u"\u6bcf\u4e2a\u7ae0\u8282\u5185\u540c\u65f6\u4e0b\u8f7d\u7684\u56fe\u7247\u6570\uff0c\u7f51\u7edc\u5ef6\u8fdf\u8f83\u9ad8\u65f6\u53ef\u9002\u5f53\u8c03\u5927\uff08\u63a8\u8350\uff1a4\uff09", None))
+        self.label_async_engine.setText(QCoreApplication.translate("MainWindow", u"\u4e0b\u8f7d\u5f15\u64ce\uff1a", None))
+        self.checkBox_async_engine.setText(QCoreApplication.translate("MainWindow", u"\u4f7f\u7528\u5f02\u6b65\u4e0b\u8f7d\u5f15\u64ce\uff0c\u5927\u6279\u91cf\u4e0b\u8f7d\u65f6\u66f4\u7701\u8d44\u6e90\uff08\u9700\u8981\u5b89\u88c5 aiohttp\uff09", None))
         self.groupBox_2.setTitle(QCoreApplication.translate("MainWindow", u"\u4e3b\u9898\u8bbe\u7f6e", None))
         self.label_2.setText(QCoreApplication.translate("MainWindow", u"\u4e3b\u9898\u6837\u5f0f\uff1a ", None))
         self.label_3.setText(QCoreApplication.translate("MainWindow", u"\u4e3b\u9898\u5bc6\u5ea6\uff1a ", None))
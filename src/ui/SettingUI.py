@@ -24,6 +24,7 @@ from src.Utils import (
     RETRY_WAIT_EX,
     TIMEOUT_SMALL,
     checkNewVersion,
+    getSession,
     log_path,
     logger,
     openFileOrDir,
@@ -48,6 +49,7 @@ class SettingUI(QObject):
         self.init_biliplus_cookie()
         self.init_savePath()
         self.init_num_thread()
+        self.init_num_page_thread()
         self.init_openLog()
         self.init_about()
         self.init_clearUserData()
@@ -55,6 +57,10 @@ class SettingUI(QObject):
         self.init_checkUpdate()
         self.init_theme()
         self.init_exif_setting()
+        self.init_zip_compression()
+        self.init_resume_download()
+        self.init_auto_download_new()
+        self.init_async_engine()
         self.qr_ui = QrCodeUI()
 
     ############################################################
@@ -170,7 +176,7 @@ class SettingUI(QObject):
         @retry(stop_max_delay=MAX_RETRY_TINY, wait_exponential_multiplier=RETRY_WAIT_EX)
         def _() -> None:
             try:
-                res = requests.post(
+                res = getSession().post(
                     detail_url, data=payload, headers=headers, timeout=TIMEOUT_SMALL
                 )
             except requests.RequestException as e:
@@ -243,7 +249,7 @@ class SettingUI(QObject):
         @retry(stop_max_delay=MAX_RETRY_TINY, wait_exponential_multiplier=RETRY_WAIT_EX)
         def _() -> bool | None:
             try:
-                res = requests.post(main_url, headers=headers, timeout=TIMEOUT_SMALL)
+                res = getSession().post(main_url, headers=headers, timeout=TIMEOUT_SMALL)
             except requests.RequestException as e:
                 logger.warning(f"测试BiliPlus Cookie是否有效失败! 重试中...\n{e}")
                 raise e
@@ -335,6 +341,29 @@ class SettingUI(QObject):
 
         self.mainGUI.h_Slider_num_thread.valueChanged.connect(_)
 
+    ############################################################
+    def init_num_page_thread(self) -> None:
+        """绑定单章节内图片下载线程数设置"""
+
+        if self.mainGUI.getConfig("num_page_thread") is not None:
+            self.mainGUI.h_Slider_num_page_thread.setValue(
+                self.mainGUI.getConfig("num_page_thread")
+            )
+        else:
+            self.mainGUI.updateConfig(
+                "num_page_thread", self.mainGUI.h_Slider_num_page_thread.value()
+            )
+
+        self.mainGUI.label_num_page_thread_count.setText(
+            f"单章图片线程数：{self.mainGUI.getConfig('num_page_thread')}"
+        )
+
+        def _(value) -> None:
+            self.mainGUI.label_num_page_thread_count.setText(f"单章图片线程数：{value}")
+            self.mainGUI.updateConfig("num_page_thread", value)
+
+        self.mainGUI.h_Slider_num_page_thread.valueChanged.connect(_)
+
     ############################################################
     def init_openLog(self) -> None:
         """绑定打开日志文件
@@ -501,3 +530,75 @@ class SettingUI(QObject):
             self.mainGUI.updateConfig("exif", checked)
 
         self.mainGUI.checkBox_exif_info.toggled.connect(_)
+
+    ############################################################
+
+    def init_zip_compression(self) -> None:
+        """绑定Zip/Cbz压缩方式设置"""
+        zip_compression = self.mainGUI.getConfig("zip_compression")
+        if zip_compression is None:
+            self.mainGUI.updateConfig("zip_compression", "auto")
+            zip_compression = "auto"
+
+        compression_list = {
+            "auto": "自动(图片仅存储)",
+            "stored": "仅存储",
+            "fast": "快速压缩",
+            "default": "标准压缩",
+            "best": "最大压缩",
+        }
+
+        reversed_compression_list = {value: key for key, value in compression_list.items()}
+        self.mainGUI.comboBox_zip_compression.addItems(compression_list.values())
+        self.mainGUI.comboBox_zip_compression.setCurrentText(compression_list[zip_compression])
+
+        def _(text: str) -> None:
+            self.mainGUI.updateConfig("zip_compression", reversed_compression_list[text])
+
+        self.mainGUI.comboBox_zip_compression.currentTextChanged.connect(_)
+
+    ############################################################
+
+    def init_resume_download(self) -> None:
+        """绑定断点续传设置"""
+        if self.mainGUI.getConfig("resume_download") is not None:
+            self.mainGUI.checkBox_resume_download.setChecked(
+                self.mainGUI.getConfig("resume_download")
+            )
+        else:
+            self.mainGUI.updateConfig("resume_download", True)
+
+        def _(checked: bool) -> None:
+            self.mainGUI.updateConfig("resume_download", checked)
+
+        self.mainGUI.checkBox_resume_download.toggled.connect(_)
+
+    ############################################################
+
+    def init_auto_download_new(self) -> None:
+        """绑定自动下载新章节设置"""
+        if self.mainGUI.getConfig("auto_download_new") is not None:
+            self.mainGUI.checkBox_auto_download_new.setChecked(
+                self.mainGUI.getConfig("auto_download_new")
+            )
+        else:
+            self.mainGUI.updateConfig("auto_download_new", False)
+
+        def _(checked: bool) -> None:
+            self.mainGUI.updateConfig("auto_download_new", checked)
+
+        self.mainGUI.checkBox_auto_download_new.toggled.connect(_)
+
+    ############################################################
+
+    def init_async_engine(self) -> None:
+        """绑定异步下载引擎设置"""
+        if self.mainGUI.getConfig("async_engine") is not None:
+            self.mainGUI.checkBox_async_engine.setChecked(self.mainGUI.getConfig("async_engine"))
+        else:
+            self.mainGUI.updateConfig("async_engine", False)
+
+        def _(checked: bool) -> None:
+            self.mainGUI.updateConfig("async_engine", checked)
+
+        self.mainGUI.checkBox_async_engine.toggled.connect(_)